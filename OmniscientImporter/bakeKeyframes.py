@@ -1,5 +1,158 @@
 import bpy
+import numpy as np
 from bpy.types import Operator
+from .bulkKeyframes import find_fcurve, write_property_keyframes
+
+
+def sample_world_matrices(scene, obj, frames):
+    """Evaluate the world matrix of obj on every frame.
+
+    Only obj, its parents and what they depend on (e.g. the cache file and
+    its retiming animation) are evaluated, in a temporary scene using the
+    frame rate of scene, instead of the whole scene.
+    """
+    sampling_scene = bpy.data.scenes.new("OmniCameraSampling")
+    try:
+        sampling_scene.render.fps = scene.render.fps
+        sampling_scene.render.fps_base = scene.render.fps_base
+
+        linked = obj
+        while linked:
+            sampling_scene.collection.objects.link(linked)
+            linked = linked.parent
+
+        view_layer = sampling_scene.view_layers[0]
+        view_layer.update()
+
+        matrices = np.empty((len(frames), 4, 4))
+        for i, frame in enumerate(frames):
+            sampling_scene.frame_set(int(frame))
+            matrices[i] = obj.evaluated_get(view_layer.depsgraph).matrix_world
+    finally:
+        bpy.data.scenes.remove(sampling_scene)
+
+    return matrices
+
+
+def _channel_per_frame(obj, action, data_path, index, frames):
+    fcurve = find_fcurve(action, data_path, index)
+    if fcurve is None:
+        return np.full(len(frames), getattr(obj, data_path)[index])
+    return np.array([fcurve.evaluate(frame) for frame in frames])
+
+
+def keyframed_world_matrices(obj, frames):
+    """World matrix of obj on every frame read from its F-Curves, without evaluating the scene.
+
+    Only works for what bake_camera_transform leaves: no parent, no
+    constraint, no delta transform and an XYZ euler rotation. Returns None
+    for anything else.
+    """
+    anim = obj.animation_data
+    action = anim.action if anim else None
+    if (action is None or obj.parent or obj.constraints or obj.rotation_mode != 'XYZ'
+            or any(obj.delta_location) or any(obj.delta_rotation_euler) or tuple(obj.delta_scale) != (1.0, 1.0, 1.0)):
+        return None
+
+    location, euler, scale = (np.column_stack([_channel_per_frame(obj, action, data_path, index, frames)
+                                               for index in range(3)])
+                              for data_path in ("location", "rotation_euler", "scale"))
+
+    # XYZ euler order: R = Rz @ Ry @ Rx
+    cos, sin = np.cos(euler), np.sin(euler)
+    rotation = np.empty((len(frames), 3, 3))
+    rotation[:, 0, 0] = cos[:, 1] * cos[:, 2]
+    rotation[:, 0, 1] = sin[:, 0] * sin[:, 1] * cos[:, 2] - cos[:, 0] * sin[:, 2]
+    rotation[:, 0, 2] = cos[:, 0] * sin[:, 1] * cos[:, 2] + sin[:, 0] * sin[:, 2]
+    rotation[:, 1, 0] = cos[:, 1] * sin[:, 2]
+    rotation[:, 1, 1] = sin[:, 0] * sin[:, 1] * sin[:, 2] + cos[:, 0] * cos[:, 2]
+    rotation[:, 1, 2] = cos[:, 0] * sin[:, 1] * sin[:, 2] - sin[:, 0] * cos[:, 2]
+    rotation[:, 2, 0] = -sin[:, 1]
+    rotation[:, 2, 1] = sin[:, 0] * cos[:, 1]
+    rotation[:, 2, 2] = cos[:, 0] * cos[:, 1]
+
+    matrices = np.zeros((len(frames), 4, 4))
+    matrices[:, :3, :3] = rotation * scale[:, None, :]
+    matrices[:, :3, 3] = location
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def decompose_matrices(matrices):
+    """Split world matrices into location, XYZ euler rotation and scale arrays"""
+    location = matrices[:, :3, 3]
+    basis = matrices[:, :3, :3]
+    scale = np.linalg.norm(basis, axis=1)
+    rotation = basis / np.where(scale == 0.0, 1.0, scale)[:, None, :]
+
+    # XYZ euler order: R = Rz @ Ry @ Rx
+    euler = np.empty_like(location)
+    euler[:, 0] = np.arctan2(rotation[:, 2, 1], rotation[:, 2, 2])
+    euler[:, 1] = np.arcsin(np.clip(-rotation[:, 2, 0], -1.0, 1.0))
+    euler[:, 2] = np.arctan2(rotation[:, 1, 0], rotation[:, 0, 0])
+
+    # Avoid 360 degree jumps between frames
+    euler = np.unwrap(euler, axis=0)
+    return location, euler, scale
+
+
+def remove_transform_cache(obj):
+    """Remove the Transform Cache constraints of obj and of its parents.
+
+    Unparents obj and deletes the parent empties left without children, as
+    Alembic imports create them for the transforms of the archive. Cache files
+    nothing uses anymore are removed so the archive isn't read on frame changes.
+    """
+    parents = []
+    parent = obj.parent
+    while parent:
+        parents.append(parent)
+        parent = parent.parent
+
+    cache_files = set()
+    for owner in [obj] + parents:
+        for constraint in list(owner.constraints):
+            if constraint.type == 'TRANSFORM_CACHE':
+                if constraint.cache_file:
+                    cache_files.add(constraint.cache_file)
+                owner.constraints.remove(constraint)
+
+    obj.parent = None
+    # Nearest parent first, removing it may leave the next one without children
+    for parent in parents:
+        if parent.type == 'EMPTY' and not parent.children:
+            bpy.data.objects.remove(parent)
+
+    for cache_file in cache_files:
+        if cache_file.users == 0:
+            bpy.data.cache_files.remove(cache_file)
+
+
+def bake_camera_transform(scene, camera, frame_start, frame_end, keyframe_tolerance=None):
+    """Bake the world transform of camera into F-Curves and drop what drove it.
+
+    keyframe_tolerance maps 'location', 'rotation' and 'scale' to the
+    simplification tolerance of the channel. Returns the number of keys removed.
+    """
+    frames = np.arange(frame_start, frame_end + 1, dtype=np.float32)
+    matrices = sample_world_matrices(scene, camera, frames)
+    location, euler, scale = decompose_matrices(matrices)
+
+    remove_transform_cache(camera)
+    camera.rotation_mode = 'XYZ'
+
+    channels = (
+        ("location", location, 'location'),
+        ("rotation_euler", euler, 'rotation'),
+        ("scale", scale, 'scale'),
+    )
+    removed_keys = 0
+    for data_path, values, channel in channels:
+        tolerance = keyframe_tolerance(channel) if keyframe_tolerance else 0.0
+        for index in range(3):
+            removed_keys += write_property_keyframes(camera, data_path, frames, values[:, index], index,
+                                                     tolerance=tolerance)[1]
+    return removed_keys
 
 
 class OMNI_OT_BakeCameraKeyframes(Operator):
@@ -12,21 +165,13 @@ class OMNI_OT_BakeCameraKeyframes(Operator):
     def execute(self, context):
         scene = context.scene
         camera = scene.camera
+        if camera is None:
+            self.report({'ERROR'}, "No active camera to bake")
+            return {'CANCELLED'}
 
-        # Ensure the camera is selected and active
-        bpy.ops.object.select_all(action='DESELECT')
-        camera.select_set(True)
-        scene.view_layers[0].objects.active = camera
-
-        # Bake the camera keyframes
-        bpy.ops.nla.bake(
-            frame_start=self.frame_start,
-            frame_end=self.frame_end,
-            only_selected=True,
-            visual_keying=True,
-            clear_constraints=True,
-            clear_parents=True,
-            use_current_action=True,
-            bake_types={'OBJECT'}
-        )
+        prefs = context.preferences.addons[__package__].preferences
+        removed_keys = bake_camera_transform(scene, camera, self.frame_start, self.frame_end,
+                                             prefs.keyframe_tolerance)
+        if removed_keys:
+            self.report({'INFO'}, f"Simplification removed {removed_keys} camera transform keyframes")
         return {'FINISHED'}
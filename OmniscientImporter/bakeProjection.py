@@ -0,0 +1,314 @@
+import bpy
+import numpy as np
+from bpy.types import Operator
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+from .cameraProjection.cameraProjectionMaterial import (ACTIVE_PROJECTION_KEY, BAKED_PROJECTION_NODE_NAME,
+                                                        BAKED_PROJECTION_UV_NODE_NAME, ensure_bsdf_connection)
+from .cameraProjection.node_registry import material_node
+from .cameraProjection.utils import create_link
+from .scanLod import scan_lod_modifier
+from .ui.utils import get_selected_collection_and_shot
+
+BAKE_UV_MAP_NAME = "OmniBake"
+BAKE_EMISSION_NODE_NAME = "OmniBakeEmission"
+
+
+def bake_objects(shot):
+    """Visible scan chunks of shot with faces, the only ones a bake can write"""
+    objects = [chunk.obj for chunk in shot.geometry_chunks if chunk.obj] or [shot.mesh]
+    return [obj for obj in objects if obj and obj.type == 'MESH' and obj.visible_get()
+            and obj.data.polygons]
+
+
+def hide_viewport_lods(objects):
+    """Disable the viewport LOD of objects so bakes see the full resolution scan.
+
+    Returns the disabled modifiers, to enable again once the bake is done.
+    """
+    modifiers = [scan_lod_modifier(obj) for obj in objects]
+    modifiers = [modifier for modifier in modifiers if modifier and modifier.show_viewport]
+    for modifier in modifiers:
+        modifier.show_viewport = False
+    return modifiers
+
+
+def _mesh_array(collection, attribute, dtype, width=1):
+    values = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attribute, values)
+    return values.reshape(-1, width) if width > 1 else values
+
+
+def transfer_lod_uvs(depsgraph, obj, uv_map):
+    """Give the viewport LOD of obj the uv_map of its full resolution mesh.
+
+    Every LOD corner takes the UV of the nearest corner of the nearest full
+    resolution face, found from a point pulled toward the center of its LOD
+    face so corners on UV seams pick the island of their own face.
+    """
+    mesh = obj.data
+    lod_mesh = obj.omni_viewport_mesh
+    source_uvs = mesh.uv_layers.get(uv_map)
+    if not lod_mesh or lod_mesh == mesh or not source_uvs or not lod_mesh.polygons:
+        return
+
+    # Built from the evaluated object, the LOD modifier being disabled it is the full mesh
+    tree = BVHTree.FromObject(obj, depsgraph)
+    positions = _mesh_array(mesh.vertices, "co", np.float32, 3)
+    loop_vertices = _mesh_array(mesh.loops, "vertex_index", np.int32)
+    loop_starts = _mesh_array(mesh.polygons, "loop_start", np.int32)
+    loop_totals = _mesh_array(mesh.polygons, "loop_total", np.int32)
+    uvs = _mesh_array(source_uvs.data, "uv", np.float32, 2)
+
+    lod_positions = _mesh_array(lod_mesh.vertices, "co", np.float32, 3)
+    lod_corners = lod_positions[_mesh_array(lod_mesh.loops, "vertex_index", np.int32)]
+    lod_starts = _mesh_array(lod_mesh.polygons, "loop_start", np.int32)
+    lod_totals = _mesh_array(lod_mesh.polygons, "loop_total", np.int32)
+    centers = np.add.reduceat(lod_corners, lod_starts) / lod_totals[:, None]
+    samples = lod_corners * 0.75 + np.repeat(centers, lod_totals, axis=0) * 0.25
+
+    hits = np.zeros((len(samples), 3))
+    faces = np.zeros(len(samples), dtype=np.int64)
+    found = np.zeros(len(samples), dtype=bool)
+    for i, sample in enumerate(samples):
+        location, _, index, _ = tree.find_nearest(Vector(sample))
+        if index is not None:
+            hits[i], faces[i], found[i] = location, index, True
+
+    corner_offsets = np.arange(loop_totals[faces].max() if len(faces) else 0)
+    corners = loop_starts[faces][:, None] + np.minimum(corner_offsets, loop_totals[faces][:, None] - 1)
+    distances = np.linalg.norm(positions[loop_vertices[corners]] - hits[:, None], axis=2)
+    nearest_corners = corners[np.arange(len(corners)), distances.argmin(axis=1)]
+    lod_uvs = np.where(found[:, None], uvs[nearest_corners], 0.0).astype(np.float32)
+
+    uv_layer = lod_mesh.uv_layers.get(uv_map) or lod_mesh.uv_layers.new(name=uv_map)
+    uv_layer.data.foreach_set("uv", lod_uvs.ravel())
+    lod_mesh.update()
+
+
+def select_only(context, objects):
+    for obj in context.view_layer.objects.selected:
+        obj.select_set(False)
+    for obj in objects:
+        obj.select_set(True)
+    context.view_layer.objects.active = objects[0]
+
+
+def ensure_bake_uvs(context, objects):
+    """Name of the UV map to bake to, unwrapped with Smart UV Project when needed.
+
+    A single scan keeps its own UVs, chunks are unwrapped together so their
+    islands share one atlas.
+    """
+    if len(objects) == 1 and objects[0].data.uv_layers.active:
+        return objects[0].data.uv_layers.active.name
+
+    for obj in objects:
+        uv_layer = obj.data.uv_layers.get(BAKE_UV_MAP_NAME) or obj.data.uv_layers.new(name=BAKE_UV_MAP_NAME)
+        obj.data.uv_layers.active = uv_layer
+
+    select_only(context, objects)
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.mesh.select_all(action='SELECT')
+    bpy.ops.uv.smart_project(island_margin=0.002)
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return BAKE_UV_MAP_NAME
+
+
+def add_baked_projection_nodes(material, image, uv_map):
+    nodes = material.node_tree.nodes
+    for name in (BAKED_PROJECTION_NODE_NAME, BAKED_PROJECTION_UV_NODE_NAME):
+        if name in nodes:
+            nodes.remove(nodes[name])
+
+    uv_node = nodes.new("ShaderNodeUVMap")
+    uv_node.name = BAKED_PROJECTION_UV_NODE_NAME
+    uv_node.uv_map = uv_map
+    uv_node.location = (200.0, 400.0)
+
+    image_node = nodes.new("ShaderNodeTexImage")
+    image_node.name = BAKED_PROJECTION_NODE_NAME
+    image_node.label = "Baked Projection"
+    image_node.image = image
+    image_node.location = (400.0, 400.0)
+    create_link(material.node_tree, uv_node, 0, image_node, 0)
+
+    # The bake writes to the active image node
+    nodes.active = image_node
+    return image_node
+
+
+def active_mix_node(material):
+    """Mix node of the active projection of material"""
+    return material.node_tree.nodes.get(material.get(ACTIVE_PROJECTION_KEY, ""))
+
+
+def add_bake_emission(material):
+    """Shade material with the unlit color feeding its BSDF, the projected plate, until remove_bake_emission.
+
+    A diffuse bake would be scaled down by the metallic and specular layers of the BSDF.
+    Returns the socket the material output was linked from.
+    """
+    node_tree = material.node_tree
+    bsdf_node = material_node(material, 'BSDF_PRINCIPLED')
+    output_node = material_node(material, 'OUTPUT_MATERIAL')
+    if not bsdf_node or not output_node:
+        return None
+
+    surface = output_node.inputs[0]
+    surface_source = surface.links[0].from_socket if surface.is_linked else None
+    emission_node = node_tree.nodes.new("ShaderNodeEmission")
+    emission_node.name = BAKE_EMISSION_NODE_NAME
+    emission_node.inputs["Strength"].default_value = 1.0
+    base_color = bsdf_node.inputs[0]
+    if base_color.is_linked:
+        node_tree.links.new(base_color.links[0].from_socket, emission_node.inputs["Color"])
+    else:
+        emission_node.inputs["Color"].default_value = base_color.default_value
+    node_tree.links.new(emission_node.outputs[0], surface)
+    return surface_source
+
+
+def remove_bake_emission(material, surface_source):
+    nodes = material.node_tree.nodes
+    if BAKE_EMISSION_NODE_NAME in nodes:
+        nodes.remove(nodes[BAKE_EMISSION_NODE_NAME])
+    output_node = material_node(material, 'OUTPUT_MATERIAL')
+    if surface_source and output_node:
+        material.node_tree.links.new(surface_source, output_node.inputs[0])
+
+
+def bake_projection(context, objects, image, uv_map, frame, margin):
+    """Bake the projected color of objects, the camera projection chain, to image on the CPU"""
+    scene = context.scene
+    render_settings = (scene.render.engine, scene.frame_current)
+    cycles_settings = (scene.cycles.device, scene.cycles.samples)
+
+    materials = {slot.material for obj in objects for slot in obj.material_slots if slot.material}
+    for material in materials:
+        add_baked_projection_nodes(material, image, uv_map)
+
+    # Holdouts bake black
+    holdouts = [obj for obj in objects if obj.is_holdout]
+    surface_sources = {}
+    try:
+        for material in materials:
+            surface_sources[material] = add_bake_emission(material)
+        for obj in holdouts:
+            obj.is_holdout = False
+        scene.render.engine = 'CYCLES'
+        scene.cycles.device = 'CPU'
+        # Only the color of the shader is baked, no lighting to converge
+        scene.cycles.samples = 1
+        scene.frame_set(frame)
+
+        select_only(context, objects)
+        bpy.ops.object.bake(type='EMIT', target='IMAGE_TEXTURES',
+                            uv_layer=uv_map, margin=margin, use_clear=True)
+    except RuntimeError:
+        for material in materials:
+            clear_baked_projection(material)
+        raise
+    finally:
+        scene.render.engine, frame_current = render_settings
+        scene.cycles.device, scene.cycles.samples = cycles_settings
+        scene.frame_set(frame_current)
+        for obj in holdouts:
+            obj.is_holdout = True
+        for material, surface_source in surface_sources.items():
+            remove_bake_emission(material, surface_source)
+
+    image.pack()
+    for material in materials:
+        ensure_bsdf_connection(material, active_mix_node(material))
+    return materials
+
+
+def clear_baked_projection(material):
+    nodes = material.node_tree.nodes
+    for name in (BAKED_PROJECTION_NODE_NAME, BAKED_PROJECTION_UV_NODE_NAME):
+        if name in nodes:
+            nodes.remove(nodes[name])
+    ensure_bsdf_connection(material, active_mix_node(material))
+
+
+class OMNI_OT_BakeProjection(Operator):
+    """Bake the camera projection of the selected shot into a texture of the scan, for static plates"""
+    bl_idname = "object.bake_omni_projection"
+    bl_label = "Bake Projection"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    frame: bpy.props.IntProperty(name="Frame", description="Frame of the plate to bake")
+    resolution: bpy.props.IntProperty(name="Resolution", default=4096, min=256, max=16384)
+    margin: bpy.props.IntProperty(name="Margin", description="Pixels bled past the UV islands", default=8, min=0)
+
+    def execute(self, context):
+        scene = context.scene
+        _, shot = get_selected_collection_and_shot(scene)
+        if shot is None:
+            self.report({'ERROR'}, "No shot selected")
+            return {'CANCELLED'}
+
+        objects = bake_objects(shot)
+        if not objects:
+            self.report({'ERROR'}, "The shot has no visible scan mesh to bake")
+            return {'CANCELLED'}
+
+        if context.object and context.object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        lod_modifiers = hide_viewport_lods(objects)
+        try:
+            return self.bake(context, shot, objects)
+        finally:
+            for modifier in lod_modifiers:
+                modifier.show_viewport = True
+
+    def bake(self, context, shot, objects):
+        uv_map = ensure_bake_uvs(context, objects)
+        # Scans keeping their own UVs already share them with their LOD
+        if uv_map == BAKE_UV_MAP_NAME:
+            depsgraph = context.evaluated_depsgraph_get()
+            for obj in objects:
+                transfer_lod_uvs(depsgraph, obj, uv_map)
+
+        image_name = f"{shot.collection.name if shot.collection else shot.name}_ProjectionBake"
+        image = bpy.data.images.get(image_name)
+        if image and tuple(image.size) != (self.resolution, self.resolution):
+            bpy.data.images.remove(image)
+            image = None
+        if image is None:
+            image = bpy.data.images.new(image_name, self.resolution, self.resolution, alpha=False)
+
+        try:
+            materials = bake_projection(context, objects, image, uv_map, self.frame, self.margin)
+        except RuntimeError as e:
+            self.report({'ERROR'}, f"Bake failed: {e}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Baked frame {self.frame} to {image.name} for {len(materials)} materials")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.frame = context.scene.frame_current
+        return context.window_manager.invoke_props_dialog(self)
+
+
+class OMNI_OT_ClearProjectionBake(Operator):
+    """Render the camera projection again instead of its baked texture"""
+    bl_idname = "object.clear_omni_projection_bake"
+    bl_label = "Clear Projection Bake"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        _, shot = get_selected_collection_and_shot(scene)
+        if shot is None:
+            self.report({'ERROR'}, "No shot selected")
+            return {'CANCELLED'}
+
+        objects = [chunk.obj for chunk in shot.geometry_chunks if chunk.obj] or [shot.mesh]
+        materials = {slot.material for obj in objects if obj for slot in obj.material_slots if slot.material}
+        for material in materials:
+            if material.node_tree and BAKED_PROJECTION_NODE_NAME in material.node_tree.nodes:
+                clear_baked_projection(material)
+        return {'FINISHED'}
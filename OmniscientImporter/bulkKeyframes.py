@@ -0,0 +1,151 @@
+import bpy
+import numpy as np
+
+
+def ensure_fcurve(id_data, data_path, index=0):
+    """Return the F-Curve animating data_path on id_data, creating the action and curve if needed"""
+    anim = id_data.animation_data or id_data.animation_data_create()
+    if anim.action is None:
+        anim.action = bpy.data.actions.new(name=f"{id_data.name}Action")
+
+    action = anim.action
+
+    # Blender 4.4+ slotted actions: the action creates and assigns the slot itself
+    if hasattr(action, "fcurve_ensure_for_datablock"):
+        return action.fcurve_ensure_for_datablock(id_data, data_path, index=index)
+
+    # Legacy API: fcurves live directly on the Action
+    fcurve = action.fcurves.find(data_path, index=index)
+    if fcurve is None:
+        fcurve = action.fcurves.new(data_path, index=index)
+    return fcurve
+
+
+def find_fcurve(action, data_path, index=0):
+    """Return the F-Curve of action animating data_path, None if there is none"""
+    # Legacy API: fcurves live directly on the Action
+    if hasattr(action, "fcurves"):
+        return action.fcurves.find(data_path, index=index)
+
+    # Blender 5.0+ channelbag API
+    for layer in action.layers:
+        for strip in layer.strips:
+            for channelbag in strip.channelbags:
+                fcurve = channelbag.fcurves.find(data_path, index=index)
+                if fcurve is not None:
+                    return fcurve
+    return None
+
+
+def assign_action(id_data, action):
+    """Make action the action of id_data, picking its first slot on Blender 4.4+ when none matches"""
+    anim = id_data.animation_data or id_data.animation_data_create()
+    anim.action = action
+    if action is not None and getattr(anim, "action_slot", True) is None and len(action.slots):
+        anim.action_slot = action.slots[0]
+
+
+def clear_keyframes(fcurve):
+    points = fcurve.keyframe_points
+    if not len(points):
+        return
+    if hasattr(points, "clear"):
+        points.clear()
+    else:
+        for point in reversed(points):
+            points.remove(point, fast=True)
+
+
+def simplify_keyframes(frames, values, tolerance):
+    """Return the indices of the keys to keep so that linear interpolation
+    between them stays within tolerance of every removed value.
+
+    Ramer-Douglas-Peucker measured along the value axis, so the tolerance is
+    in the unit of the channel.
+    """
+    count = len(frames)
+    if count <= 2 or tolerance <= 0.0:
+        return np.arange(count)
+
+    frames = np.asarray(frames, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    keep = np.zeros(count, dtype=bool)
+    keep[0] = keep[-1] = True
+    segments = [(0, count - 1)]
+    while segments:
+        start, end = segments.pop()
+        if end - start < 2:
+            continue
+
+        factors = (frames[start + 1:end] - frames[start]) / (frames[end] - frames[start])
+        interpolated = values[start] + factors * (values[end] - values[start])
+        errors = np.abs(values[start + 1:end] - interpolated)
+
+        worst = int(np.argmax(errors))
+        if errors[worst] > tolerance:
+            split = start + 1 + worst
+            keep[split] = True
+            segments += [(start, split), (split, end)]
+
+    return np.flatnonzero(keep)
+
+
+def read_keyframes(fcurve):
+    """Return the (frames, values) arrays of the keyframes of fcurve"""
+    points = fcurve.keyframe_points
+    co = np.empty(len(points) * 2, dtype=np.float32)
+    points.foreach_get("co", co)
+    return co[0::2], co[1::2]
+
+
+def write_keyframes(fcurve, frames, values, interpolation=None, tolerance=0.0):
+    """Replace the keyframes of fcurve with one key per (frame, value) pair.
+
+    Keys are written with a single add() and foreach_set() call, so no frame
+    change or depsgraph evaluation happens. NaN values mark frames where the
+    channel is missing and are skipped. With a tolerance, keys that linear
+    interpolation recovers within it are dropped and the curve is made linear.
+    Returns (keys written, keys removed by the simplification).
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    values = np.asarray(values, dtype=np.float32)
+
+    valid = ~np.isnan(values)
+    frames = frames[valid]
+    values = values[valid]
+
+    removed = 0
+    if tolerance > 0.0:
+        kept = simplify_keyframes(frames, values, tolerance)
+        removed = len(frames) - len(kept)
+        frames = frames[kept]
+        values = values[kept]
+        interpolation = interpolation or 'LINEAR'
+
+    clear_keyframes(fcurve)
+    count = len(frames)
+    if count == 0:
+        return 0, removed
+
+    co = np.empty(count * 2, dtype=np.float32)
+    co[0::2] = frames
+    co[1::2] = values
+
+    points = fcurve.keyframe_points
+    points.add(count)
+    points.foreach_set("co", co)
+
+    # Enum properties can't go through foreach_set; only set them when asked
+    if interpolation is not None:
+        for point in points:
+            point.interpolation = interpolation
+
+    # Sort keys and recalculate the auto handles
+    fcurve.update()
+    return count, removed
+
+
+def write_property_keyframes(id_data, data_path, frames, values, index=0, interpolation=None, tolerance=0.0):
+    fcurve = ensure_fcurve(id_data, data_path, index)
+    return write_keyframes(fcurve, frames, values, interpolation, tolerance)
@@ -1,16 +1,76 @@
 import bpy
 from bpy.types import PropertyGroup
-from bpy.props import StringProperty
-from .utils import get_or_create_node, create_link, add_driver, hide_specific_nodes, find_node, is_blender_4
+from bpy.props import IntProperty, StringProperty
+from . import node_registry
+from .node_registry import ACTIVE_PROJECTION_KEY, FALLBACK_PROJECTION_KEY
+from .utils import get_or_create_node, create_link, find_node, is_blender_4
+from .projection_parameters import SCAN_COLOR_NODE_NAME, copy_lens_animation
 from .projection_shader_group import create_projection_shader_group
+from .projection_uv_backend import update_uv_project_modifiers
 from ..ui.utils import find_collection_and_shot_index_by_camera
 
+BAKED_PROJECTION_NODE_NAME = "BakedProjectionNode"
+BAKED_PROJECTION_UV_NODE_NAME = "BakedProjectionUVNode"
+
+# Material holding the nodes every projection material shares, copied for new materials only,
+# shots added to a material don't use it. It has no users so it is never saved, and is rebuilt
+# once per session or after undo. scripts/check_projection_graph.py checks what it builds.
+PROJECTION_TEMPLATE_NAME = ".OmniProjectionTemplate"
+
+
+def create_emission_nodes(node_tree):
+    """Emission control nodes, placed by create_projection_shader"""
+    nodes = node_tree.nodes
+
+    color_ramp_emission_node = nodes.new("ShaderNodeValToRGB")
+    color_ramp_emission_node.name = "ColorRampEmissionNode"
+
+    value_node = nodes.new("ShaderNodeValue")
+    value_node.outputs[0].default_value = 1.0
+    value_node.name = "ValueEmissionNode"
+
+    multiply_emission_node = nodes.new("ShaderNodeMath")
+    multiply_emission_node.operation = 'MULTIPLY'
+    multiply_emission_node.name = "MultiplyEmissionNode"
+    multiply_emission_node.hide = True
+
+    mix_rgb_emission_node = nodes.new("ShaderNodeMixRGB")
+    mix_rgb_emission_node.hide = True
+    mix_rgb_emission_node.name = "MixRGBEmissionNode"
+
+    create_link(node_tree, color_ramp_emission_node, 0, multiply_emission_node, 0)
+    create_link(node_tree, value_node, 0, multiply_emission_node, 1)
+    create_link(node_tree, multiply_emission_node, 0, mix_rgb_emission_node, 2)
+    create_link(node_tree, value_node, 0, mix_rgb_emission_node, 1)
+    return mix_rgb_emission_node
+
+
+def projection_material_template():
+    """Material with the shader, output and emission nodes of a projection material, built once per session"""
+    template = bpy.data.materials.get(PROJECTION_TEMPLATE_NAME)
+    if template and template.node_tree:
+        return template
+
+    template = bpy.data.materials.new(name=PROJECTION_TEMPLATE_NAME)
+    template.use_nodes = True
+    nodes = template.node_tree.nodes
+    principled_bsdf_node = get_or_create_node(nodes, 'BSDF_PRINCIPLED', (800.0, 0.0), Metallic=0.5, Roughness=0.8)
+    output_node = get_or_create_node(nodes, 'OUTPUT_MATERIAL', (1100.0, 0.0))
+    create_link(template.node_tree, principled_bsdf_node, 0, output_node, 0)
+    create_emission_nodes(template.node_tree)
+    return template
+
 
 def create_projection_shader(material_name, new_image_name, new_camera):
 
-    collection, shot, collection_index, shot_index = find_collection_and_shot_index_by_camera(new_camera)
+    collection, shot, _, _ = find_collection_and_shot_index_by_camera(new_camera)
 
-    material = bpy.data.materials.get(material_name) or bpy.data.materials.new(name=material_name)
+    material = bpy.data.materials.get(material_name)
+    is_new_material = material is None
+    if is_new_material:
+        # One copy of the template instead of building the shared nodes one RNA call at a time
+        material = projection_material_template().copy()
+        material.name = material_name
     material.use_nodes = True
     nodes = material.node_tree.nodes
     vertical_spacing = 400.0
@@ -19,8 +79,9 @@ def create_projection_shader(material_name, new_image_name, new_camera):
     output_node = get_or_create_node(nodes, 'OUTPUT_MATERIAL', (1100.0, 0.0))
 
     existing_image_nodes = [node for node in nodes if node.type == 'TEX_IMAGE']
-    previous_image_node = existing_image_nodes[0] if existing_image_nodes else None
-    previous_mix_node = next((node for node in nodes if node.type == 'MIX_RGB'), None)
+
+    # The nodes of the shot are still created one at a time, nodes can't be copied between
+    # trees without operators. Each shot adds a fixed handful of nodes to its material.
 
     def create_tex_coord_node(camera):
         node = nodes.new("ShaderNodeTexCoord")
@@ -54,8 +115,7 @@ def create_projection_shader(material_name, new_image_name, new_camera):
     camera_projector_group_node.node_tree = node_group
 
     if new_camera:
-        add_driver(camera_projector_group_node, "Focal Length", new_camera, 'OBJECT', "data.lens")
-        add_driver(camera_projector_group_node, "Sensor Size", new_camera, 'OBJECT', "data.sensor_width")
+        copy_lens_animation(new_camera, material, camera_projector_group_node)
 
     create_link(material.node_tree, tex_coord_node, 3, camera_projector_group_node, 0)
     create_link(material.node_tree, camera_projector_group_node, 0, new_image_texture_node, 0)
@@ -65,22 +125,11 @@ def create_projection_shader(material_name, new_image_name, new_camera):
     mix_rgb_visibility_node.blend_type = 'MIX'
     mix_rgb_visibility_node.name = "MixRGBVisibilityNode"
 
-    # Add drivers for mix rgb colors
+    # Scan color where the shot doesn't project, kept up to date by OmniCollection.color_scan
     if collection:
-        add_driver(mix_rgb_visibility_node,
-                   1,
-                   bpy.context.scene,
-                   'SCENE',
-                   f"Omni_Collections[{collection_index}].color_scan",
-                   False,
-                   True)
-        add_driver(mix_rgb_visibility_node,
-                   2,
-                   bpy.context.scene,
-                   'SCENE',
-                   f"Omni_Collections[{collection_index}].color_scan",
-                   False,
-                   True)
+        scan_color = (*collection.color_scan, 1.0)
+        mix_rgb_visibility_node.inputs[1].default_value = scan_color
+        mix_rgb_visibility_node.inputs[2].default_value = scan_color
 
     if shot:
         shot.mix_node_name = mix_rgb_visibility_node.name
@@ -91,24 +140,9 @@ def create_projection_shader(material_name, new_image_name, new_camera):
     multiply_visibility_node.name = "MultiplyVisibilityNode"
     create_link(material.node_tree, new_image_texture_node, 1, multiply_visibility_node, 0)
 
-    def add_driver_for_multiply(node, collection_index, shot_index, data_path):
-        driver = node.inputs[1].driver_add("default_value").driver
-        driver.type = 'SCRIPTED'
-        var = driver.variables.new()
-        var.name = 'projection_multiply'
-        var.targets[0].id_type = 'SCENE'
-        var.targets[0].id = bpy.context.scene
-        var.targets[0].data_path = f"Omni_Collections[{collection_index}].shots[{shot_index}].{data_path}"
-        driver.expression = var.name
-        bpy.context.scene.update_tag()
-        bpy.context.view_layer.update()
-
-    add_driver_for_multiply(multiply_visibility_node, collection_index, shot_index, "camera_projection_multiply")
-
-    if previous_mix_node:
-        create_link(material.node_tree, previous_mix_node, 0, mix_rgb_visibility_node, 1)
-    else:
-        create_link(material.node_tree, previous_image_node, 0, mix_rgb_visibility_node, 1)
+    # Kept up to date by OmniShot.camera_projection_multiply
+    multiply_visibility_node.inputs[1].default_value = shot.camera_projection_multiply if shot else 1.0
+
     create_link(material.node_tree, new_image_texture_node, 0, mix_rgb_visibility_node, 2)
     create_link(material.node_tree, multiply_visibility_node, 0, mix_rgb_visibility_node, 0)
 
@@ -125,69 +159,41 @@ def create_projection_shader(material_name, new_image_name, new_camera):
     # -------------------------------------------------------------------
 
     mix_rgb_emission_node = find_node(nodes, 'MIX_RGB', 'MixRGBEmissionNode')
+    has_emission_nodes = mix_rgb_emission_node is not None
+    if not has_emission_nodes:
+        mix_rgb_emission_node = create_emission_nodes(material.node_tree)
 
-    if not mix_rgb_emission_node:
-
-        color_ramp_emission_node = nodes.new("ShaderNodeValToRGB")
-        color_ramp_emission_node.location = (100.0, bsdf_vertical_position - 350)
-        color_ramp_emission_node.name = "ColorRampEmissionNode"
-
-        value_node = nodes.new("ShaderNodeValue")
-        value_node.location = (200.0, bsdf_vertical_position - 650)
-        value_node.outputs[0].default_value = 1.0
-        value_node.name = "ValueEmissionNode"
-
-        multiply_emission_node = nodes.new("ShaderNodeMath")
-        multiply_emission_node.location = (400.0, bsdf_vertical_position - 500)
-        multiply_emission_node.operation = 'MULTIPLY'
-        multiply_emission_node.name = "MultiplyEmissionNode"
-
-        mix_rgb_emission_node = nodes.new("ShaderNodeMixRGB")
-        mix_rgb_emission_node.location = (600.0, bsdf_vertical_position - 550.0)
-        mix_rgb_emission_node.hide = True
-        mix_rgb_emission_node.name = "MixRGBEmissionNode"
-
-        if collection:
-            add_driver(value_node,
-                       0,
-                       bpy.context.scene,
-                       'SCENE',
-                       f"Omni_Collections[{collection_index}].emission_value",
-                       True)
-            add_driver(mix_rgb_emission_node,
-                       0,
-                       bpy.context.scene,
-                       'SCENE',
-                       f"Omni_Collections[{collection_index}].mix_rgb_emission_input")
-
-        create_link(material.node_tree, color_ramp_emission_node, 0, multiply_emission_node, 0)
-        create_link(material.node_tree, value_node, 0, multiply_emission_node, 1)
-        create_link(material.node_tree, multiply_emission_node, 0, mix_rgb_emission_node, 2)
-        create_link(material.node_tree, value_node, 0, mix_rgb_emission_node, 1)
-    else:
-        # Update positions if nodes already exist
-        color_ramp_emission_node = find_node(nodes, 'VALTORGB', 'ColorRampEmissionNode')
-        value_node = find_node(nodes, 'VALUE', 'ValueEmissionNode')
-        multiply_emission_node = find_node(nodes, 'MATH', 'MultiplyEmissionNode')
+    color_ramp_emission_node = find_node(nodes, 'VALTORGB', 'ColorRampEmissionNode')
+    value_node = find_node(nodes, 'VALUE', 'ValueEmissionNode')
+    multiply_emission_node = find_node(nodes, 'MATH', 'MultiplyEmissionNode')
+
+    color_ramp_emission_node.location = (100.0, bsdf_vertical_position - 350)
+    value_node.location = (200.0, bsdf_vertical_position - 650)
+    multiply_emission_node.location = (400.0, bsdf_vertical_position - 500)
+    mix_rgb_emission_node.location = (600.0, bsdf_vertical_position - 550.0)
 
-        color_ramp_emission_node.location = (100.0, bsdf_vertical_position - 350)
-        value_node.location = (200.0, bsdf_vertical_position - 650)
-        multiply_emission_node.location = (400.0, bsdf_vertical_position - 500)
-        mix_rgb_emission_node.location = (600.0, bsdf_vertical_position - 550.0)
+    # Kept up to date by OmniCollection.emission_value and mix_rgb_emission_input
+    if collection and (is_new_material or not has_emission_nodes):
+        value_node.outputs[0].default_value = collection.emission_value
+        mix_rgb_emission_node.inputs[0].default_value = collection.mix_rgb_emission_input
 
-    node_types_to_hide = {"ShaderNodeMath"}
-    hide_specific_nodes(material.node_tree, node_types_to_hide)
-    hide_specific_nodes(node_group, node_types_to_hide)
+    # Only the new math node needs hiding, the shared ones are hidden when created
+    multiply_visibility_node.hide = True
 
     scene = bpy.context.scene
     node_entry = scene.camera_projection_nodes.add()
     node_entry.name = new_camera.name
+    node_entry.shot_id = shot.id if shot else 0
     node_entry.material_name = material_name
     node_entry.tex_coord_node = tex_coord_node.name
     node_entry.image_texture_node = new_image_texture_node.name
     node_entry.camera_projector_group_node = camera_projector_group_node.name
     node_entry.mix_rgb_visibility_node = mix_rgb_visibility_node.name
     node_entry.multiply_visibility_node = multiply_visibility_node.name
+    node_registry.invalidate()
+
+    # The new shot is mixed over the previously active one only
+    activate_projection(material, mix_rgb_visibility_node, collection.use_projection_fallback if collection else True)
 
     print(f"Added camera projection node: {node_entry.name}, \
           Material: {node_entry.material_name}, \
@@ -202,15 +208,16 @@ def ensure_bsdf_connection(material, latest_mix_rgb_visibility_node):
 
     nodes = material.node_tree.nodes
     links = material.node_tree.links
-    principled_bsdf_node = find_node(nodes, 'BSDF_PRINCIPLED')
-    output_node = find_node(nodes, 'OUTPUT_MATERIAL')
+
+    # A baked projection replaces the whole mix chain until the bake is cleared
+    baked_projection_node = nodes.get(BAKED_PROJECTION_NODE_NAME)
+    if baked_projection_node and latest_mix_rgb_visibility_node:
+        latest_mix_rgb_visibility_node = baked_projection_node
+    principled_bsdf_node = node_registry.material_node(material, 'BSDF_PRINCIPLED')
+    output_node = node_registry.material_node(material, 'OUTPUT_MATERIAL')
 
     if latest_mix_rgb_visibility_node and principled_bsdf_node:
-        # Remove existing links to the BSDF node
-        links_to_remove = [link for link in links if link.to_node == principled_bsdf_node]
-        for link in links_to_remove:
-            links.remove(link)
-        # Create a new link from the latest mix node to the BSDF node
+        # Create a new link from the latest mix node to the BSDF node, replacing the link on the input
         try:
             links.new(latest_mix_rgb_visibility_node.outputs[0], principled_bsdf_node.inputs[0])
             print(f"Linked {latest_mix_rgb_visibility_node.name} \
@@ -269,225 +276,171 @@ def ensure_bsdf_connection(material, latest_mix_rgb_visibility_node):
 
     # Ensure BSDF node is connected to the output node
     if principled_bsdf_node and principled_bsdf_node.outputs and output_node and output_node.inputs:
-        connected = any(link.from_node == principled_bsdf_node and link.to_node == output_node for link in links)
-        if not connected:
+        if not output_node.inputs[0].is_linked:
             try:
                 links.new(principled_bsdf_node.outputs[0], output_node.inputs[0])
             except IndexError as e:
                 print(f"Failed to create link: {principled_bsdf_node.name} [0] -> {output_node.name} [0]. Error: {e}")
 
 
-def delete_projection_nodes(camera_name):
+def scan_color_node(material, color):
+    """RGB node of the scan color, linked to cut the mix chain in constant time"""
+    node = material.node_tree.nodes.get(SCAN_COLOR_NODE_NAME)
+    if not node:
+        node = material.node_tree.nodes.new("ShaderNodeRGB")
+        node.name = SCAN_COLOR_NODE_NAME
+        node.location = (-450.0, 300.0)
+        node.hide = True
+        node.outputs[0].default_value = color
+    return node
+
+
+def activate_projection(material, mix_rgb_visibility_node, use_fallback=True):
+    """Mix the projection of mix_rgb_visibility_node over the previously active one.
+
+    Only the active mix node and its fallback stay connected, the others are
+    never sampled, so shading evaluates at most two projections. The active
+    and fallback nodes are remembered on the material and only the links of
+    these nodes change, switching costs the same whatever the shot count.
+    Without fallback the active shot is mixed over the scan color. UV Project
+    modifiers are likewise only evaluated for the active and fallback shots.
+    """
+    nodes = material.node_tree.nodes
+    links = material.node_tree.links
+    active_node = nodes.get(material.get(ACTIVE_PROJECTION_KEY, ""))
+    fallback_node = nodes.get(material.get(FALLBACK_PROJECTION_KEY, ""))
+    if active_node and active_node != mix_rgb_visibility_node:
+        fallback_node = active_node
+    if fallback_node == mix_rgb_visibility_node:
+        fallback_node = None
+
+    # Linking replaces the link already on the input, no need to search the links of the tree
+    scan_color = scan_color_node(material, mix_rgb_visibility_node.inputs[1].default_value)
+    if fallback_node:
+        links.new(scan_color.outputs[0], fallback_node.inputs[1])
+    if use_fallback and fallback_node:
+        links.new(fallback_node.outputs[0], mix_rgb_visibility_node.inputs[1])
+    else:
+        links.new(scan_color.outputs[0], mix_rgb_visibility_node.inputs[1])
+
+    material[ACTIVE_PROJECTION_KEY] = mix_rgb_visibility_node.name
+    material[FALLBACK_PROJECTION_KEY] = fallback_node.name if fallback_node else ""
+    ensure_bsdf_connection(material, mix_rgb_visibility_node)
+    update_uv_project_modifiers(bpy.context.scene, material)
+
+
+def delete_projection_nodes(shot):
     scene = bpy.context.scene
-    node_index = scene.camera_projection_nodes.find(camera_name)
+    node_index = node_registry.projection_entry_index(scene, shot.id)
     if node_index != -1:
         node_entry = scene.camera_projection_nodes[node_index]
         material = bpy.data.materials.get(node_entry.material_name)
         if material:
             nodes = material.node_tree.nodes
-            links = material.node_tree.links
             node_names = [node_entry.tex_coord_node,
                           node_entry.image_texture_node,
                           node_entry.camera_projector_group_node,
                           node_entry.mix_rgb_visibility_node,
-                          node_entry.multiply_visibility_node]
+                          node_entry.multiply_visibility_node,
+                          node_entry.coverage_attribute_node,
+                          node_entry.coverage_mask_node,
+                          node_entry.multiply_coverage_node,
+                          node_entry.uv_map_node]
 
             # principled_bsdf_node = find_node(nodes, 'BSDF_PRINCIPLED')
             # output_node = find_node(nodes, 'OUTPUT_MATERIAL')
 
-            # Find the previous and next ShaderNodeMixRGB nodes
-            prev_mix_rgb_visibility_node = None
-            next_mix_rgb_visibility_node = None
-            for i, proj_node in enumerate(scene.camera_projection_nodes):
-                if proj_node.name == camera_name:
-                    if i > 0:
-                        prev_proj_node = scene.camera_projection_nodes[i - 1]
-                        prev_mix_rgb_visibility_node = nodes.get(prev_proj_node.mix_rgb_visibility_node)
-                    if i < len(scene.camera_projection_nodes) - 1:
-                        next_proj_node = scene.camera_projection_nodes[i + 1]
-                        next_mix_rgb_visibility_node = nodes.get(next_proj_node.mix_rgb_visibility_node)
-                    break
-
             # Remove the nodes
             for node_name in node_names:
                 if node_name in nodes:
                     nodes.remove(nodes[node_name])
 
-            # Reconnect the previous mix node to the next mix node, if they exist
-            if prev_mix_rgb_visibility_node and next_mix_rgb_visibility_node:
-                # Remove the specific link from the deleted mix node to the next mix node
-                links_to_remove = [
-                    link for link in links 
-                    if (link.to_node == next_mix_rgb_visibility_node and 
-                        link.from_node.name == node_entry.mix_rgb_visibility_node)
-                ]
-                for link in links_to_remove:
-                    links.remove(link)
-
-                # Reconnect previous mix to next mix
-                try:
-                    links.new(prev_mix_rgb_visibility_node.outputs[0], next_mix_rgb_visibility_node.inputs[1])
-                except IndexError as e:
-                    print(f"Failed to create link: {prev_mix_rgb_visibility_node.name} \
-                          [0] -> {next_mix_rgb_visibility_node.name} [1]. Error: {e}")
-
-            # Find the latest ShaderNodeMixRGB node from remaining CameraProjectionNodes
-            latest_mix_rgb_visibility_node = None
-            for proj_node in reversed(scene.camera_projection_nodes):
-                if proj_node.name != camera_name:
-                    potential_mix_rgb_visibility_node = nodes.get(proj_node.mix_rgb_visibility_node)
-                    if potential_mix_rgb_visibility_node:
-                        latest_mix_rgb_visibility_node = potential_mix_rgb_visibility_node
-                        break
-
-            # Ensure the latest mix_rgb_visibility_node is connected to the BSDF node
-            ensure_bsdf_connection(material, latest_mix_rgb_visibility_node)
-
-        # Remove the entry from the scene collection
+            # Removing the fallback unlinks it, the active shot is then mixed over the scan color
+            if node_entry.mix_rgb_visibility_node == material.get(FALLBACK_PROJECTION_KEY):
+                material[FALLBACK_PROJECTION_KEY] = ""
+
+            # The fallback, or else the latest remaining shot, replaces a removed active shot
+            elif node_entry.mix_rgb_visibility_node == material.get(ACTIVE_PROJECTION_KEY):
+                new_active_node = nodes.get(material.get(FALLBACK_PROJECTION_KEY, ""))
+                if not new_active_node:
+                    new_active_node = next((
+                        nodes[proj_node.mix_rgb_visibility_node]
+                        for proj_node in reversed(scene.camera_projection_nodes)
+                        if proj_node.shot_id != shot.id and proj_node.material_name == node_entry.material_name
+                        and proj_node.mix_rgb_visibility_node in nodes
+                    ), None)
+                material[ACTIVE_PROJECTION_KEY] = ""
+                material[FALLBACK_PROJECTION_KEY] = ""
+                if new_active_node:
+                    activate_projection(material, new_active_node)
+
+        # Remove the entry from the scene collection, the indices after it shift
         scene.camera_projection_nodes.remove(node_index)
+        node_registry.invalidate()
 
 
-def reorder_projection_nodes(camera_name, mesh):
-    scene = bpy.context.scene
-
-    if not mesh:
-        print("Error: Mesh not provided or not found.")
+def reorder_projection_nodes(shot, use_fallback=True):
+    """Make the projection of shot the active one of its material"""
+    material, node_entry = node_registry.projection_material(bpy.context.scene, shot)
+    if not material:
+        print(f"Error: No projection nodes found for shot '{shot.name}'.")
         return
 
-    print("Current camera_projection_nodes:")
-    for entry in scene.camera_projection_nodes:
-        print(f" - Camera: {entry.name}, Material: {entry.material_name}, Mix Node: {entry.mix_rgb_visibility_node}")
+    mix_rgb_visibility_node = material.node_tree.nodes.get(node_entry.mix_rgb_visibility_node)
+    if mix_rgb_visibility_node:
+        activate_projection(material, mix_rgb_visibility_node, use_fallback)
+
 
-    # Filter the nodes to only include those related to the provided mesh
-    mesh_materials = [mat.name for mat in mesh.data.materials]
-    relevant_nodes = [entry for entry in scene.camera_projection_nodes if entry.material_name in mesh_materials]
+def link_shot_coverage(shot, attribute_name):
+    """Mask the projection of shot with its coverage attribute.
 
-    if not relevant_nodes:
-        print(f"Error: No projection nodes found for the mesh '{mesh.name}'.")
+    Surfaces the shot never sees get a zero visibility factor, so the texture
+    of the shot doesn't bleed onto them.
+    """
+    material, node_entry = node_registry.projection_material(bpy.context.scene, shot)
+    if not material:
+        print(f"Error: No projection nodes found for shot '{shot.name}'.")
         return
 
-    # Find the specified CameraProjectionNodes entry
-    node_entry = None
-    for entry in relevant_nodes:
-        if entry.name == camera_name:
-            node_entry = entry
-            break
+    nodes = material.node_tree.nodes
+    attribute_node = nodes.get(node_entry.coverage_attribute_node)
+    if attribute_node:
+        attribute_node.attribute_name = attribute_name
+        return
 
-    if not node_entry:
-        print(f"Error: Camera '{camera_name}' not found in relevant projection nodes.")
+    multiply_visibility_node = nodes.get(node_entry.multiply_visibility_node)
+    mix_rgb_visibility_node = nodes.get(node_entry.mix_rgb_visibility_node)
+    if not multiply_visibility_node or not mix_rgb_visibility_node:
         return
 
-    print(f"Reordering nodes with '{camera_name}' as the first camera.")
-
-    # Create a list of node entries ordered with the specified camera first and then reverse the order
-    ordered_nodes = [node_entry] + [entry for entry in relevant_nodes if entry.name != camera_name]
-    ordered_nodes.reverse()
-
-    print("Ordered nodes (inverted):")
-    for entry in ordered_nodes:
-        print(f" - Camera: {entry.name}, Material: {entry.material_name}, Mix Node: {entry.mix_rgb_visibility_node}")
-
-    # Collect valid entries
-    valid_entries = []
-    for entry in ordered_nodes:
-        if entry.name and entry.material_name and entry.mix_rgb_visibility_node:
-            valid_entries.append({
-                'name': entry.name,
-                'material_name': entry.material_name,
-                'tex_coord_node': entry.tex_coord_node,
-                'image_texture_node': entry.image_texture_node,
-                'camera_projector_group_node': entry.camera_projector_group_node,
-                'mix_rgb_visibility_node': entry.mix_rgb_visibility_node,
-                'multiply_visibility_node': entry.multiply_visibility_node
-            })
-            print(f"Valid entry found: Camera: {entry.name}, \
-                  Material: {entry.material_name}, \
-                    Mix Node: {entry.mix_rgb_visibility_node}")
-        else:
-            print(f"Invalid entry found: Camera: {entry.name}, \
-                  Material: {entry.material_name}, \
-                    Mix Node: {entry.mix_rgb_visibility_node}")
-
-    print(f"Valid entries before clearing: {len(valid_entries)}")
-
-    # Remove relevant nodes by index
-    indices_to_remove = [i for i, entry in enumerate(scene.camera_projection_nodes) if entry in relevant_nodes]
-    for index in reversed(indices_to_remove):
-        scene.camera_projection_nodes.remove(index)
-
-    # Re-add valid entries
-    for entry in valid_entries:
-        new_entry = scene.camera_projection_nodes.add()
-        new_entry.name = entry['name']
-        new_entry.material_name = entry['material_name']
-        new_entry.tex_coord_node = entry['tex_coord_node']
-        new_entry.image_texture_node = entry['image_texture_node']
-        new_entry.camera_projector_group_node = entry['camera_projector_group_node']
-        new_entry.mix_rgb_visibility_node = entry['mix_rgb_visibility_node']
-        new_entry.multiply_visibility_node = entry['multiply_visibility_node']
-        print(f"Re-added valid entry: Camera: {new_entry.name}, \
-              Material: {new_entry.material_name}, \
-                Mix Node: {new_entry.mix_rgb_visibility_node}")
-
-    print(f"Entries after clearing and re-adding: {len(scene.camera_projection_nodes)}")
-
-    # Disconnect the input [1] of the first mix RGB node from the relevant nodes
-    if valid_entries:
-        first_node_entry = valid_entries[0]
-        first_material = bpy.data.materials.get(first_node_entry['material_name'])
-        if first_material and first_material.node_tree:
-            nodes = first_material.node_tree.nodes
-            first_mix_rgb_visibility_node = nodes.get(first_node_entry['mix_rgb_visibility_node'])
-            if first_mix_rgb_visibility_node:
-                # Remove links to input [1] of the first mix RGB node
-                links_to_remove = [
-                    link for link in first_material.node_tree.links
-                    if link.to_node == first_mix_rgb_visibility_node and 
-                    link.to_socket == first_mix_rgb_visibility_node.inputs[1]
-                ]
-                for link in links_to_remove:
-                    first_material.node_tree.links.remove(link)
-                print(f"Disconnected input [1] of the first mix RGB node: {first_mix_rgb_visibility_node.name}")
-
-    # Reconnect the nodes in the material node tree
-    prev_mix_rgb_visibility_node = None
-    for entry in valid_entries:
-        material = bpy.data.materials.get(entry['material_name'])
-        if not material or not material.node_tree:
-            print(f"Error: Material '{entry['material_name']}' not found or has no node tree.")
-            continue
-
-        nodes = material.node_tree.nodes
-        mix_rgb_visibility_node = nodes.get(entry['mix_rgb_visibility_node'])
-        if prev_mix_rgb_visibility_node and mix_rgb_visibility_node:
-            # Remove the existing link from the previous mix node to the current mix node
-            links_to_remove = [
-                link for link in material.node_tree.links 
-                if link.to_node == mix_rgb_visibility_node and link.from_node == prev_mix_rgb_visibility_node
-            ]
-            for link in links_to_remove:
-                material.node_tree.links.remove(link)
-
-            # Create a new link from the previous mix node to the current mix node
-            try:
-                material.node_tree.links.new(prev_mix_rgb_visibility_node.outputs[0], mix_rgb_visibility_node.inputs[1])
-                print(f"Linked {prev_mix_rgb_visibility_node.name} to {mix_rgb_visibility_node.name}")
-            except IndexError as e:
-                print(f"Failed to create link: {prev_mix_rgb_visibility_node.name} \
-                      [0] -> {mix_rgb_visibility_node.name} [1]. Error: {e}")
+    x, y = multiply_visibility_node.location
+    attribute_node = nodes.new("ShaderNodeAttribute")
+    attribute_node.location = (x - 250.0, y - 120.0)
+    attribute_node.attribute_type = 'GEOMETRY'
+    attribute_node.attribute_name = attribute_name
+    attribute_node.name = "CoverageAttributeNode"
 
-        prev_mix_rgb_visibility_node = mix_rgb_visibility_node
+    coverage_mask_node = nodes.new("ShaderNodeMath")
+    coverage_mask_node.location = (x, y - 120.0)
+    coverage_mask_node.operation = 'GREATER_THAN'
+    coverage_mask_node.inputs[1].default_value = 0.0
+    coverage_mask_node.name = "CoverageMaskNode"
+    coverage_mask_node.hide = True
 
-    # Ensure the latest mix_rgb_visibility_node is connected to the BSDF node
-    if prev_mix_rgb_visibility_node:
-        last_entry = valid_entries[-1]
-        material = bpy.data.materials.get(last_entry['material_name'])
-        latest_mix_rgb_visibility_node = None
-        if material and material.node_tree:
-            nodes = material.node_tree.nodes
-            latest_mix_rgb_visibility_node = nodes.get(last_entry['mix_rgb_visibility_node'])
+    multiply_coverage_node = nodes.new("ShaderNodeMath")
+    multiply_coverage_node.location = (x + 100.0, y - 60.0)
+    multiply_coverage_node.operation = 'MULTIPLY'
+    multiply_coverage_node.name = "MultiplyCoverageNode"
+    multiply_coverage_node.hide = True
+
+    create_link(material.node_tree, attribute_node, "Fac", coverage_mask_node, 0)
+    create_link(material.node_tree, multiply_visibility_node, 0, multiply_coverage_node, 0)
+    create_link(material.node_tree, coverage_mask_node, 0, multiply_coverage_node, 1)
+    create_link(material.node_tree, multiply_coverage_node, 0, mix_rgb_visibility_node, 0)
 
-        ensure_bsdf_connection(material, latest_mix_rgb_visibility_node)
+    node_entry.coverage_attribute_node = attribute_node.name
+    node_entry.coverage_mask_node = coverage_mask_node.name
+    node_entry.multiply_coverage_node = multiply_coverage_node.name
 
 
 def register():
@@ -499,9 +452,15 @@ def unregister():
 
 
 class CameraProjectionNodes(PropertyGroup):
+    # OmniShot.id of the shot, the name is the camera name at creation and goes stale on renames
+    shot_id: IntProperty()
     material_name: StringProperty()
     tex_coord_node: StringProperty()
     image_texture_node: StringProperty()
     camera_projector_group_node: StringProperty()
     mix_rgb_visibility_node: StringProperty()
     multiply_visibility_node: StringProperty()
+    coverage_attribute_node: StringProperty()
+    coverage_mask_node: StringProperty()
+    multiply_coverage_node: StringProperty()
+    uv_map_node: StringProperty()
@@ -0,0 +1,146 @@
+"""Projection nodes of every shot keyed by OmniShot.id, so lookups survive camera renames.
+
+The registry only holds entry indices and node names, never Blender data,
+so undo and file loads can't leave it pointing to freed memory. A stale
+index is detected on lookup and triggers a rebuild.
+"""
+
+import bpy
+from bpy.app.handlers import persistent
+from .utils import find_node
+
+# Material custom properties naming the mix nodes of the active shot and of its fallback
+ACTIVE_PROJECTION_KEY = "omni_active_projection"
+FALLBACK_PROJECTION_KEY = "omni_fallback_projection"
+
+# Scene name -> {shot id: index of its CameraProjectionNodes entry}, None until built
+_entry_indices = None
+# Scene name -> number of CameraProjectionNodes entries when _entry_indices was built
+_entry_counts = {}
+# Material name -> {node type: node name} of the nodes shared by the shots of a material
+_material_nodes = {}
+
+
+def invalidate():
+    global _entry_indices
+    _entry_indices = None
+    _entry_counts.clear()
+    _material_nodes.clear()
+
+
+def rebuild():
+    """Index the projection entries of every scene in one pass.
+
+    Entries made before shot ids were stored are matched to their shot by camera name once.
+    """
+    global _entry_indices
+    _entry_indices = {}
+    _entry_counts.clear()
+    _material_nodes.clear()
+    for scene in bpy.data.scenes:
+        camera_shot_ids = None
+        _entry_counts[scene.name] = len(scene.camera_projection_nodes)
+        indices = _entry_indices.setdefault(scene.name, {})
+        for index, entry in enumerate(scene.camera_projection_nodes):
+            if not entry.shot_id:
+                if camera_shot_ids is None:
+                    camera_shot_ids = {shot.camera.name: shot.id
+                                       for collection in scene.Omni_Collections
+                                       for shot in collection.shots if shot.camera}
+                shot_id = camera_shot_ids.get(entry.name, 0)
+                try:
+                    entry.shot_id = shot_id
+                except AttributeError:
+                    # Data can't be written while drawing, the entry is matched again next rebuild
+                    pass
+            else:
+                shot_id = entry.shot_id
+            if shot_id:
+                indices[shot_id] = index
+
+
+def is_indexed(scene):
+    """Whether every entry of scene is indexed, False once the scene is renamed or entries are added elsewhere"""
+    return _entry_counts.get(scene.name) == len(scene.camera_projection_nodes)
+
+
+def projection_entry(scene, shot_id):
+    """CameraProjectionNodes entry of the shot with shot_id, None if it has no projection.
+
+    A miss only rebuilds when the scene isn't fully indexed, so shots without
+    a projection stay cheap to look up.
+    """
+    rebuilt = _entry_indices is None
+    if rebuilt or (shot_id not in _entry_indices.get(scene.name, {}) and not is_indexed(scene)):
+        rebuild()
+        rebuilt = True
+
+    while True:
+        index = _entry_indices.get(scene.name, {}).get(shot_id)
+        if index is None:
+            return None
+        if index < len(scene.camera_projection_nodes):
+            entry = scene.camera_projection_nodes[index]
+            if entry.shot_id == shot_id:
+                return entry
+        if rebuilt:
+            return None
+        rebuild()
+        rebuilt = True
+
+
+def projection_entry_index(scene, shot_id):
+    """Index of the CameraProjectionNodes entry of the shot with shot_id, -1 if it has no projection"""
+    if projection_entry(scene, shot_id) is None:
+        return -1
+    return _entry_indices[scene.name][shot_id]
+
+
+def projection_material(scene, shot):
+    """(material, CameraProjectionNodes entry) of the projection of shot, (None, None) without one"""
+    node_entry = projection_entry(scene, shot.id)
+    material = bpy.data.materials.get(node_entry.material_name) if node_entry else None
+    if not material or not material.node_tree:
+        return None, None
+    return material, node_entry
+
+
+def mixed_projection_nodes(material):
+    """Names of the mix nodes of the active shot of material and of its fallback"""
+    names = (material.get(ACTIVE_PROJECTION_KEY, ""), material.get(FALLBACK_PROJECTION_KEY, ""))
+    return {name for name in names if name}
+
+
+def material_node(material, node_type):
+    """First node of node_type in material, the nodes are only scanned when the cached name is stale"""
+    nodes = material.node_tree.nodes
+    names = _material_nodes.setdefault(material.name, {})
+    node = nodes.get(names.get(node_type, ""))
+    if node is None or node.type != node_type:
+        node = find_node(nodes, node_type)
+        if node:
+            names[node_type] = node.name
+    return node
+
+
+@persistent
+def rebuild_on_load(dummy):
+    rebuild()
+
+
+@persistent
+def invalidate_on_undo(scene, dummy=None):
+    invalidate()
+
+
+def register():
+    bpy.app.handlers.load_post.append(rebuild_on_load)
+    bpy.app.handlers.undo_post.append(invalidate_on_undo)
+    bpy.app.handlers.redo_post.append(invalidate_on_undo)
+
+
+def unregister():
+    bpy.app.handlers.load_post.remove(rebuild_on_load)
+    bpy.app.handlers.undo_post.remove(invalidate_on_undo)
+    bpy.app.handlers.redo_post.remove(invalidate_on_undo)
+    invalidate()
@@ -0,0 +1,155 @@
+import bpy
+from .node_registry import projection_material
+from .utils import find_node
+from ..bulkKeyframes import clear_keyframes, find_fcurve, read_keyframes, write_property_keyframes
+
+PROJECTION_GROUP_NAME = "CameraProjector_Omni"
+SCAN_COLOR_NODE_NAME = "ScanColorNode"
+
+
+def set_socket_value(socket, value):
+    """Assign value only when it changes, every assignment tags the material for an update"""
+    current = socket.default_value
+    if hasattr(current, "__len__"):
+        if tuple(current) == tuple(value):
+            return
+    elif current == value:
+        return
+    socket.default_value = value
+
+
+def set_projection_resolution(resolution_x, resolution_y):
+    node_group = bpy.data.node_groups.get(PROJECTION_GROUP_NAME)
+    if not node_group:
+        return
+    for name, value in (("X Resolution", resolution_x), ("Y Resolution", resolution_y)):
+        node = node_group.nodes.get(name)
+        if node:
+            set_socket_value(node.outputs[0], float(value))
+
+
+def copy_lens_animation(camera, material, group_node):
+    """Give the projector group the lens of camera, copying its focal length F-Curve when animated"""
+    camera_data = camera.data
+    focal_length = group_node.inputs["Focal Length"]
+    data_path = f'nodes["{group_node.name}"].inputs[{list(group_node.inputs).index(focal_length)}].default_value'
+    set_socket_value(group_node.inputs["Sensor Size"], camera_data.sensor_width)
+
+    anim = camera_data.animation_data
+    fcurve = find_fcurve(anim.action, "lens") if anim and anim.action else None
+    if fcurve is None or not len(fcurve.keyframe_points):
+        # The lens may have been animated on a previous copy
+        node_anim = material.node_tree.animation_data
+        stale_fcurve = find_fcurve(node_anim.action, data_path) if node_anim and node_anim.action else None
+        if stale_fcurve:
+            clear_keyframes(stale_fcurve)
+        set_socket_value(focal_length, camera_data.lens)
+        return
+
+    frames, values = read_keyframes(fcurve)
+    write_property_keyframes(material.node_tree,
+                             data_path,
+                             frames,
+                             values,
+                             interpolation=fcurve.keyframe_points[0].interpolation)
+
+
+def update_projection_lenses(scene, depsgraph):
+    """Copy the lens of shot cameras edited since the last update again, the projector group doesn't follow it"""
+    updated = {update.id.original for update in depsgraph.updates
+               if isinstance(update.id, (bpy.types.Camera, bpy.types.Action))}
+    if not updated:
+        return
+
+    for omni_collection in scene.Omni_Collections:
+        for shot in omni_collection.shots:
+            camera_data = shot.camera.data if shot.camera else None
+            if camera_data is None:
+                continue
+            anim = camera_data.animation_data
+            if camera_data not in updated and not (anim and anim.action in updated):
+                continue
+            material, node_entry = projection_material(scene, shot)
+            group_node = material.node_tree.nodes.get(node_entry.camera_projector_group_node) if material else None
+            if group_node:
+                copy_lens_animation(shot.camera, material, group_node)
+
+
+def set_projection_multiply(scene, shot):
+    material, node_entry = projection_material(scene, shot)
+    if material:
+        node = material.node_tree.nodes.get(node_entry.multiply_visibility_node)
+        if node:
+            set_socket_value(node.inputs[1], shot.camera_projection_multiply)
+
+
+def collection_materials(scene, omni_collection):
+    """Projection materials of the shots of omni_collection with their entries"""
+    for shot in omni_collection.shots:
+        material, node_entry = projection_material(scene, shot)
+        if material:
+            yield material, node_entry
+
+
+def set_scan_color(scene, omni_collection):
+    """Color of the scan where no shot projects, on both colors of every mix node"""
+    color = (*omni_collection.color_scan, 1.0)
+    for material, node_entry in collection_materials(scene, omni_collection):
+        nodes = material.node_tree.nodes
+        node = nodes.get(node_entry.mix_rgb_visibility_node)
+        if node:
+            set_socket_value(node.inputs[1], color)
+            set_socket_value(node.inputs[2], color)
+        scan_color_node = nodes.get(SCAN_COLOR_NODE_NAME)
+        if scan_color_node:
+            set_socket_value(scan_color_node.outputs[0], color)
+
+
+def set_emission(scene, omni_collection):
+    for material, _ in collection_materials(scene, omni_collection):
+        nodes = material.node_tree.nodes
+        value_node = find_node(nodes, 'VALUE', 'ValueEmissionNode')
+        if value_node:
+            set_socket_value(value_node.outputs[0], omni_collection.emission_value)
+        mix_rgb_emission_node = find_node(nodes, 'MIX_RGB', 'MixRGBEmissionNode')
+        if mix_rgb_emission_node:
+            set_socket_value(mix_rgb_emission_node.inputs[0], omni_collection.mix_rgb_emission_input)
+
+
+def remove_node_drivers(node_tree):
+    """Remove the drivers of the node sockets of node_tree, returns how many were removed"""
+    anim = node_tree.animation_data if node_tree else None
+    if not anim:
+        return 0
+    drivers = [fcurve for fcurve in anim.drivers if fcurve.data_path.startswith("nodes[")]
+    for fcurve in drivers:
+        anim.drivers.remove(fcurve)
+    return len(drivers)
+
+
+def migrate_projection_drivers(scene):
+    """Replace the drivers of projections made by earlier versions with plain values.
+
+    Returns the number of migrated materials.
+    """
+    remove_node_drivers(bpy.data.node_groups.get(PROJECTION_GROUP_NAME))
+    migrated = set()
+    for omni_collection in scene.Omni_Collections:
+        for shot in omni_collection.shots:
+            material, node_entry = projection_material(scene, shot)
+            if not material or not shot.camera:
+                continue
+            if remove_node_drivers(material.node_tree):
+                migrated.add(material)
+            if material not in migrated:
+                continue
+
+            group_node = material.node_tree.nodes.get(node_entry.camera_projector_group_node)
+            if group_node:
+                copy_lens_animation(shot.camera, material, group_node)
+            set_projection_multiply(scene, shot)
+        set_scan_color(scene, omni_collection)
+        set_emission(scene, omni_collection)
+
+    set_projection_resolution(scene.render.resolution_x, scene.render.resolution_y)
+    return len(migrated)
@@ -1,4 +1,5 @@
 import bpy
+from .utils import hide_specific_nodes
 
 
 def is_blender_4():
@@ -129,17 +130,10 @@ def create_projection_shader_group():
     create_link_in_group(node_group, group_input_node, 1, math_divide_3, 0)
     create_link_in_group(node_group, group_input_node, 2, math_divide_3, 1)
 
-    def add_driver(socket, data_path):
-        driver = socket.driver_add("default_value").driver
-        driver.type = 'SCRIPTED'
-        var = driver.variables.new()
-        var.name = 'resolution'
-        var.targets[0].id_type = 'SCENE'
-        var.targets[0].id = bpy.context.scene
-        var.targets[0].data_path = data_path
-        driver.expression = var.name
-
-    add_driver(x_res_node.outputs[0], "render.resolution_x")
-    add_driver(y_res_node.outputs[0], "render.resolution_y")
+    hide_specific_nodes(node_group, {"ShaderNodeMath"})
+
+    # Kept up to date with the render resolution by the depsgraph handler, see set_projection_resolution
+    x_res_node.outputs[0].default_value = bpy.context.scene.render.resolution_x
+    y_res_node.outputs[0].default_value = bpy.context.scene.render.resolution_y
 
     return node_group
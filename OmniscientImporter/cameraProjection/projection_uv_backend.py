@@ -0,0 +1,121 @@
+from .node_registry import mixed_projection_nodes, projection_entry, projection_material
+from .utils import create_link
+from ..scanLod import scan_meshes
+
+PROJECTION_BACKENDS = [
+    ('SHADER', "Shader", "Project the plate per shading sample with the CameraProjector_Omni node group"),
+    ('UV_PROJECT', "UV Project", "Project the plate per vertex once per frame with a UV Project modifier"),
+]
+
+UV_PROJECT_MODIFIER_PREFIX = "Omni UV Project "
+
+
+def projection_uv_map_name(shot_id):
+    """UV map of the shot with shot_id, named after the id so camera renames don't orphan it"""
+    return f"Omni_Shot_{shot_id}"
+
+
+def ensure_uv_map(mesh, uv_map):
+    """Add the UV map the modifier writes to without changing the active UV map"""
+    if uv_map in mesh.uv_layers:
+        return
+    active_index = mesh.uv_layers.active_index
+    mesh.uv_layers.new(name=uv_map)
+    if active_index >= 0:
+        mesh.uv_layers.active_index = active_index
+
+
+def ensure_uv_project_modifier(obj, camera, uv_map, resolution_x, resolution_y):
+    """UV Project modifier of obj projecting from camera into uv_map"""
+    for mesh in scan_meshes(obj):
+        ensure_uv_map(mesh, uv_map)
+
+    name = UV_PROJECT_MODIFIER_PREFIX + uv_map
+    modifier = obj.modifiers.get(name) or obj.modifiers.new(name, 'UV_PROJECT')
+    modifier.uv_layer = uv_map
+    modifier.projector_count = 1
+    modifier.projectors[0].object = camera
+    modifier.aspect_x = resolution_x / resolution_y
+    modifier.aspect_y = 1.0
+    return modifier
+
+
+def projection_objects(shot):
+    """Scan objects with faces, points have no face corners to write UVs to"""
+    objects = [chunk.obj for chunk in shot.geometry_chunks if chunk.obj] or [shot.mesh]
+    return [obj for obj in objects if obj and obj.type == 'MESH' and obj.data.polygons]
+
+
+def set_uv_project_modifiers_enabled(shot, enabled):
+    name = UV_PROJECT_MODIFIER_PREFIX + projection_uv_map_name(shot.id)
+    for obj in projection_objects(shot):
+        modifier = obj.modifiers.get(name)
+        # Toggling a modifier re-evaluates the object, only write changes
+        if modifier and (modifier.show_viewport, modifier.show_render) != (enabled, enabled):
+            modifier.show_viewport = enabled
+            modifier.show_render = enabled
+
+
+def update_uv_project_modifiers(scene, material):
+    """Only evaluate the UV Project modifiers of the shots material mixes, the others are never sampled"""
+    mixed_nodes = mixed_projection_nodes(material)
+    for collection in scene.Omni_Collections:
+        for shot in collection.shots:
+            if shot.projection_backend != 'UV_PROJECT':
+                continue
+            node_entry = projection_entry(scene, shot.id)
+            if node_entry and node_entry.material_name == material.name:
+                set_uv_project_modifiers_enabled(shot, node_entry.mix_rgb_visibility_node in mixed_nodes)
+
+
+def set_projection_backend(scene, shot):
+    """Feed the image node of shot from its projection backend, only that backend is evaluated.
+
+    The UV Project modifiers only run while the shot is active or the fallback of the active shot.
+    """
+    camera = shot.camera
+    material, node_entry = projection_material(scene, shot)
+    if not material or not camera:
+        print(f"Error: No projection nodes found for shot '{shot.name}'.")
+        return
+
+    nodes = material.node_tree.nodes
+    image_texture_node = nodes.get(node_entry.image_texture_node)
+    if not image_texture_node:
+        return
+
+    use_uv_project = shot.projection_backend == 'UV_PROJECT'
+    uv_map = projection_uv_map_name(shot.id)
+    if use_uv_project:
+        for obj in projection_objects(shot):
+            ensure_uv_project_modifier(obj, camera, uv_map, shot.resolution_x, shot.resolution_y)
+    set_uv_project_modifiers_enabled(
+        shot, use_uv_project and node_entry.mix_rgb_visibility_node in mixed_projection_nodes(material))
+
+    if use_uv_project:
+        uv_map_node = nodes.get(node_entry.uv_map_node)
+        if not uv_map_node:
+            uv_map_node = nodes.new("ShaderNodeUVMap")
+            uv_map_node.location = (image_texture_node.location.x - 250.0, image_texture_node.location.y - 150.0)
+            uv_map_node.name = "UVProjectMapNode"
+            uv_map_node.hide = True
+            node_entry.uv_map_node = uv_map_node.name
+        uv_map_node.uv_map = uv_map
+        create_link(material.node_tree, uv_map_node, 0, image_texture_node, 0)
+    else:
+        camera_projector_group_node = nodes.get(node_entry.camera_projector_group_node)
+        if camera_projector_group_node:
+            create_link(material.node_tree, camera_projector_group_node, 0, image_texture_node, 0)
+
+
+def remove_uv_project_modifiers(shot):
+    uv_map = projection_uv_map_name(shot.id)
+    name = UV_PROJECT_MODIFIER_PREFIX + uv_map
+    for obj in projection_objects(shot):
+        modifier = obj.modifiers.get(name)
+        if modifier:
+            obj.modifiers.remove(modifier)
+        for mesh in scan_meshes(obj):
+            uv_layer = mesh.uv_layers.get(uv_map)
+            if uv_layer:
+                mesh.uv_layers.remove(uv_layer)
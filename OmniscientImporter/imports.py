@@ -1,11 +1,14 @@
 import bpy
+import os
 from bpy_extras.io_utils import ImportHelper
-from bpy.props import StringProperty
-from bpy.types import Operator
-from .omniHandler import loadOmni
+from bpy.props import StringProperty, CollectionProperty
+from bpy.types import Operator, OperatorFileListElement
+from .omniHandler import get_current_version_str, import_preflights, resolve_missing_media
+from .omniPreflight import preflight_omni_files
+from .mediaIndex import parse_search_paths
 
 class ImportOmniOperator(Operator, ImportHelper):
-    """Import a .omni file"""
+    """Import .omni files, or every .omni file of a folder when no file is selected"""
     bl_idname = "import_scene.omni"
     bl_label = "Import .omni"
     bl_options = {'UNDO'}
@@ -20,13 +23,52 @@ class ImportOmniOperator(Operator, ImportHelper):
 
     filepath: StringProperty(subtype='FILE_PATH', options={'SKIP_SAVE'})
 
+    # Multi-selection in the file browser and multi-file drag & drop
+    files: CollectionProperty(type=OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+    directory: StringProperty(subtype='DIR_PATH', options={'HIDDEN', 'SKIP_SAVE'})
+
+    def get_omni_files(self):
+        if self.directory:
+            file_names = [file.name for file in self.files if file.name]
+            if not file_names:
+                # No file selected, import the whole folder
+                file_names = sorted(name for name in os.listdir(self.directory)
+                                    if name.lower().endswith(self.filename_ext))
+            return [os.path.join(self.directory, name) for name in file_names]
+
+        if self.filepath:
+            return [self.filepath]
+        return []
+
     def execute(self, context):
-        # Call the loadOmni function with the filepath specified in the operator
-        loadOmni(self, self.filepath)
+        try:
+            omni_files = self.get_omni_files()
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not list {self.directory}: {e}")
+            return {'CANCELLED'}
+
+        if not omni_files:
+            self.report({'ERROR'}, "No .omni file to import")
+            return {'CANCELLED'}
+
+        # Parsing, file checks and hashing run in worker threads
+        prefs = context.preferences.addons[__package__].preferences
+        preflights = preflight_omni_files(omni_files,
+                                          get_current_version_str(),
+                                          prefs.use_frame_cache,
+                                          parse_search_paths(prefs.media_search_paths))
+
+        # Scenes are built on the main thread, the whole batch being a single undo step
+        imported_count, missing_media = import_preflights(self, preflights)
+
+        if len(omni_files) > 1:
+            self.report({'INFO'}, f"Imported {imported_count} of {len(omni_files)} .omni files")
+        # A single dialog for the media missing across the batch
+        resolve_missing_media(missing_media)
         return {'FINISHED'}
 
     def invoke(self, context, event):
-        if self.filepath:
+        if self.filepath or self.files:
             return self.execute(context)
         context.window_manager.fileselect_add(self)
         return {'RUNNING_MODAL'}
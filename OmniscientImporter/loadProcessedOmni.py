@@ -1,18 +1,32 @@
 import bpy
-from .cameraProjection.cameraProjectionMaterial import create_projection_shader
+from .cameraProjection.cameraProjectionMaterial import create_projection_shader, link_shot_coverage
 from .setupCompositingNodes import setup_compositing_nodes
 from .ui.utils import set_scene_fps, get_scene_fps
+from .bulkKeyframes import write_property_keyframes
+from .renderAction import create_render_action
+from .meshReader import MESH_EXTENSIONS, MeshReadError, read_mesh
+from .scanCleanup import clean_mesh, decimate_vertex_clustering
+from .scanGrid import split_mesh_grid
+from .scanLod import assign_scan_material, set_scan_lod
+from .scanMesh import (POINTS_NODE_GROUP_NAME, create_mesh, create_mesh_object, create_point_cloud_object,
+                       get_points_node_group, point_data_size, set_points_material)
+from .scanVisibility import apply_shot_visibility, compute_shot_visibility
+from .shotCoverage import compute_shot_coverage, coverage_attribute_name
+from .usdCamera import USD_EXTENSIONS, UsdCameraError, import_usd_camera, is_usd_available
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 
-def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camera_fps=None, camera_settings=None):
+def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camera_fps=None, camera_settings=None,
+                      geo_filepaths=None):
     scene = bpy.context.scene
     scene.is_processing_shot = True
 
-    def get_base_name(filepath):
-        return os.path.splitext(os.path.basename(filepath))[0]
+    # geo_filepath is the first of the scan chunks
+    geo_filepaths = geo_filepaths or [geo_filepath]
 
-    base_name = get_base_name(geo_filepath).split('.')[0]
+    base_name = get_scan_name(geo_filepath)
+    chunk_names = [get_scan_name(filepath) for filepath in geo_filepaths]
 
     def names_match(name1, name2):
         return name1.split('.')[0] == name2.split('.')[0]
@@ -49,43 +63,21 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
 
     # If a matching mesh exists, skip importing the mesh and just import the camera
     if existing_omniscient_collection is None:
-        # Capture the initial state of mesh objects in the scene
-        initial_mesh_state = capture_mesh_state()
-
-        # Import the geo file into the blender scene
-        # .obj
-        if geo_filepath.endswith('.obj'):
-            # Get Blender version
-            major, minor, patch = bpy.app.version
-
-            if major >= 4:
-                # For Blender 4.0 and above
-                bpy.ops.wm.obj_import(filepath=geo_filepath)
-            else:
-                # For Blender versions before 4.0
-                bpy.ops.import_scene.obj(filepath=geo_filepath)
-
-        # .usd / .usdc / .usda
-        elif geo_filepath.endswith(('.usd', '.usdc', '.usda')):
-            bpy.ops.wm.usd_import(filepath=geo_filepath)
-        # .ply
-        elif geo_filepath.endswith('.ply'):
-            bpy.ops.import_mesh.ply(filepath=geo_filepath)
-        # .stl
-        elif geo_filepath.endswith('.stl'):
-            bpy.ops.import_mesh.stl(filepath=geo_filepath)
-
-        # Find the newly imported mesh
-        imported_mesh = find_new_mesh(initial_mesh_state)
-
-        if imported_mesh:
-            move_to_collection(imported_mesh, omniscient_collection)
-            set_shade_smooth(imported_mesh)
-
-    # Import the camera file into the blender scene
-    initial_camera_state = capture_camera_state()
-    import_camera(self, camera_filepath)
-    imported_cam = find_new_camera(initial_camera_state)
+        scan_chunks = import_geometry(self, geo_filepaths)
+        for chunk_object, _ in scan_chunks:
+            move_to_collection(chunk_object, omniscient_collection)
+        imported_mesh = scan_chunks[0][0] if scan_chunks else None
+    else:
+        # Reuse the chunks imported with an earlier shot of the same scan
+        scan_chunks = []
+        for obj in omniscient_collection.objects:
+            if obj.type != 'MESH':
+                continue
+            for chunk_name, chunk_filepath in zip(chunk_names, geo_filepaths):
+                if names_match(obj.name, chunk_name):
+                    scan_chunks.append((obj, chunk_filepath))
+                    break
+    chunk_objects = [chunk_object for chunk_object, _ in scan_chunks]
 
     # Ensure camera_fps is a float or None if not provided or conversion fails
     try:
@@ -124,6 +116,9 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
     bpy.context.scene.render.resolution_y = height
     set_scene_fps(bpy.context.scene, clip_fps)
 
+    # Import the camera file into the blender scene, once the scene has the frame rate of the clip
+    imported_cam = import_camera(self, camera_filepath, camera_fps)
+
     # Setting scene's start and end frames to match the video clip's duration
     bpy.context.scene.frame_start = 1
     bpy.context.scene.frame_end = frame_duration
@@ -160,9 +155,17 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
 
     # Store the shot settings
     shot = omni_collection.shots.add()
+    # The projection nodes of the shot are registered under its id
+    shot.assign_id()
     shot.camera = imported_cam
     shot.mesh = imported_mesh
     shot.video = img
+    shot.camera_filepath = camera_filepath
+    shot.geometry_filepath = geo_filepath
+    for chunk_object, chunk_filepath in scan_chunks:
+        chunk = shot.geometry_chunks.add()
+        chunk.obj = chunk_object
+        chunk.filepath = chunk_filepath
     shot.fps = clip_fps
     shot.frame_start = 1
     shot.frame_end = frame_duration
@@ -174,6 +177,7 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
 
     # Initialize material
     material = None
+    removed_keys = 0
 
     if imported_cam:
         bpy.context.scene.Camera_Omni = imported_cam
@@ -191,7 +195,7 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
         # If vertical change sensor fit to vertical since auto mode isn't reliable
         if width < height:
             imported_cam.data.sensor_fit = 'VERTICAL'
-        apply_camera_settings(imported_cam, camera_settings)
+        removed_keys = apply_camera_settings(imported_cam, camera_settings, prefs.keyframe_tolerance)
 
         # Create a unique material name
         material_name = f"Scan_Material_Omni_{base_name}"
@@ -206,21 +210,21 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
 
     if imported_mesh:
         bpy.context.scene.Scan_Omni = imported_mesh
+
+    for chunk_object in chunk_objects:
         if prefs.use_shadow_catcher and prefs.renderer == 'CYCLES':
-            imported_mesh.is_shadow_catcher = True
-            imported_mesh.is_holdout = False  # Ensure holdout is disabled if shadow catcher is enabled
+            chunk_object.is_shadow_catcher = True
+            chunk_object.is_holdout = False  # Ensure holdout is disabled if shadow catcher is enabled
         elif prefs.use_holdout:
-            imported_mesh.is_holdout = True
+            chunk_object.is_holdout = True
 
-        # Assign the material to the imported mesh
+        # Assign the material to every chunk of the scan and all their LODs
         if material:
-            if imported_mesh.data.materials:
-                imported_mesh.data.materials[0] = material
-            else:
-                imported_mesh.data.materials.append(material)
+            assign_scan_material(chunk_object, material)
+            set_points_material(chunk_object, material)
 
-    # Retime the abc to match the video FPS
-    if camera_fps is not None:
+    # Retime the abc to match the video FPS, cameras keyed directly are already on the shot frames
+    if camera_fps is not None and imported_cam and has_transform_cache(imported_cam):
         retime_alembic(clip_fps, camera_fps, frame_duration)
 
     # Enable shadow catcher pass
@@ -229,15 +233,24 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
     # Set up compositing nodes
     setup_compositing_nodes(img, prefs.renderer)
 
-    # Save the shutter speed keyframes
-    save_camera_settings(shot, camera_settings)
+    # Keep the shutter animation in an action of the shot, assigned to the scene on shot switch
+    if camera_settings and camera_settings.has_channel('shutter_speed'):
+        shot.render_action, removed_shutter_keys = create_render_action(
+            scene,
+            f"{base_name}RenderAction",
+            camera_settings.frames(),
+            camera_settings.shutter_speed * get_scene_fps(scene),
+            prefs.keyframe_tolerance('shutter')
+        )
+        removed_keys += removed_shutter_keys
+
+    if removed_keys:
+        self.report({'INFO'}, f"Simplification removed {removed_keys} camera setting keyframes")
 
     # Assign a default name to the shot
     shot_index = len(omni_collection.shots) - 1
     shot.name = f"Shot {shot_index + 1:02d}"
 
-    shot.assign_id()
-
     # Auto-select the imported shot
     bpy.context.scene.Selected_Shot_Index = shot_index
     if scene.Selected_Collection_Name != omniscient_collection.name:
@@ -259,22 +272,199 @@ def loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camer
             frame_end=frame_duration
         )
 
+    # Hide the scan chunks the camera never sees
+    chunk_visibility = compute_shot_visibility(scene, shot)
+    if chunk_visibility:
+        apply_shot_visibility(shot)
+        self.report({'INFO'}, "{} of {} scan chunks seen by the shot".format(*chunk_visibility))
+
+    # Mask the projection of the shot to the scan vertices its camera sees
+    if prefs.use_shot_coverage and imported_cam:
+        covered_count, vertex_count = compute_shot_coverage(scene, shot, prefs.coverage_frame_samples)
+        link_shot_coverage(shot, coverage_attribute_name(shot.id))
+        self.report({'INFO'}, f"Shot covers {covered_count} of {vertex_count} scan vertices")
+
     scene.is_processing_shot = False
 
 
+def get_scan_name(filepath):
+    return os.path.splitext(os.path.basename(filepath))[0].split('.')[0]
+
+
+def read_native_mesh(filepath):
+    """MeshData of filepath, None when the Blender importer has to be used"""
+    if not filepath.lower().endswith(MESH_EXTENSIONS):
+        return None
+    try:
+        return read_mesh(filepath)
+    except (OSError, MeshReadError) as e:
+        print(f"{e}, using the Blender importer instead")
+        return None
+
+
+def prepare_scan_chunk(filepath, cleanup, grid_divisions, lod_resolution):
+    """Read, clean up, split and decimate a scan chunk, without bpy so it can run in a worker thread.
+
+    Returns (parts, merged vertex count, removed face count) where parts is a
+    list of (name suffix, MeshData, viewport LOD MeshData or None), or None
+    when the Blender importer has to be used.
+    """
+    mesh_data = read_native_mesh(filepath)
+    if mesh_data is None:
+        return None, 0, 0
+
+    merged_count = removed_count = 0
+    if cleanup:
+        mesh_data, merged_count, removed_count = clean_mesh(mesh_data)
+
+    parts = []
+    for (column, row), cell_data in split_mesh_grid(mesh_data, grid_divisions):
+        # The suffix keeps the name of the scan before the dot, used to find the chunks of a scan
+        suffix = f".cell_{column}_{row}" if grid_divisions > 1 else ""
+        lod_data = decimate_vertex_clustering(cell_data, lod_resolution) if lod_resolution else None
+        parts.append((suffix, cell_data, lod_data))
+    return parts, merged_count, removed_count
+
+
+def create_scan_part_objects(filepath, parts, point_radius=None):
+    """Yield (object, MeshData) for the grid cells of a scan chunk prepared by prepare_scan_chunk.
+
+    Cells become point clouds of point_radius when it is given, meshes with
+    their viewport LOD otherwise.
+    """
+    collection = bpy.context.scene.collection
+    for suffix, mesh_data, lod_data in parts:
+        name = get_scan_name(filepath) + suffix
+        if point_radius is not None:
+            yield create_point_cloud_object(name, mesh_data, collection, point_radius), mesh_data
+            continue
+
+        chunk_object = create_mesh_object(name, mesh_data, collection)
+        if lod_data is not None:
+            set_scan_lod(chunk_object, create_mesh(f"{name}_LOD", lod_data))
+        yield chunk_object, mesh_data
+
+
+def use_point_import(self, prefs):
+    """Whether scans are imported as points, warning when the points node group can't be built"""
+    if prefs.scan_import_mode != 'POINTS':
+        return False
+    if get_points_node_group() is None:
+        self.report({'WARNING'}, f"Could not build the {POINTS_NODE_GROUP_NAME} node group, "
+                                 "scans are imported as meshes")
+        return False
+    return True
+
+
+def import_geometry(self, geo_filepaths):
+    """Import every scan chunk and return their (object, filepath) pairs.
+
+    Files are parsed, cleaned up, split and decimated concurrently in worker
+    threads, the Blender data is then created on the main thread.
+    """
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    as_points = use_point_import(self, prefs)
+    lod_resolution = prefs.scan_lod_resolution if prefs.use_scan_lod and not as_points else 0
+
+    def prepare(filepath):
+        return prepare_scan_chunk(filepath, prefs.cleanup_scans, prefs.scan_grid_divisions, lod_resolution)
+
+    if len(geo_filepaths) > 1:
+        with ThreadPoolExecutor() as executor:
+            chunks = list(executor.map(prepare, geo_filepaths))
+    else:
+        chunks = [prepare(filepath) for filepath in geo_filepaths]
+
+    scan_chunks = []
+    point_count = points_size = mesh_size = 0
+    total_merged = total_removed = 0
+    for filepath, (parts, merged_count, removed_count) in zip(geo_filepaths, chunks):
+        total_merged += merged_count
+        total_removed += removed_count
+        if parts is None:
+            chunk_object = import_geometry_with_operator(filepath)
+            if chunk_object:
+                scan_chunks.append((chunk_object, filepath))
+            continue
+
+        point_radius = prefs.point_radius if as_points else None
+        for chunk_object, mesh_data in create_scan_part_objects(filepath, parts, point_radius):
+            scan_chunks.append((chunk_object, filepath))
+            if as_points:
+                point_count += len(mesh_data.vertices)
+                points_size += point_data_size(mesh_data)
+                mesh_size += mesh_data.nbytes
+
+    if total_merged or total_removed:
+        self.report({'INFO'}, f"Scan cleanup merged {total_merged} vertices and removed {total_removed} faces")
+    if point_count:
+        self.report({'INFO'}, f"Imported {point_count} points: "
+                              f"{points_size / 2**20:.1f} MB instead of {mesh_size / 2**20:.1f} MB as a mesh")
+    return scan_chunks
+
+
+def import_geometry_with_operator(geo_filepath):
+    # Capture the initial state of mesh objects in the scene
+    initial_mesh_state = capture_mesh_state()
+
+    # Import the geo file into the blender scene
+    # .obj
+    if geo_filepath.endswith('.obj'):
+        # Get Blender version
+        major, minor, patch = bpy.app.version
+
+        if major >= 4:
+            # For Blender 4.0 and above
+            bpy.ops.wm.obj_import(filepath=geo_filepath)
+        else:
+            # For Blender versions before 4.0
+            bpy.ops.import_scene.obj(filepath=geo_filepath)
+
+    # .usd / .usdc / .usda
+    elif geo_filepath.endswith(('.usd', '.usdc', '.usda')):
+        bpy.ops.wm.usd_import(filepath=geo_filepath)
+    # .ply
+    elif geo_filepath.endswith('.ply'):
+        bpy.ops.import_mesh.ply(filepath=geo_filepath)
+    # .stl
+    elif geo_filepath.endswith('.stl'):
+        bpy.ops.import_mesh.stl(filepath=geo_filepath)
+
+    # Find the newly imported mesh
+    imported_mesh = find_new_mesh(initial_mesh_state)
+    if imported_mesh:
+        set_shade_smooth(imported_mesh)
+    return imported_mesh
+
+
 def capture_camera_state():
     # Capture the initial state of camera objects in the scene
     return set(obj.name for obj in bpy.context.scene.objects if obj.type == 'CAMERA')
 
 
-def import_camera(self, camera_filepath):
+def import_camera(self, camera_filepath, camera_fps=None):
+    """Import the camera file and return the new camera object"""
+    # USD cameras are read directly from the stage when pxr is available
+    if camera_filepath.endswith(USD_EXTENSIONS) and is_usd_available():
+        scene = bpy.context.scene
+        try:
+            return import_usd_camera(camera_filepath, scene.collection, get_scene_fps(scene), camera_fps)
+        except UsdCameraError as e:
+            print(f"{e}, using the USD importer instead")
+
+    initial_camera_state = capture_camera_state()
     if camera_filepath.endswith('.abc'):
         bpy.ops.wm.alembic_import(filepath=camera_filepath)
     elif camera_filepath.endswith('.fbx'):
         bpy.ops.import_scene.fbx(filepath=camera_filepath)
         self.report({'WARNING'}, "FBX format does not support importing the f-stop setting.")
-    elif camera_filepath.endswith(('.usd', '.usdc', '.usda')):
+    elif camera_filepath.endswith(USD_EXTENSIONS):
         bpy.ops.wm.usd_import(filepath=camera_filepath)
+    return find_new_camera(initial_camera_state)
+
+
+def has_transform_cache(obj):
+    return any(constraint.type == 'TRANSFORM_CACHE' for constraint in obj.constraints)
 
 
 def find_new_camera(initial_state):
@@ -336,33 +526,23 @@ def retime_alembic(clip_fps, camera_fps, frame_duration):
         print("No cache files found.")
 
 
-def apply_camera_settings(camera, settings):
-    scene = bpy.context.scene
-    for frame_index, frame_data in enumerate(settings, start=1):
-        scene.frame_set(frame_index)  # Set the current frame
-        set_lens_and_focus(camera.data, frame_data, frame_index)
-        if 'shutter_speed' in frame_data:
-            scene_fps = get_scene_fps(scene)
-            shutter_speed_fraction = frame_data['shutter_speed'] * scene_fps
-            scene.render.motion_blur_shutter = shutter_speed_fraction
-            scene.render.keyframe_insert(data_path="motion_blur_shutter", frame=frame_index)
-
-def set_lens_and_focus(cam_data, frame_data, frame_index):
-    cam_data.lens = frame_data['focal_length']
-    cam_data.dof.focus_distance = frame_data['focus_distance']
-
-    # Insert keyframes for lens and focus distance
-    cam_data.keyframe_insert(data_path="lens", frame=frame_index)
-    cam_data.keyframe_insert(data_path="dof.focus_distance", frame=frame_index)
-
-
-def save_camera_settings(shot, settings):
-    for frame_index, frame_data in enumerate(settings, start=1):
-        if 'shutter_speed' in frame_data:
-            new_keyframe = shot.shutter_speed_keyframes.add()
-            new_keyframe.frame = frame_index
-            new_keyframe.value = frame_data['shutter_speed']
-            print(f"Added keyframe at frame {new_keyframe.frame} with value {new_keyframe.value}")
+def apply_camera_settings(camera, settings, keyframe_tolerance):
+    """Key lens and focus distance, returns the number of keys removed by simplification"""
+    if not settings:
+        return 0
+
+    frames = settings.frames()
+
+    # Write every channel in bulk instead of keying frame by frame
+    channels = (
+        ("lens", settings.focal_length, keyframe_tolerance('lens')),
+        ("dof.focus_distance", settings.focus_distance, keyframe_tolerance('focus')),
+    )
+
+    removed_keys = 0
+    for data_path, values, tolerance in channels:
+        removed_keys += write_property_keyframes(camera.data, data_path, frames, values, tolerance=tolerance)[1]
+    return removed_keys
 
 
 def calculate_frame_indices(camera_fps, clip_fps, frame_duration):
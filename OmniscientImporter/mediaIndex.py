@@ -0,0 +1,106 @@
+import os
+import threading
+
+# Separator of the search folders in the preferences
+SEARCH_PATH_SEPARATOR = ";"
+
+
+class MediaIndex:
+    """File name index of every file below a search root.
+
+    The modification time of every scanned folder is recorded: adding,
+    removing or renaming a file changes the mtime of its folder, so the
+    index stays valid as long as none of them changed.
+    """
+
+    __slots__ = ("root", "folder_mtimes", "files_by_name")
+
+    def __init__(self, root):
+        self.root = root
+        self.folder_mtimes = {}
+        self.files_by_name = {}
+        self._scan()
+
+    def _scan(self):
+        folders = [self.root]
+        while folders:
+            folder = folders.pop()
+            try:
+                self.folder_mtimes[folder] = os.stat(folder).st_mtime_ns
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            folders.append(entry.path)
+                        elif entry.is_file():
+                            key = os.path.normcase(entry.name)
+                            self.files_by_name.setdefault(key, []).append((entry.path, entry.stat().st_size))
+            except OSError:
+                continue
+
+    def is_valid(self):
+        for folder, mtime in self.folder_mtimes.items():
+            try:
+                if os.stat(folder).st_mtime_ns != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def find(self, file_name):
+        """Return the (path, size) of every indexed file called file_name"""
+        return self.files_by_name.get(os.path.normcase(file_name), [])
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_media_index(root):
+    """Return the index of root, built once and rebuilt only when a folder changed"""
+    root = os.path.normpath(os.path.abspath(root))
+    with _indexes_lock:
+        index = _indexes.get(root)
+        if index is None or not index.is_valid():
+            index = _indexes[root] = MediaIndex(root)
+        return index
+
+
+def parse_search_paths(search_paths):
+    return [path.strip() for path in search_paths.split(SEARCH_PATH_SEPARATOR) if path.strip()]
+
+
+def resolve_missing_files(missing_files, search_roots):
+    """Find the files of missing_files below search_roots by name.
+
+    Exported media share generic names across shots (video.mov,
+    camera.abc, ...), so when a name is found in several folders the folder
+    holding the most missing files of the shot wins. Empty files are only
+    used if nothing else matches. Files whose best folders tie are left
+    unresolved for the user to pick. Returns a dict of missing path -> found path.
+    """
+    indexes = [get_media_index(root) for root in search_roots if os.path.isdir(root)]
+    if not indexes:
+        return {}
+
+    candidates = {}
+    folder_scores = {}
+    for missing_file in missing_files:
+        found = []
+        for index in indexes:
+            found.extend(index.find(os.path.basename(missing_file)))
+        if not found:
+            continue
+
+        non_empty = [(path, size) for path, size in found if size > 0]
+        # Nested search roots index the same file more than once
+        candidates[missing_file] = list(dict.fromkeys(path for path, _ in (non_empty or found)))
+        for folder in {os.path.dirname(path) for path in candidates[missing_file]}:
+            folder_scores[folder] = folder_scores.get(folder, 0) + 1
+
+    resolved = {}
+    for missing_file, paths in candidates.items():
+        best_score = max(folder_scores[os.path.dirname(path)] for path in paths)
+        best_paths = [path for path in paths if folder_scores[os.path.dirname(path)] == best_score]
+        if len(best_paths) == 1:
+            resolved[missing_file] = best_paths[0]
+    return resolved
@@ -0,0 +1,394 @@
+"""Scan readers for the OBJ, PLY and STL files written by Omniscient.
+
+Files are memory-mapped and parsed into NumPy arrays without bpy, so they can
+run in worker threads. Anything outside what Omniscient writes raises
+MeshReadError and the caller falls back to Blender's importers.
+"""
+
+import mmap
+import os
+import numpy as np
+
+MESH_EXTENSIONS = ('.obj', '.ply', '.stl')
+
+# OBJ text is parsed in blocks of whole lines to bound the temporary memory
+OBJ_BLOCK_SIZE = 1 << 26
+
+# Blender's OBJ importer converts Y-up to Z-up: (x, y, z) -> (x, -z, y)
+OBJ_AXIS_ORDER = (0, 2, 1)
+OBJ_AXIS_SIGN = np.array([1.0, -1.0, 1.0], dtype=np.float32)
+
+_PLY_TYPES = {
+    "char": "i1", "int8": "i1",
+    "uchar": "u1", "uint8": "u1",
+    "short": "i2", "int16": "i2",
+    "ushort": "u2", "uint16": "u2",
+    "int": "i4", "int32": "i4",
+    "uint": "u4", "uint32": "u4",
+    "float": "f4", "float32": "f4",
+    "double": "f8", "float64": "f8",
+}
+
+_STL_TRIANGLE = np.dtype([("normal", "<f4", 3), ("vertices", "<f4", (3, 3)), ("attribute", "<u2")])
+
+
+class MeshReadError(Exception):
+    pass
+
+
+class MeshData:
+    """Vertex and face arrays of a mesh.
+
+    vertices: (n, 3) float32
+    loop_vertices: vertex index of every face corner, int32
+    face_sizes: corner count of every face, int32
+    uvs: (loops, 2) float32 per face corner, or None
+    colors: (n, 4) float32 RGBA per vertex, or None
+    """
+
+    __slots__ = ("vertices", "loop_vertices", "face_sizes", "uvs", "colors")
+
+    def __init__(self, vertices, loop_vertices, face_sizes, uvs=None, colors=None):
+        self.vertices = vertices
+        self.loop_vertices = loop_vertices
+        self.face_sizes = face_sizes
+        self.uvs = uvs
+        self.colors = colors
+
+    def loop_starts(self):
+        starts = np.zeros(len(self.face_sizes), dtype=np.int32)
+        np.cumsum(self.face_sizes[:-1], out=starts[1:])
+        return starts
+
+    @property
+    def nbytes(self):
+        arrays = (self.vertices, self.loop_vertices, self.face_sizes, self.uvs, self.colors)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def validate(self):
+        vertex_count = len(self.vertices)
+        if len(self.loop_vertices) and (self.loop_vertices.min() < 0 or self.loop_vertices.max() >= vertex_count):
+            raise MeshReadError("Face index out of range")
+        if int(self.face_sizes.sum()) != len(self.loop_vertices):
+            raise MeshReadError("Face sizes don't match the face indices")
+        if np.any(self.face_sizes < 3):
+            raise MeshReadError("Face with less than 3 corners")
+
+
+def _full_rows(values, columns, what):
+    if columns == 0 or len(values) % columns:
+        raise MeshReadError(f"Inconsistent {what} lines")
+    return values.reshape(-1, columns)
+
+
+def _column_count(values, row_count):
+    return len(values) // row_count if row_count and len(values) % row_count == 0 else 0
+
+
+def _iter_line_blocks(data, block_size):
+    start = 0
+    size = len(data)
+    while start < size:
+        end = data.find(b"\n", min(start + block_size, size))
+        end = size if end == -1 else end + 1
+        yield data[start:end]
+        start = end
+
+
+def _parse_obj_faces(face_lines):
+    """Return (vertex indices, uv indices or None, face sizes) of 'f ...' lines, 1-based"""
+    first_corner = face_lines[0].split()[1]
+    text = b" ".join(face_lines).replace(b"f ", b" ")
+    if b"//" in first_corner:
+        # v//vn
+        text = text.replace(b"//", b" 0 ")
+    components = first_corner.replace(b"//", b"/0/").count(b"/") + 1
+    indices = np.array(text.replace(b"/", b" ").split(), dtype=np.int64)
+    indices = _full_rows(indices, components, "face")
+
+    if len(indices) == 3 * len(face_lines):
+        face_sizes = np.full(len(face_lines), 3, dtype=np.int32)
+    else:
+        face_sizes = np.array([len(line.split()) - 1 for line in face_lines], dtype=np.int32)
+
+    uv_indices = indices[:, 1] if components > 1 and first_corner.split(b"/")[1] else None
+    return indices[:, 0], uv_indices, face_sizes
+
+
+def _parse_obj_block(block):
+    """(positions, uvs, faces) of a block of OBJ lines, each None when the block has none"""
+    lines = block.split(b"\n")
+    vertex_lines = [line for line in lines if line.startswith(b"v ")]
+    uv_lines = [line for line in lines if line.startswith(b"vt ")]
+    face_lines = [line for line in lines if line.startswith(b"f ")]
+    del lines
+
+    positions = uvs = faces = None
+    if vertex_lines:
+        values = np.array(b" ".join(vertex_lines).replace(b"v ", b" ").split(), dtype=np.float32)
+        positions = _full_rows(values, _column_count(values, len(vertex_lines)), "vertex")
+    if uv_lines:
+        values = np.array(b" ".join(uv_lines).replace(b"vt ", b" ").split(), dtype=np.float32)
+        uvs = _full_rows(values, _column_count(values, len(uv_lines)), "uv")[:, :2]
+    if face_lines:
+        faces = _parse_obj_faces(face_lines)
+    return positions, uvs, faces
+
+
+def _obj_loop_uvs(uvs, uv_indices):
+    """UV of every face corner, None when some faces have no UVs or the indices are out of range"""
+    if not uvs or any(indices is None for indices in uv_indices):
+        return None
+    uv_table = np.concatenate(uvs)
+    loop_uv_indices = np.concatenate(uv_indices) - 1
+    if loop_uv_indices.min() < 0 or loop_uv_indices.max() >= len(uv_table):
+        return None
+    return uv_table[loop_uv_indices]
+
+
+def read_obj(filepath):
+    positions = []
+    uvs = []
+    faces = []
+
+    with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for block in _iter_line_blocks(data, OBJ_BLOCK_SIZE):
+            block_positions, block_uvs, block_faces = _parse_obj_block(block)
+            if block_positions is not None:
+                positions.append(block_positions)
+            if block_uvs is not None:
+                uvs.append(block_uvs)
+            if block_faces is not None:
+                faces.append(block_faces)
+
+    if not positions or not faces:
+        raise MeshReadError("No faces")
+    if len({rows.shape[1] for rows in positions}) > 1:
+        raise MeshReadError("Inconsistent vertex lines")
+
+    vertex_rows = np.concatenate(positions)
+    vertices = vertex_rows[:, OBJ_AXIS_ORDER] * OBJ_AXIS_SIGN
+    colors = None
+    if vertex_rows.shape[1] >= 6:
+        colors = np.ones((len(vertex_rows), 4), dtype=np.float32)
+        colors[:, :3] = vertex_rows[:, 3:6]
+
+    vertex_indices, uv_indices, face_sizes = zip(*faces)
+    loop_vertices = np.concatenate(vertex_indices)
+    if loop_vertices.min() < 1:
+        raise MeshReadError("Relative face indices are not supported")
+
+    mesh_data = MeshData(
+        np.ascontiguousarray(vertices, dtype=np.float32),
+        (loop_vertices - 1).astype(np.int32),
+        np.concatenate(face_sizes),
+        _obj_loop_uvs(uvs, uv_indices),
+        colors,
+    )
+    mesh_data.validate()
+    return mesh_data
+
+
+def _read_ply_header(data):
+    end = data.find(b"end_header")
+    if data[:3] != b"ply" or end == -1:
+        raise MeshReadError("Not a PLY file")
+    body_start = data.find(b"\n", end) + 1
+
+    file_format = None
+    elements = []
+    for line in data[:end].decode("ascii", "replace").splitlines():
+        words = line.split()
+        if not words:
+            continue
+        if words[0] == "format":
+            file_format = words[1]
+        elif words[0] == "element":
+            elements.append((words[1], int(words[2]), []))
+        elif words[0] == "property" and elements:
+            if words[1] == "list":
+                elements[-1][2].append((words[4], ("list", _PLY_TYPES[words[2]], _PLY_TYPES[words[3]])))
+            else:
+                elements[-1][2].append((words[2], _PLY_TYPES[words[1]]))
+    return file_format, elements, body_start
+
+
+def _ply_colors(vertices, names):
+    for channels in (("red", "green", "blue", "alpha"), ("r", "g", "b", "a")):
+        if all(channel in names for channel in channels[:3]):
+            colors = np.ones((len(vertices), 4), dtype=np.float32)
+            for i, channel in enumerate(channels):
+                if channel in names:
+                    column = vertices[channel].astype(np.float32)
+                    colors[:, i] = column / 255.0 if vertices.dtype[channel].kind == "u" else column
+            return colors
+    return None
+
+
+def _ply_uvs(vertices, names, loop_vertices):
+    for u, v in (("s", "t"), ("u", "v"), ("texture_u", "texture_v")):
+        if u in names and v in names:
+            uvs = np.column_stack((vertices[u], vertices[v])).astype(np.float32)
+            return uvs[loop_vertices]
+    return None
+
+
+def _check_ply_element(name, properties):
+    """Whether the element is a list, only faces with a single index list are supported"""
+    is_list = any(isinstance(property_type, tuple) for _, property_type in properties)
+    if is_list and (name != "face" or len(properties) != 1):
+        raise MeshReadError(f"Unsupported PLY element {name}")
+    return is_list
+
+
+def _read_ply_ascii(data, offset, elements):
+    """(vertices, loop vertices, face sizes) of an ASCII PLY body"""
+    vertices = loop_vertices = face_sizes = None
+    lines = data[offset:].split(b"\n")
+    line_index = 0
+    for name, count, properties in elements:
+        _check_ply_element(name, properties)
+        rows = lines[line_index:line_index + count]
+        line_index += count
+        if name == "vertex":
+            values = _full_rows(np.array(b" ".join(rows).split(), dtype=np.float64), len(properties), "vertex")
+            vertices = np.empty(count, dtype=[(property_name, property_type)
+                                              for property_name, property_type in properties])
+            for i, (property_name, _) in enumerate(properties):
+                vertices[property_name] = values[:, i]
+        elif name == "face":
+            face_sizes = np.array([int(row.split(None, 1)[0]) for row in rows], dtype=np.int32)
+            indices = np.array(b" ".join(rows).split(), dtype=np.int64)
+            # Drop the corner count in front of every face
+            keep = np.ones(len(indices), dtype=bool)
+            starts = np.zeros(count, dtype=np.int64)
+            np.cumsum(face_sizes[:-1] + 1, out=starts[1:])
+            keep[starts] = False
+            loop_vertices = indices[keep].astype(np.int32)
+    return vertices, loop_vertices, face_sizes
+
+
+def _read_ply_binary_faces(data, offset, count, count_type, index_type):
+    """(loop vertices, face sizes, end offset) of count binary PLY faces.
+
+    Faces are read in runs sharing a corner count, a single run when every
+    face has the same count. Every view of the map is released before
+    anything is raised, the map can't be closed while one is alive.
+    """
+    count_dtype = np.dtype(count_type)
+    loop_runs = []
+    size_runs = []
+    read_count = 0
+    window = count
+    while read_count < count:
+        size = int(np.frombuffer(data, count_dtype, 1, offset)[0])
+        if size < 3:
+            raise MeshReadError("Face with less than 3 corners")
+        face_dtype = np.dtype([("size", count_dtype), ("indices", index_type, size)])
+        run = min(count - read_count, window, (len(data) - offset) // face_dtype.itemsize)
+        if run <= 0:
+            raise MeshReadError("Truncated PLY faces")
+
+        faces = np.frombuffer(data, face_dtype, run, offset)
+        other_sizes = np.flatnonzero(faces["size"] != size)
+        if len(other_sizes):
+            run = int(other_sizes[0])
+        loop_runs.append(faces["indices"][:run].astype(np.int32).ravel())
+        del faces
+
+        size_runs.append(np.full(run, size, dtype=np.int32))
+        offset += run * face_dtype.itemsize
+        read_count += run
+        # Mixed corner counts alternate, later runs are read through a window sized from the last one
+        window = max(1024, 2 * run)
+    return np.concatenate(loop_runs), np.concatenate(size_runs), offset
+
+
+def _read_ply_binary(data, offset, elements, byte_order):
+    """(vertices, loop vertices, face sizes) of a binary PLY body"""
+    vertices = loop_vertices = face_sizes = None
+    for name, count, properties in elements:
+        if _check_ply_element(name, properties):
+            count_type, index_type = properties[0][1][1:]
+            loop_vertices, face_sizes, offset = _read_ply_binary_faces(
+                data, offset, count, byte_order + count_type, byte_order + index_type)
+            continue
+
+        element_dtype = np.dtype([(property_name, byte_order + property_type)
+                                  for property_name, property_type in properties])
+        element = np.frombuffer(data, element_dtype, count, offset)
+        offset += element.nbytes
+        if name == "vertex":
+            vertices = element.copy()
+        # Views of the map must be gone before it is closed
+        del element
+    return vertices, loop_vertices, face_sizes
+
+
+def read_ply(filepath):
+    with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        try:
+            file_format, elements, offset = _read_ply_header(data)
+        except (KeyError, IndexError, ValueError) as e:
+            raise MeshReadError(f"Unsupported PLY header: {e}")
+
+        if file_format == "ascii":
+            vertices, loop_vertices, face_sizes = _read_ply_ascii(data, offset, elements)
+        elif file_format in ("binary_little_endian", "binary_big_endian"):
+            byte_order = ">" if file_format == "binary_big_endian" else "<"
+            vertices, loop_vertices, face_sizes = _read_ply_binary(data, offset, elements, byte_order)
+        else:
+            raise MeshReadError(f"Unsupported PLY format {file_format}")
+
+    if vertices is None or face_sizes is None:
+        raise MeshReadError("No faces")
+
+    names = vertices.dtype.names
+    positions = np.column_stack((vertices["x"], vertices["y"], vertices["z"])).astype(np.float32)
+    mesh_data = MeshData(positions, loop_vertices, face_sizes,
+                         _ply_uvs(vertices, names, loop_vertices), _ply_colors(vertices, names))
+    mesh_data.validate()
+    return mesh_data
+
+
+def read_stl(filepath):
+    with open(filepath, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        triangle_count = int(np.frombuffer(data, "<u4", 1, 80)[0]) if len(data) >= 84 else -1
+        if 84 + triangle_count * _STL_TRIANGLE.itemsize == len(data):
+            corners = np.frombuffer(data, _STL_TRIANGLE, triangle_count, 84)["vertices"].reshape(-1, 3).copy()
+        elif data[:5] == b"solid":
+            lines = [line.strip() for line in data[:].split(b"\n")]
+            corner_lines = [line for line in lines if line.startswith(b"vertex")]
+            values = np.array(b" ".join(corner_lines).replace(b"vertex", b" ").split(), dtype=np.float32)
+            corners = _full_rows(values, 3, "vertex")
+        else:
+            raise MeshReadError("Not an STL file")
+
+    # STL stores every triangle corner, shared vertices are merged back
+    vertices, loop_vertices = np.unique(corners, axis=0, return_inverse=True)
+    mesh_data = MeshData(
+        np.ascontiguousarray(vertices, dtype=np.float32),
+        loop_vertices.astype(np.int32).ravel(),
+        np.full(len(corners) // 3, 3, dtype=np.int32),
+    )
+    mesh_data.validate()
+    return mesh_data
+
+
+_READERS = {
+    ".obj": read_obj,
+    ".ply": read_ply,
+    ".stl": read_stl,
+}
+
+
+def read_mesh(filepath):
+    extension = os.path.splitext(filepath)[1].lower()
+    reader = _READERS.get(extension)
+    if reader is None:
+        raise MeshReadError(f"Unsupported mesh format {extension}")
+    try:
+        return reader(filepath)
+    except (ValueError, KeyError, IndexError) as e:
+        # Malformed numbers or missing properties
+        raise MeshReadError(f"Could not read {os.path.basename(filepath)}: {e}")
@@ -0,0 +1,118 @@
+from array import array
+import numpy as np
+
+
+class OmniFrameData:
+    """Per-frame channels of a shot, stored as one float32 column per channel.
+
+    Frames where a channel is missing hold NaN in that channel's column.
+    """
+
+    __slots__ = ("frame_count", "channels")
+
+    def __init__(self, frame_count=0, channels=None):
+        self.frame_count = frame_count
+        self.channels = channels if channels is not None else {}
+
+    @classmethod
+    def from_frames(cls, frames):
+        builder = OmniFrameDataBuilder()
+        for frame in frames:
+            builder.append(frame)
+        return builder.build()
+
+    def __len__(self):
+        return self.frame_count
+
+    def frames(self):
+        """Blender frame numbers of the columns, starting at frame 1"""
+        return np.arange(1, self.frame_count + 1, dtype=np.float32)
+
+    def has_channel(self, name):
+        column = self.channels.get(name)
+        return column is not None and not np.isnan(column).all()
+
+    def channel(self, name):
+        column = self.channels.get(name)
+        if column is None:
+            return np.full(self.frame_count, np.nan, dtype=np.float32)
+        return column
+
+    @property
+    def focal_length(self):
+        return self.channel('focal_length')
+
+    @property
+    def focus_distance(self):
+        return self.channel('focus_distance')
+
+    @property
+    def shutter_speed(self):
+        return self.channel('shutter_speed')
+
+
+class OmniFrameDataBuilder:
+    """Accumulate frames one at a time into compact columns"""
+
+    __slots__ = ("frame_count", "_columns")
+
+    def __init__(self):
+        self.frame_count = 0
+        self._columns = {}
+
+    def append(self, frame):
+        frame_index = self.frame_count
+        columns = self._columns
+        for key, value in frame.items():
+            # Only numeric channels are kept, bool is excluded on purpose
+            value_type = type(value)
+            if value_type is not float and value_type is not int:
+                continue
+
+            column = columns.get(key)
+            if column is None:
+                column = columns[key] = array('f')
+            if len(column) != frame_index:
+                _pad_column(column, frame_index)
+            column.append(value)
+        self.frame_count = frame_index + 1
+
+    def build(self):
+        channels = {}
+        for key, column in self._columns.items():
+            _pad_column(column, self.frame_count)
+            channels[key] = np.frombuffer(column, dtype=np.float32)
+        return OmniFrameData(self.frame_count, channels)
+
+
+def _pad_column(column, length):
+    missing = length - len(column)
+    if missing > 0:
+        column.extend(array('f', [float('nan')]) * missing)
+
+
+class OmniDocument:
+    """Parsed content of a .omni file.
+
+    header is the JSON tree without the per-frame arrays, which are stored as
+    OmniFrameData columns in frames, keyed by their section in data.
+    """
+
+    __slots__ = ("header", "frames")
+
+    def __init__(self, header, frames=None):
+        self.header = header
+        self.frames = frames if frames is not None else {}
+
+    @property
+    def version(self):
+        return self.header['version']
+
+    def section(self, name):
+        return self.header.get('data', {}).get(name, {})
+
+    def camera_settings(self):
+        # Per-frame settings live on the camera, some exports only store them on the video
+        if 'camera' in self.frames:
+            return self.frames['camera']
+        return self.frames.get('video', OmniFrameData())
@@ -1,91 +1,127 @@
 import bpy
-import json
-import os
 from . import bl_info
 from .loadProcessedOmni import loadProcessedOmni
+from .omniPreflight import preflight_omni, MINIMUM_OMNI_VERSION
+from .mediaIndex import parse_search_paths
 
 
-def loadOmni(self, omni_file):
-    isVideoFileMissing = False
-    isCameraFileMissing = False
-    isGeoFileMissing = False
-    video_filepath = ""
-    camera_filepath = ""
-    geo_filepath = ""
-    camera_fps = None
-
-    # Load the json file
-    with open(omni_file, 'r') as f:
-        data = json.load(f)
-
+def check_omni_versions(self, header):
     # Check the minimum addon version specified in the .json file
-    blender_data = data['blender']
+    blender_data = header['blender']
     if blender_data:
         minimum_addon_version = blender_data['minimum_addon_version']
         ideal_addon_version = blender_data.get('ideal_addon_version')
+        current_version_str = get_current_version_str()
         if minimum_addon_version:
-            current_version = bl_info['version']
-            current_version_str = ".".join(str(x) for x in current_version)
             if current_version_str < minimum_addon_version:
                 bpy.ops.message.not_supported_omni('INVOKE_DEFAULT',
                                                    minimum_addon_version=minimum_addon_version,
                                                    current_version_str=current_version_str)
-                return {'CANCELLED'}
+                return False
 
         # Check if the current version is lower than the ideal version
         if ideal_addon_version and current_version_str < ideal_addon_version:
             bpy.context.window_manager.popup_text = f"Recommended version is:\n{ideal_addon_version}"
 
-    # Get the filepaths from the json data
-    video_relative_path = ""
-    camera_relative_path = ""
-    geo_relative_path = ""
-    omni_file_version = data['version']
+    omni_file_version = header['version']
 
     # Check if the Omni file version is below 2.1.0
-    if omni_file_version < "2.1.0":
+    if omni_file_version < MINIMUM_OMNI_VERSION:
         self.report({'ERROR'}, "Please re-export the shot using the Omniscient app version 1.16 or later.")
-        return {'CANCELLED'}
+        return False
 
-    video_relative_path = data['data']['video']['relative_path']
-    camera_relative_path = data['data']['camera']['relative_path']
-    geo_relative_path = data['data']['geometry']['relative_path'][0]
+    return True
 
-    # Extract camera FPS value
-    camera_data = data.get("data", {}).get("camera", {})
-    camera_fps = camera_data.get("fps")
 
-    camera_settings = data['data']['camera']['frames']
+def get_current_version_str():
+    return ".".join(str(x) for x in bl_info['version'])
 
-    # Make the filepaths absolute by combining them with the path of the .json file
-    omni_dir = os.path.dirname(omni_file)
-    video_filepath = os.path.join(omni_dir, video_relative_path)
-    camera_filepath = os.path.join(omni_dir, camera_relative_path)
-    geo_filepath = os.path.join(omni_dir, geo_relative_path)
 
-    # Check if the video file exists
-    if not os.path.exists(video_filepath):
-        isVideoFileMissing = True
-        # self.report({'ERROR'}, f"Video file not found at {video_filepath}")
+def loadOmni(self, omni_file, preflight=None, missing_media=None):
+    # The preflight is gathered in worker threads for batch imports.
+    # With missing_media, shots with missing media are added to it instead of opening a dialog each
+    if preflight is None:
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        preflight = preflight_omni(omni_file,
+                                   get_current_version_str(),
+                                   prefs.use_frame_cache,
+                                   parse_search_paths(prefs.media_search_paths))
 
-    # Check if the camera file exists
-    if not os.path.exists(camera_filepath):
-        isCameraFileMissing = True
-        # self.report({'ERROR'}, f"Camera file not found at {camera_filepath}")
+    if preflight.error:
+        self.report({'ERROR'}, preflight.error)
+        return {'CANCELLED'}
 
-    # Check if the geo file exists
-    if not os.path.exists(geo_filepath):
-        isGeoFileMissing = True
-        # self.report({'ERROR'}, f"Geo file not found at {geo_filepath}")
+    if not check_omni_versions(self, preflight.header) or preflight.document is None:
+        return {'CANCELLED'}
 
-    if (not isVideoFileMissing) and (not isCameraFileMissing) and (not isGeoFileMissing):
-        loadProcessedOmni(self, video_filepath, camera_filepath, geo_filepath, camera_fps, camera_settings)
+    document = preflight.document
+
+    for missing_file, resolved_file in preflight.relinked_files.items():
+        self.report({'INFO'}, f"Relinked {missing_file} to {resolved_file}")
+
+    for missing_chunk in preflight.missing_geo_chunks:
+        self.report({'WARNING'}, f"Geometry chunk not found, skipped: {missing_chunk}")
+
+    # Extract camera FPS value
+    camera_fps = document.section('camera').get("fps")
+
+    camera_settings = document.camera_settings()
+
+    if not (preflight.is_video_file_missing or preflight.is_camera_file_missing or preflight.is_geo_file_missing):
+        loadProcessedOmni(self,
+                          preflight.video_filepath,
+                          preflight.camera_filepath,
+                          preflight.geo_filepath,
+                          camera_fps,
+                          camera_settings,
+                          [filepath for filepath in preflight.geo_filepaths
+                           if filepath not in preflight.missing_geo_chunks])
+
+    elif missing_media is not None:
+        missing_media.append(preflight)
+        return {'CANCELLED'}
 
     else:
-        bpy.ops.wm.missing_file_resolver('INVOKE_DEFAULT',
-                                         isVideoFileMissing=isVideoFileMissing,
-                                         isCameraFileMissing=isCameraFileMissing,
-                                         isGeoFileMissing=isGeoFileMissing,
-                                         CameraPath=camera_filepath,
-                                         VideoPath=video_filepath,
-                                         GeoPath=geo_filepath)
+        open_missing_file_resolver(preflight)
+
+    return {'FINISHED'}
+
+
+def open_missing_file_resolver(preflight):
+    bpy.ops.wm.missing_file_resolver('INVOKE_DEFAULT',
+                                     isVideoFileMissing=preflight.is_video_file_missing,
+                                     isCameraFileMissing=preflight.is_camera_file_missing,
+                                     isGeoFileMissing=preflight.is_geo_file_missing,
+                                     CameraPath=preflight.camera_filepath,
+                                     VideoPath=preflight.video_filepath,
+                                     GeoPath=preflight.geo_filepath)
+
+
+def import_preflights(self, preflights):
+    """Build the shots of preflights, skipping files of the same shot.
+
+    Returns (imported count, preflights of the shots with missing media).
+    """
+    imported_count = 0
+    imported_keys = set()
+    missing_media = []
+    for preflight in preflights:
+        if preflight.digest is not None:
+            if preflight.import_key in imported_keys:
+                self.report({'WARNING'}, f"Skipped {preflight.omni_file}, same shot as another selected file")
+                continue
+            imported_keys.add(preflight.import_key)
+
+        if loadOmni(self, preflight.omni_file, preflight, missing_media) == {'FINISHED'}:
+            imported_count += 1
+    return imported_count, missing_media
+
+
+def resolve_missing_media(preflights):
+    """Ask once for the media of every shot of a batch that couldn't be located"""
+    if len(preflights) == 1:
+        open_missing_file_resolver(preflights[0])
+    elif preflights:
+        bpy.ops.wm.missing_media_batch_resolver('INVOKE_DEFAULT',
+                                                omni_files=[{"name": preflight.omni_file}
+                                                            for preflight in preflights])
@@ -0,0 +1,169 @@
+"""Shot manifest of .omni files, built without creating any Blender data.
+
+Run it outside Blender or in background mode:
+    python omniInspector.py SHOTS_DIR --output manifest.csv
+    blender -b --python omniInspector.py -- SHOTS_DIR --output manifest.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+if not __package__:
+    # Run as a script: load the sibling modules as a package without running the add-on's __init__
+    _package = types.ModuleType("omniscient_inspector")
+    _package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+    sys.modules.setdefault(_package.__name__, _package)
+    __package__ = _package.__name__
+
+from .omniParser import read_omni, OmniParseError  # noqa: E402
+from .omniSidecar import read_sidecar  # noqa: E402
+
+MANIFEST_FIELDS = (
+    "omni_file",
+    "version",
+    "minimum_addon_version",
+    "ideal_addon_version",
+    "frame_count",
+    "fps",
+    "camera_fps",
+    "duration",
+    "resolution_x",
+    "resolution_y",
+    "video",
+    "camera",
+    "geometry",
+    "video_size",
+    "camera_size",
+    "geometry_size",
+    "missing_files",
+    "error",
+)
+
+
+def _file_size(filepath):
+    try:
+        return os.path.getsize(filepath)
+    except OSError:
+        return None
+
+
+def inspect_omni(omni_file):
+    """Return the manifest entry of omni_file"""
+    entry = dict.fromkeys(MANIFEST_FIELDS)
+    entry["omni_file"] = omni_file
+
+    try:
+        # The frame cache is read when up to date, but never written
+        document = read_sidecar(omni_file) or read_omni(omni_file)
+    except (OSError, OmniParseError) as e:
+        entry["error"] = str(e)
+        return entry
+
+    header = document.header
+    blender_data = header.get("blender") or {}
+    video = document.section("video")
+    camera = document.section("camera")
+    resolution = video.get("resolution") or {}
+
+    entry["version"] = header.get("version")
+    entry["minimum_addon_version"] = blender_data.get("minimum_addon_version")
+    entry["ideal_addon_version"] = blender_data.get("ideal_addon_version")
+    entry["frame_count"] = len(document.camera_settings())
+    entry["fps"] = video.get("fps")
+    entry["camera_fps"] = camera.get("fps")
+    entry["resolution_x"] = resolution.get("width")
+    entry["resolution_y"] = resolution.get("height")
+    if entry["fps"]:
+        entry["duration"] = entry["frame_count"] / entry["fps"]
+
+    omni_dir = os.path.dirname(omni_file)
+    geometry_paths = document.section("geometry").get("relative_path") or []
+    media = {
+        "video": [video.get("relative_path")],
+        "camera": [camera.get("relative_path")],
+        "geometry": geometry_paths,
+    }
+
+    missing_files = []
+    for kind, relative_paths in media.items():
+        filepaths = [os.path.normpath(os.path.join(omni_dir, path)) for path in relative_paths if path]
+        sizes = [_file_size(filepath) for filepath in filepaths]
+        missing_files += [filepath for filepath, size in zip(filepaths, sizes) if size is None]
+
+        entry[kind] = filepaths if kind == "geometry" else (filepaths[0] if filepaths else None)
+        entry[f"{kind}_size"] = sum(size for size in sizes if size is not None)
+
+    entry["missing_files"] = missing_files
+    return entry
+
+
+def find_omni_files(paths, recursive=False):
+    omni_files = []
+    for path in paths:
+        if os.path.isfile(path):
+            omni_files.append(path)
+            continue
+        for folder, subfolders, file_names in os.walk(path):
+            omni_files += [os.path.join(folder, name) for name in file_names if name.lower().endswith(".omni")]
+            if not recursive:
+                break
+    return sorted(omni_files)
+
+
+def inspect_omni_files(omni_files, max_workers=None):
+    """Inspect every file concurrently, results keep the input order.
+
+    Worker processes are used outside Blender, threads inside it.
+    """
+    executor_type = ThreadPoolExecutor if "bpy" in sys.modules else ProcessPoolExecutor
+    with executor_type(max_workers=max_workers) as executor:
+        return list(executor.map(inspect_omni, omni_files))
+
+
+def write_manifest(entries, output, manifest_format=None):
+    manifest_format = manifest_format or ("csv" if output.lower().endswith(".csv") else "json")
+
+    if manifest_format == "json":
+        with open(output, "w") as f:
+            json.dump(entries, f, indent=2)
+        return
+
+    with open(output, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS)
+        writer.writeheader()
+        for entry in entries:
+            row = dict(entry)
+            row["geometry"] = ";".join(entry["geometry"] or [])
+            row["missing_files"] = ";".join(entry["missing_files"] or [])
+            writer.writerow(row)
+
+
+def main(argv=None):
+    if argv is None:
+        # Blender passes the script arguments after "--"
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Write a shot manifest of .omni files without importing them")
+    parser.add_argument("paths", nargs="+", help=".omni files or folders containing them")
+    parser.add_argument("-o", "--output", default="omni_manifest.json", help="manifest file, .json or .csv")
+    parser.add_argument("-f", "--format", choices=("json", "csv"), help="manifest format, guessed from --output")
+    parser.add_argument("-r", "--recursive", action="store_true", help="search folders recursively")
+    parser.add_argument("-j", "--jobs", type=int, help="number of parallel workers")
+    args = parser.parse_args(argv)
+
+    omni_files = find_omni_files(args.paths, args.recursive)
+    entries = inspect_omni_files(omni_files, args.jobs)
+    write_manifest(entries, args.output, args.format)
+
+    errors = sum(1 for entry in entries if entry["error"])
+    print(f"Inspected {len(entries)} .omni files ({errors} unreadable), manifest written to {args.output}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import json
+import re
+from .omniData import OmniDocument, OmniFrameDataBuilder
+
+CHUNK_SIZE = 1 << 16
+
+# Top-level keys needed to decide whether a file can be imported
+HEADER_KEYS = ('version', 'blender')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+# Characters that can end a number, anything else may be the rest of it in the next chunk
+_NUMBER_DELIMITERS = frozenset(',]} \t\n\r')
+
+
+class OmniParseError(ValueError):
+    pass
+
+
+class OmniStreamReader:
+    """Incremental .omni reader with bounded memory.
+
+    The top-level structure is walked here, while every leaf value is handed
+    to the C JSON decoder. Only one chunk of the file and one frame are held
+    in memory at a time, the frames being appended straight to columns.
+    """
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._items = None
+        self._header = {}
+        self._frames = {}
+
+    def read_header(self):
+        """Read the top-level keys until the version information is known"""
+        if self._items is None:
+            self._items = self._object_items()
+
+        for key in self._items:
+            self._read_top_level_value(key)
+            if all(header_key in self._header for header_key in HEADER_KEYS):
+                break
+        return self._header
+
+    def read_document(self):
+        """Read the rest of the file and return the complete document"""
+        self.read_header()
+        for key in self._items:
+            self._read_top_level_value(key)
+        return OmniDocument(self._header, self._frames)
+
+    def _read_top_level_value(self, key):
+        if key == 'data' and self._peek() == '{':
+            self._header[key] = self._read_data()
+        else:
+            self._header[key] = self._value()
+
+    def _read_data(self):
+        data = {}
+        for section in self._object_items():
+            if self._peek() != '{':
+                data[section] = self._value()
+                continue
+
+            content = {}
+            for key in self._object_items():
+                if key == 'frames' and self._peek() == '[':
+                    self._frames[section] = self._read_frames()
+                else:
+                    content[key] = self._value()
+            data[section] = content
+        return data
+
+    def _read_frames(self):
+        builder = OmniFrameDataBuilder()
+        for _ in self._array_items():
+            frame = self._value()
+            if isinstance(frame, dict):
+                builder.append(frame)
+        return builder.build()
+
+    # Tokenizer
+    #################################################
+
+    def _fill(self):
+        chunk = self._fp.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Skip whitespace and return the next character, or '' at the end of the file"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise OmniParseError(f"Expected '{char}' but found '{found}'")
+        self._pos += 1
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as e:
+                # The value may continue in the next chunk
+                if self._fill():
+                    continue
+                raise OmniParseError(str(e)) from e
+
+            # A number is only complete once a delimiter follows it, it may be cut
+            # anywhere by the end of the chunk, after its '.' or 'e' included
+            if _is_number(value) and not self._number_ends(end):
+                if not self._eof and self._fill():
+                    continue
+                if end < len(self._buffer):
+                    raise OmniParseError(f"Unexpected '{self._buffer[end]}' after number {value!r}")
+
+            self._pos = end
+            return value
+
+    def _number_ends(self, end):
+        return end < len(self._buffer) and self._buffer[end] in _NUMBER_DELIMITERS
+
+    def _object_items(self):
+        """Yield the keys of an object, the caller reads each value before resuming"""
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                raise OmniParseError(f"Expected an object key but found {key!r}")
+            self._expect(':')
+            yield key
+
+            if not self._next_item('}'):
+                return
+
+    def _array_items(self):
+        """Yield once per element of an array, the caller reads each element before resuming"""
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+
+        while True:
+            yield
+            if not self._next_item(']'):
+                return
+
+    def _next_item(self, closing):
+        """Consume the separator after an item, return False at the end of the container"""
+        char = self._peek()
+        if char == ',':
+            self._pos += 1
+            # Tolerate trailing commas
+            if self._peek() != closing:
+                return True
+            char = closing
+        if char == closing:
+            self._pos += 1
+            return False
+        raise OmniParseError(f"Expected ',' or '{closing}' but found '{char}'")
+
+
+def _is_number(value):
+    value_type = type(value)
+    return value_type is float or value_type is int
+
+
+def read_omni(omni_file):
+    with open(omni_file, 'r') as f:
+        return OmniStreamReader(f).read_document()
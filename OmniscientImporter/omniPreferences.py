@@ -1,6 +1,6 @@
 from bpy.app import version as blender_version
 from bpy.types import AddonPreferences
-from bpy.props import BoolProperty, EnumProperty
+from bpy.props import BoolProperty, EnumProperty, FloatProperty, IntProperty, StringProperty
 
 if blender_version >= (4, 2, 0):
     eevee_engine_name = 'BLENDER_EEVEE_NEXT'
@@ -50,6 +50,161 @@ class OMNI_Preferences(AddonPreferences):
         default=True
     )
 
+    scan_import_mode: EnumProperty(
+        name="Scan Import",
+        description="How scans are imported",
+        items=[
+            ('MESH', "Mesh", "Import the scan with its faces"),
+            ('POINTS', "Points", "Import only the vertices and their colors, rendered as points"),
+        ],
+        default='MESH'
+    )
+
+    point_radius: FloatProperty(
+        name="Point Radius",
+        description="Radius of the points of scans imported as points",
+        default=0.005,
+        min=0.0,
+        precision=4,
+        subtype='DISTANCE'
+    )
+
+    cleanup_scans: BoolProperty(
+        name="Clean Up Scans",
+        description="Merge duplicate vertices and remove degenerate faces of imported scans",
+        default=True
+    )
+
+    scan_grid_divisions: IntProperty(
+        name="Scan Grid",
+        description="Split scans into this many chunks along X and Y, chunks no shot camera sees are hidden",
+        default=1,
+        min=1,
+        max=16
+    )
+
+    use_shot_coverage: BoolProperty(
+        name="Shot Coverage",
+        description="Ray cast which scan vertices each shot sees and mask its projection to them",
+        default=False
+    )
+
+    coverage_frame_samples: IntProperty(
+        name="Coverage Frames",
+        description="Frames of the shot whose occlusion is ray cast, the frustum is tested on every frame",
+        default=8,
+        min=1,
+        max=256
+    )
+
+    use_scan_lod: BoolProperty(
+        name="Viewport LOD",
+        description="Display a decimated scan in the viewport, final renders use the full scan",
+        default=False
+    )
+
+    scan_lod_resolution: IntProperty(
+        name="LOD Resolution",
+        description="Cells along the longest side of the scan used to decimate the viewport LOD",
+        default=256,
+        min=8,
+        max=4096
+    )
+
+    simplify_keyframes: BoolProperty(
+        name="Simplify Keyframes",
+        description="Remove the camera keyframes that linear interpolation recovers within the tolerances",
+        default=False
+    )
+
+    location_tolerance: FloatProperty(
+        name="Location Tolerance",
+        description="Maximum location error of the simplified camera path",
+        default=0.0001,
+        min=0.0,
+        precision=5,
+        subtype='DISTANCE'
+    )
+
+    rotation_tolerance: FloatProperty(
+        name="Rotation Tolerance",
+        description="Maximum rotation error of the simplified camera path",
+        default=0.0001745,
+        min=0.0,
+        precision=3,
+        subtype='ANGLE'
+    )
+
+    scale_tolerance: FloatProperty(
+        name="Scale Tolerance",
+        description="Maximum scale error of the simplified camera path",
+        default=0.0001,
+        min=0.0,
+        precision=5
+    )
+
+    lens_tolerance: FloatProperty(
+        name="Focal Length Tolerance",
+        description="Maximum focal length error in millimeters",
+        default=0.01,
+        min=0.0,
+        precision=3
+    )
+
+    focus_tolerance: FloatProperty(
+        name="Focus Distance Tolerance",
+        description="Maximum focus distance error",
+        default=0.001,
+        min=0.0,
+        precision=4,
+        subtype='DISTANCE'
+    )
+
+    shutter_tolerance: FloatProperty(
+        name="Shutter Tolerance",
+        description="Maximum motion blur shutter error, in frames",
+        default=0.001,
+        min=0.0,
+        precision=4
+    )
+
+    use_frame_cache: BoolProperty(
+        name="Cache Frame Data",
+        description="Write the per-frame camera data next to the .omni file in a binary cache to speed up re-imports",
+        default=True
+    )
+
+    media_search_paths: StringProperty(
+        name="Media Search Folders",
+        description="Folders searched for missing videos, cameras and scans, separated by ;",
+        default=""
+    )
+
+    def keyframe_tolerance(self, channel):
+        """Tolerance of a camera channel ('location', 'lens', ...), 0 when simplification is off"""
+        if not self.simplify_keyframes:
+            return 0.0
+        return getattr(self, f"{channel}_tolerance")
+
+    def draw_keyframe_tolerances(self, layout):
+        layout.prop(self, "simplify_keyframes")
+        column = layout.column(align=True)
+        column.enabled = self.simplify_keyframes
+        for channel in ("location", "rotation", "scale", "lens", "focus", "shutter"):
+            column.prop(self, f"{channel}_tolerance")
+
+    def draw_scan_lod(self, layout):
+        if self.scan_import_mode == 'POINTS':
+            return
+        layout.prop(self, "use_scan_lod")
+        if self.use_scan_lod:
+            layout.prop(self, "scan_lod_resolution")
+
+    def draw_shot_coverage(self, layout):
+        layout.prop(self, "use_shot_coverage")
+        if self.use_shot_coverage:
+            layout.prop(self, "coverage_frame_samples")
+
     def draw(self, context):
         layout = self.layout
 
@@ -58,6 +213,15 @@ class OMNI_Preferences(AddonPreferences):
         box.label(text="Import Options", icon='IMPORT')
         box.prop(self, "use_shadow_catcher")
         box.prop(self, "use_holdout")
+        box.prop(self, "scan_import_mode")
+        if self.scan_import_mode == 'POINTS':
+            box.prop(self, "point_radius")
+        box.prop(self, "cleanup_scans")
+        box.prop(self, "scan_grid_divisions")
+        self.draw_shot_coverage(box)
+        self.draw_scan_lod(box)
+        box.prop(self, "use_frame_cache")
+        box.prop(self, "media_search_paths")
 
         # Renderer Option
         box = layout.box()
@@ -70,6 +234,7 @@ class OMNI_Preferences(AddonPreferences):
         box = layout.box()
         box.label(text="Camera Settings", icon='CAMERA_DATA')
         box.prop(self, "bake_camera_keyframes")
+        self.draw_keyframe_tolerances(box)
 
         # Useful Links
         row = layout.row()
@@ -0,0 +1,191 @@
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from .omniParser import OmniStreamReader, OmniParseError
+from .omniSidecar import read_sidecar, write_sidecar
+from .mediaIndex import resolve_missing_files
+
+MINIMUM_OMNI_VERSION = "2.1.0"
+
+# Bytes of the start of a file hashed with its size and modification time to tell duplicates apart
+HASH_CHUNK_SIZE = 1 << 16
+
+
+class OmniPreflight:
+    """Everything about a .omni file that can be gathered without touching bpy"""
+
+    __slots__ = (
+        "omni_file",
+        "header",
+        "document",
+        "video_filepath",
+        "camera_filepath",
+        "geo_filepath",
+        "geo_filepaths",
+        "file_sizes",
+        "digest",
+        "relinked_files",
+        "error",
+    )
+
+    def __init__(self, omni_file):
+        self.omni_file = omni_file
+        self.header = None
+        self.document = None
+        self.video_filepath = ""
+        self.camera_filepath = ""
+        self.geo_filepath = ""
+        self.geo_filepaths = []
+        self.file_sizes = {}
+        self.digest = None
+        self.relinked_files = {}
+        self.error = None
+
+    @property
+    def import_key(self):
+        """Files with the same content and media import the same shot"""
+        return (self.digest, self.video_filepath, self.camera_filepath, tuple(self.geo_filepaths))
+
+    @property
+    def is_video_file_missing(self):
+        return self.video_filepath not in self.file_sizes
+
+    @property
+    def is_camera_file_missing(self):
+        return self.camera_filepath not in self.file_sizes
+
+    @property
+    def is_geo_file_missing(self):
+        return self.geo_filepath not in self.file_sizes
+
+    @property
+    def missing_geo_chunks(self):
+        """Geometry chunks after the first one that can't be found, they are skipped at import"""
+        return [filepath for filepath in self.geo_filepaths[1:] if filepath not in self.file_sizes]
+
+
+def is_header_supported(header, current_version_str):
+    blender_data = header['blender']
+    if blender_data:
+        minimum_addon_version = blender_data['minimum_addon_version']
+        if minimum_addon_version and current_version_str < minimum_addon_version:
+            return False
+    return header['version'] >= MINIMUM_OMNI_VERSION
+
+
+def read_document(omni_file, current_version_str, use_frame_cache=True):
+    """Return (header, document) of omni_file.
+
+    document is None when the header shows the file can't be imported, in
+    which case the frames are never read.
+    """
+    # Prefer the binary frame cache when it is newer than the .omni file
+    document = read_sidecar(omni_file) if use_frame_cache else None
+    if document is not None:
+        return document.header, document
+
+    with open(omni_file, 'r') as f:
+        reader = OmniStreamReader(f)
+
+        # Only the header is read before deciding whether the file can be imported
+        header = reader.read_header()
+        if not is_header_supported(header, current_version_str):
+            return header, None
+
+        # Stream the rest of the file, frames go straight into columns
+        document = reader.read_document()
+
+    if use_frame_cache:
+        write_sidecar(omni_file, document)
+    return header, document
+
+
+def file_digest(filepath):
+    """Digest of the size, modification time and header of filepath, without reading the whole file"""
+    stat = os.stat(filepath)
+    digest = hashlib.blake2b(f"{stat.st_size}:{stat.st_mtime_ns}".encode(), digest_size=16)
+    with open(filepath, 'rb') as f:
+        digest.update(f.read(HASH_CHUNK_SIZE))
+    return digest.hexdigest()
+
+
+def preflight_omni(omni_file, current_version_str, use_frame_cache=True, search_roots=(), use_digest=False):
+    """Check omni_file can be imported and gather its media.
+
+    use_digest fills OmniPreflight.digest, only needed to skip duplicates within a batch.
+    """
+    preflight = OmniPreflight(omni_file)
+    try:
+        preflight.header, preflight.document = read_document(omni_file, current_version_str, use_frame_cache)
+        if preflight.document is None:
+            return preflight
+        if use_digest:
+            preflight.digest = file_digest(omni_file)
+
+        document = preflight.document
+        video_relative_path = document.section('video')['relative_path']
+        camera_relative_path = document.section('camera')['relative_path']
+        geo_relative_paths = document.section('geometry')['relative_path']
+        if not geo_relative_paths:
+            raise IndexError("no geometry listed")
+    except (OSError, OmniParseError, KeyError, IndexError, TypeError) as e:
+        preflight.error = f"Could not read {os.path.basename(omni_file)}: {e}"
+        return preflight
+
+    # Make the filepaths absolute by combining them with the path of the .json file
+    omni_dir = os.path.dirname(omni_file)
+    preflight.video_filepath = os.path.join(omni_dir, video_relative_path)
+    preflight.camera_filepath = os.path.join(omni_dir, camera_relative_path)
+    # Scans can be split in several chunks
+    preflight.geo_filepaths = [os.path.join(omni_dir, path) for path in geo_relative_paths]
+    preflight.geo_filepath = preflight.geo_filepaths[0]
+
+    # Files that exist are recorded with their size
+    for filepath in [preflight.video_filepath, preflight.camera_filepath] + preflight.geo_filepaths:
+        try:
+            preflight.file_sizes[filepath] = os.path.getsize(filepath)
+        except OSError:
+            pass
+
+    if search_roots:
+        relink_missing_files(preflight, search_roots)
+
+    return preflight
+
+
+def relink_missing_files(preflight, search_roots):
+    filepaths = [preflight.video_filepath, preflight.camera_filepath] + preflight.geo_filepaths
+    missing_files = [filepath for filepath in filepaths if filepath not in preflight.file_sizes]
+    if not missing_files:
+        return
+
+    resolved_files = resolve_missing_files(missing_files, search_roots)
+    for missing_file, resolved_file in resolved_files.items():
+        try:
+            preflight.file_sizes[resolved_file] = os.path.getsize(resolved_file)
+        except OSError:
+            continue
+        preflight.relinked_files[missing_file] = resolved_file
+
+    def relinked(filepath):
+        return preflight.relinked_files.get(filepath, filepath)
+
+    preflight.video_filepath = relinked(preflight.video_filepath)
+    preflight.camera_filepath = relinked(preflight.camera_filepath)
+    preflight.geo_filepaths = [relinked(filepath) for filepath in preflight.geo_filepaths]
+    preflight.geo_filepath = preflight.geo_filepaths[0]
+
+
+def preflight_omni_files(omni_files, current_version_str, use_frame_cache=True, search_roots=(), max_workers=None):
+    """Run preflight_omni on every file in worker threads, results keep the input order"""
+    # Duplicates only matter when there is more than one file
+    use_digest = len(omni_files) > 1
+
+    def preflight(omni_file):
+        return preflight_omni(omni_file, current_version_str, use_frame_cache, search_roots, use_digest)
+
+    if not use_digest:
+        return [preflight(omni_files[0])] if omni_files else []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(preflight, omni_files))
@@ -0,0 +1,119 @@
+import json
+import mmap
+import os
+import struct
+import numpy as np
+from .omniData import OmniDocument, OmniFrameData
+
+# Binary cache of the per-frame channels of a .omni file, written next to it.
+#
+# Layout (little-endian):
+#   header        magic, format version, column count, header JSON size
+#   header JSON   the .omni tree without the frame arrays, padded to 4 bytes
+#   column table  per column: "section/channel" name and value count
+#   columns       float32 values, one column after the other
+
+SIDECAR_EXTENSION = ".omnic"
+MAGIC = b"OMNC"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<4sHHI")
+_COLUMN = struct.Struct("<56sQ")
+_COLUMN_DTYPE = np.dtype("<f4")
+
+
+def sidecar_path(omni_file):
+    return os.path.splitext(omni_file)[0] + SIDECAR_EXTENSION
+
+
+def is_sidecar_fresh(omni_file):
+    path = sidecar_path(omni_file)
+    try:
+        return os.path.getmtime(path) >= os.path.getmtime(omni_file)
+    except OSError:
+        return False
+
+
+def write_sidecar(omni_file, document):
+    """Write the sidecar of omni_file, return False if it could not be written"""
+    header_json = json.dumps(document.header).encode("utf-8")
+    header_json += b" " * (-len(header_json) % 4)
+
+    columns = []
+    for section, frame_data in document.frames.items():
+        for channel, column in frame_data.channels.items():
+            name = f"{section}/{channel}".encode("utf-8")
+            if len(name) > _COLUMN.size - 8:
+                continue
+            columns.append((name, np.ascontiguousarray(column, dtype=_COLUMN_DTYPE)))
+
+    path = sidecar_path(omni_file)
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(columns), len(header_json)))
+            f.write(header_json)
+            for name, column in columns:
+                f.write(_COLUMN.pack(name, len(column)))
+            for _, column in columns:
+                f.write(column.tobytes())
+        # Readers never see a partially written sidecar
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not write frame cache {path}: {e}")
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def read_sidecar(omni_file):
+    """Return the OmniDocument stored in the sidecar of omni_file.
+
+    Columns are zero-copy views of the memory-mapped file. Returns None when
+    the sidecar is missing, older than the .omni or not readable.
+    """
+    if not is_sidecar_fresh(omni_file):
+        return None
+
+    try:
+        with open(sidecar_path(omni_file), "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        return _parse_sidecar(buffer)
+    except (ValueError, struct.error, UnicodeDecodeError):
+        return None
+
+
+def _parse_sidecar(buffer):
+    magic, version, column_count, header_size = _HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Unsupported frame cache")
+
+    offset = _HEADER.size
+    header = json.loads(bytes(buffer[offset:offset + header_size]).decode("utf-8"))
+    offset += header_size
+
+    table = []
+    for _ in range(column_count):
+        name, count = _COLUMN.unpack_from(buffer, offset)
+        table.append((name.rstrip(b"\0").decode("utf-8"), count))
+        offset += _COLUMN.size
+
+    frames = {}
+    for name, count in table:
+        section, channel = name.split("/", 1)
+        column = np.frombuffer(buffer, dtype=_COLUMN_DTYPE, count=count, offset=offset)
+        offset += count * _COLUMN_DTYPE.itemsize
+
+        frame_data = frames.get(section)
+        if frame_data is None:
+            frame_data = frames[section] = OmniFrameData(count)
+        frame_data.channels[channel] = column
+
+    return OmniDocument(header, frames)
@@ -0,0 +1,123 @@
+import bpy
+import os
+from concurrent.futures import ThreadPoolExecutor
+from bpy.props import StringProperty, BoolProperty
+from bpy.types import Operator
+
+
+def remap_path(path, rules):
+    """Apply the first matching (old prefix, new prefix) rule to path, None if no rule matches"""
+    normalized = path.replace("\\", "/")
+    for old_prefix, new_prefix in rules:
+        old_prefix = old_prefix.replace("\\", "/").rstrip("/")
+        if old_prefix and (normalized == old_prefix or normalized.startswith(old_prefix + "/")):
+            return os.path.normpath(new_prefix.rstrip("/\\") + normalized[len(old_prefix):])
+    return None
+
+
+def keep_path_style(old_path, new_path):
+    """new_path relative to the .blend when old_path was, absolute otherwise"""
+    if not old_path.startswith("//") or not bpy.data.filepath:
+        return new_path
+    try:
+        return bpy.path.relpath(new_path)
+    except ValueError:
+        # No relative path between drives
+        return new_path
+
+
+def iter_omni_shots():
+    for scene in bpy.data.scenes:
+        for collection in scene.Omni_Collections:
+            yield from collection.shots
+
+
+def collect_media_paths():
+    """Return every Omniscient-owned (owner, path property) pair.
+
+    Images are shared by the shot, the camera background and the compositor,
+    so rewriting the image is enough for all three.
+    """
+    shots = list(iter_omni_shots())
+    images = {shot.video for shot in shots if shot.video}
+    video_paths = {bpy.path.abspath(image.filepath) for image in images}
+
+    owners = [(image, "filepath") for image in images]
+    owners += [(clip, "filepath") for clip in bpy.data.movieclips
+               if bpy.path.abspath(clip.filepath) in video_paths]
+
+    cache_files = set()
+    for shot in shots:
+        if shot.camera:
+            for constraint in shot.camera.constraints:
+                if constraint.type == 'TRANSFORM_CACHE' and constraint.cache_file:
+                    cache_files.add(constraint.cache_file)
+    owners += [(cache_file, "filepath") for cache_file in cache_files]
+
+    for shot in shots:
+        owners += [(shot, "camera_filepath"), (shot, "geometry_filepath")]
+        owners += [(chunk, "filepath") for chunk in shot.geometry_chunks]
+    return owners
+
+
+def relocate_media(rules, verify=True):
+    """Rewrite the media paths of every shot in the file with prefix remap rules.
+
+    New paths are checked in parallel when verify is set, owners whose new
+    path doesn't exist are left untouched, relative paths stay relative. Only
+    datablocks whose path changed are reloaded. Returns (relocated count, list of missing paths).
+    """
+    changes = []
+    for owner, path_property in collect_media_paths():
+        old_path = getattr(owner, path_property)
+        if not old_path:
+            continue
+        new_path = remap_path(bpy.path.abspath(old_path), rules)
+        if new_path is not None and new_path != bpy.path.abspath(old_path):
+            changes.append((owner, path_property, new_path))
+
+    new_paths = sorted({new_path for _, _, new_path in changes})
+    if verify:
+        with ThreadPoolExecutor() as executor:
+            existing = dict(zip(new_paths, executor.map(os.path.exists, new_paths)))
+    else:
+        existing = dict.fromkeys(new_paths, True)
+
+    relocated_count = 0
+    for owner, path_property, new_path in changes:
+        if not existing[new_path]:
+            continue
+        setattr(owner, path_property, keep_path_style(getattr(owner, path_property), new_path))
+        if isinstance(owner, bpy.types.Image):
+            owner.reload()
+        relocated_count += 1
+
+    missing_paths = [new_path for new_path in new_paths if not existing[new_path]]
+    return relocated_count, missing_paths
+
+
+class OMNI_OT_RelocateMedia(Operator):
+    """Replace the start of the media paths of every imported shot"""
+    bl_idname = "wm.relocate_omni_media"
+    bl_label = "Relocate Media"
+    bl_options = {'UNDO'}
+
+    old_prefix: StringProperty(name="From", description="Start of the current paths", subtype='DIR_PATH')
+    new_prefix: StringProperty(name="To", description="Replacement for the start of the paths", subtype='DIR_PATH')
+    verify: BoolProperty(name="Only Existing Files",
+                         description="Only relocate files found at their new path",
+                         default=True)
+
+    def execute(self, context):
+        if not self.old_prefix:
+            self.report({'ERROR'}, "No path to relocate")
+            return {'CANCELLED'}
+
+        relocated_count, missing_paths = relocate_media([(self.old_prefix, self.new_prefix)], self.verify)
+        for missing_path in missing_paths:
+            self.report({'WARNING'}, f"Not found: {missing_path}")
+        self.report({'INFO'}, f"Relocated {relocated_count} paths")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
@@ -0,0 +1,78 @@
+import bpy
+import numpy as np
+from .bulkKeyframes import (
+    assign_action,
+    ensure_fcurve,
+    find_fcurve,
+    read_keyframes,
+    write_keyframes,
+    write_property_keyframes
+)
+from .ui.utils import clear_motion_blur_keyframes
+
+# Custom property marking the actions holding the render animation of a shot
+RENDER_ACTION_TAG = "omni_render_action"
+
+SHUTTER_DATA_PATH = "render.motion_blur_shutter"
+
+
+def is_render_action(action):
+    return action is not None and bool(action.get(RENDER_ACTION_TAG))
+
+
+def create_render_action(scene, name, frames, shutter_values, tolerance=0.0):
+    """Key the shutter of a shot in a new action, without changing the animation of scene.
+
+    Returns (action, number of keys removed by simplification).
+    """
+    action = bpy.data.actions.new(name=name)
+    action[RENDER_ACTION_TAG] = True
+
+    # Keys are written through the scene so the action gets a slot for it
+    anim = scene.animation_data or scene.animation_data_create()
+    previous_action = anim.action
+    assign_action(scene, action)
+    removed_keys = write_property_keyframes(scene, SHUTTER_DATA_PATH, frames, shutter_values, tolerance=tolerance)[1]
+    assign_action(scene, previous_action)
+
+    return action, removed_keys
+
+
+def migrate_shutter_speed_keyframes(scene, shot):
+    """Turn the per-frame shutter speeds stored by older versions into the render action of shot, once"""
+    keyframes = shot.shutter_speed_keyframes
+    if shot.render_action or not len(keyframes):
+        return
+
+    frames = np.empty(len(keyframes), dtype=np.float32)
+    shutter_speeds = np.empty(len(keyframes), dtype=np.float32)
+    keyframes.foreach_get("frame", frames)
+    keyframes.foreach_get("value", shutter_speeds)
+
+    shot.render_action = create_render_action(scene, f"{shot.name}RenderAction", frames, shutter_speeds * shot.fps)[0]
+    keyframes.clear()
+
+
+def apply_shot_render_action(scene, shot):
+    """Give scene the render animation of shot.
+
+    The stored action is assigned as is, unless the scene action holds other
+    animation: then only its shutter curve is replaced.
+    """
+    migrate_shutter_speed_keyframes(scene, shot)
+
+    anim = scene.animation_data
+    current_action = anim.action if anim else None
+    if current_action is None or is_render_action(current_action):
+        if current_action != shot.render_action:
+            assign_action(scene, shot.render_action)
+        return
+
+    clear_motion_blur_keyframes(scene)
+    fcurve = find_fcurve(shot.render_action, SHUTTER_DATA_PATH) if shot.render_action else None
+    if fcurve is None or not len(fcurve.keyframe_points):
+        return
+
+    frames, values = read_keyframes(fcurve)
+    interpolation = fcurve.keyframe_points[0].interpolation
+    write_keyframes(ensure_fcurve(scene, SHUTTER_DATA_PATH), frames, values, interpolation)
@@ -0,0 +1,113 @@
+"""Vectorised cleanup and decimation of MeshData, without bpy."""
+
+import numpy as np
+from .meshReader import MeshData
+
+# Faces with a smaller area are degenerate
+DEGENERATE_AREA = 1e-12
+
+
+def _next_loops(mesh_data, starts):
+    """Index of the next corner of the same face for every face corner"""
+    next_loops = np.arange(1, len(mesh_data.loop_vertices) + 1)
+    next_loops[starts + mesh_data.face_sizes - 1] = starts
+    return next_loops
+
+
+def face_areas(mesh_data):
+    """Area of every face, with the Newell method so any polygon works"""
+    starts = mesh_data.loop_starts()
+    corners = mesh_data.vertices[mesh_data.loop_vertices].astype(np.float64)
+    crosses = np.cross(corners, corners[_next_loops(mesh_data, starts)])
+    normals = np.add.reduceat(crosses, starts, axis=0)
+    return 0.5 * np.linalg.norm(normals, axis=1)
+
+
+def keep_faces(mesh_data, keep):
+    """MeshData with only the faces where keep is set, and the vertices they use"""
+    loop_mask = np.repeat(keep, mesh_data.face_sizes)
+    loop_vertices = mesh_data.loop_vertices[loop_mask]
+
+    used = np.zeros(len(mesh_data.vertices), dtype=bool)
+    used[loop_vertices] = True
+    new_indices = np.cumsum(used, dtype=np.int32) - 1
+
+    return MeshData(
+        mesh_data.vertices[used],
+        new_indices[loop_vertices],
+        mesh_data.face_sizes[keep],
+        mesh_data.uvs[loop_mask] if mesh_data.uvs is not None else None,
+        mesh_data.colors[used] if mesh_data.colors is not None else None,
+    )
+
+
+def merge_duplicate_vertices(mesh_data):
+    """Merge vertices at the same position, returns (MeshData, merged vertex count)"""
+    _, first_indices, inverse = np.unique(mesh_data.vertices, axis=0, return_index=True, return_inverse=True)
+    merged_count = len(mesh_data.vertices) - len(first_indices)
+    if not merged_count:
+        return mesh_data, 0
+
+    merged = MeshData(
+        mesh_data.vertices[first_indices],
+        inverse.ravel().astype(np.int32)[mesh_data.loop_vertices],
+        mesh_data.face_sizes,
+        mesh_data.uvs,
+        mesh_data.colors[first_indices] if mesh_data.colors is not None else None,
+    )
+    return merged, merged_count
+
+
+def remove_degenerate_faces(mesh_data):
+    """Remove faces using a vertex twice in a row or without area, returns (MeshData, removed face count)"""
+    starts = mesh_data.loop_starts()
+    loop_vertices = mesh_data.loop_vertices
+    repeated = loop_vertices == loop_vertices[_next_loops(mesh_data, starts)]
+    degenerate = np.logical_or.reduceat(repeated, starts) | (face_areas(mesh_data) <= DEGENERATE_AREA)
+
+    removed_count = int(np.count_nonzero(degenerate))
+    if not removed_count:
+        return mesh_data, 0
+    return keep_faces(mesh_data, ~degenerate), removed_count
+
+
+def clean_mesh(mesh_data):
+    """Merge duplicate vertices then remove degenerate faces.
+
+    Returns (MeshData, merged vertex count, removed face count).
+    """
+    mesh_data, merged_count = merge_duplicate_vertices(mesh_data)
+    mesh_data, removed_count = remove_degenerate_faces(mesh_data)
+    return mesh_data, merged_count, removed_count
+
+
+def decimate_vertex_clustering(mesh_data, resolution):
+    """Decimate by merging the vertices of every cell of a grid.
+
+    resolution is the number of cells along the longest side of the bounding
+    box. Vertices are replaced by the mean of their cell and collapsed faces
+    are removed.
+    """
+    vertices = mesh_data.vertices
+    lower = vertices.min(axis=0)
+    cell_size = float((vertices.max(axis=0) - lower).max()) / resolution
+    if cell_size <= 0.0:
+        return mesh_data
+
+    cells = np.floor((vertices - lower) / cell_size).astype(np.int64)
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+
+    def cell_means(values):
+        sums = np.column_stack([np.bincount(inverse, weights=values[:, i], minlength=len(counts))
+                                for i in range(values.shape[1])])
+        return (sums / counts[:, None]).astype(np.float32)
+
+    decimated = MeshData(
+        cell_means(vertices),
+        inverse.astype(np.int32)[mesh_data.loop_vertices],
+        mesh_data.face_sizes,
+        mesh_data.uvs,
+        cell_means(mesh_data.colors) if mesh_data.colors is not None else None,
+    )
+    return remove_degenerate_faces(decimated)[0]
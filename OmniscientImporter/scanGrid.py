@@ -0,0 +1,79 @@
+"""Spatial grid chunking of scans and camera frustum tests, without bpy."""
+
+import numpy as np
+from .scanCleanup import keep_faces
+
+# Frames tested at once, bounds the (frames, boxes, corners) arrays
+FRUSTUM_FRAME_BLOCK = 256
+
+_BOX_CORNERS = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float64)
+
+
+def face_centers(mesh_data):
+    corners = mesh_data.vertices[mesh_data.loop_vertices].astype(np.float64)
+    sums = np.add.reduceat(corners, mesh_data.loop_starts(), axis=0)
+    return sums / mesh_data.face_sizes[:, None]
+
+
+def split_mesh_grid(mesh_data, divisions):
+    """Split the faces of mesh_data on a divisions x divisions grid over the XY bounding box.
+
+    Returns a list of ((column, row), MeshData), empty cells are skipped.
+    """
+    if divisions <= 1:
+        return [((0, 0), mesh_data)]
+
+    centers = face_centers(mesh_data)[:, :2]
+    lower = centers.min(axis=0)
+    size = np.maximum(centers.max(axis=0) - lower, 1e-9)
+    cells = np.minimum((divisions * (centers - lower) / size).astype(np.int64), divisions - 1)
+    cell_ids = cells[:, 0] * divisions + cells[:, 1]
+
+    parts = []
+    for cell_id in np.unique(cell_ids):
+        cell = (int(cell_id // divisions), int(cell_id % divisions))
+        parts.append((cell, keep_faces(mesh_data, cell_ids == cell_id)))
+    return parts
+
+
+def visible_boxes(world_matrices, tan_half_x, tan_half_y, clip_start, clip_end, box_min, box_max):
+    """Which axis-aligned boxes are inside the camera frustum on at least one frame.
+
+    world_matrices: (frames, 4, 4) camera to world matrices, the camera
+    looking down -Z. tan_half_x / tan_half_y: tangent of the half field of
+    view, scalar or one per frame. box_min / box_max: (boxes, 3).
+    A box is culled on a frame only when its 8 corners are all outside one of
+    the frustum planes, so the test is conservative.
+    """
+    corners = box_min[:, None, :] + _BOX_CORNERS[None] * (box_max - box_min)[:, None, :]
+    corners = np.concatenate([corners, np.ones(corners.shape[:2] + (1,))], axis=2)
+
+    frame_count = len(world_matrices)
+    tan_half_x = np.broadcast_to(np.asarray(tan_half_x, dtype=np.float64), (frame_count,))
+    tan_half_y = np.broadcast_to(np.asarray(tan_half_y, dtype=np.float64), (frame_count,))
+    view_matrices = np.linalg.inv(world_matrices)
+
+    visible = np.zeros(len(box_min), dtype=bool)
+    for start in range(0, frame_count, FRUSTUM_FRAME_BLOCK):
+        block = slice(start, start + FRUSTUM_FRAME_BLOCK)
+        # (frames, boxes, corners, 4)
+        local = np.einsum("fij,bcj->fbci", view_matrices[block], corners)
+        x, y, depth = local[..., 0], local[..., 1], -local[..., 2]
+        tx = tan_half_x[block, None, None]
+        ty = tan_half_y[block, None, None]
+
+        planes = (
+            depth - clip_start,
+            clip_end - depth,
+            depth * tx + x,
+            depth * tx - x,
+            depth * ty + y,
+            depth * ty - y,
+        )
+        culled = np.zeros(local.shape[:2], dtype=bool)
+        for distances in planes:
+            culled |= np.all(distances < 0.0, axis=2)
+        visible |= np.any(~culled, axis=0)
+        if visible.all():
+            break
+    return visible
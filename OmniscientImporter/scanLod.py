@@ -0,0 +1,99 @@
+import bpy
+
+LOD_NODE_GROUP_NAME = "OmniScanLOD"
+LOD_MODIFIER_NAME = "Omni Viewport LOD"
+LOD_SOCKET_NAME = "LOD"
+
+
+def _new_group_socket(node_group, name, in_out, socket_type):
+    if hasattr(node_group, "interface"):
+        return node_group.interface.new_socket(name=name, in_out=in_out, socket_type=socket_type)
+    sockets = node_group.inputs if in_out == 'INPUT' else node_group.outputs
+    return sockets.new(socket_type, name)
+
+
+def lod_node_group():
+    """Geometry nodes replacing the geometry with the mesh of the LOD object input, built once per file"""
+    node_group = bpy.data.node_groups.get(LOD_NODE_GROUP_NAME)
+    if node_group:
+        return node_group
+
+    node_group = bpy.data.node_groups.new(LOD_NODE_GROUP_NAME, 'GeometryNodeTree')
+    _new_group_socket(node_group, "Geometry", 'INPUT', 'NodeSocketGeometry')
+    _new_group_socket(node_group, LOD_SOCKET_NAME, 'INPUT', 'NodeSocketObject')
+    _new_group_socket(node_group, "Geometry", 'OUTPUT', 'NodeSocketGeometry')
+
+    nodes = node_group.nodes
+    group_input = nodes.new("NodeGroupInput")
+    group_input.location = (-400.0, 0.0)
+    object_info = nodes.new("GeometryNodeObjectInfo")
+    object_info.location = (-150.0, 0.0)
+    # The LOD mesh is placed by the transform of the scan object
+    object_info.transform_space = 'ORIGINAL'
+    group_output = nodes.new("NodeGroupOutput")
+    group_output.location = (100.0, 0.0)
+
+    node_group.links.new(group_input.outputs[LOD_SOCKET_NAME], object_info.inputs["Object"])
+    node_group.links.new(object_info.outputs["Geometry"], group_output.inputs["Geometry"])
+    return node_group
+
+
+def _lod_socket_identifier(node_group):
+    if hasattr(node_group, "interface"):
+        return next(item.identifier for item in node_group.interface.items_tree
+                    if getattr(item, "in_out", None) == 'INPUT' and item.name == LOD_SOCKET_NAME)
+    return node_group.inputs[LOD_SOCKET_NAME].identifier
+
+
+def set_scan_lod(obj, viewport_mesh):
+    """Display viewport_mesh in the viewport, final renders keep the mesh of obj.
+
+    The LOD is a geometry nodes modifier enabled in the viewport only, so
+    the data of obj never changes and undo, viewport renders and final
+    renders all see a consistent scan. The LOD object is not linked to any
+    collection, the modifier is its only user. Called on new scan objects,
+    the modifier is first so later ones, like UV Project, work on the
+    displayed geometry.
+    """
+    obj.omni_viewport_mesh = viewport_mesh
+    lod_object = bpy.data.objects.new(viewport_mesh.name, viewport_mesh)
+
+    node_group = lod_node_group()
+    modifier = obj.modifiers.new(LOD_MODIFIER_NAME, 'NODES')
+    modifier.node_group = node_group
+    modifier[_lod_socket_identifier(node_group)] = lod_object
+    modifier.show_render = False
+    # The full scan is what gets edited
+    modifier.show_in_editmode = False
+    return modifier
+
+
+def scan_lod_modifier(obj):
+    modifier = obj.modifiers.get(LOD_MODIFIER_NAME)
+    return modifier if modifier and modifier.type == 'NODES' else None
+
+
+def scan_meshes(obj):
+    """Every mesh an imported scan object can display"""
+    meshes = [obj.data, obj.omni_viewport_mesh]
+    return list(dict.fromkeys(mesh for mesh in meshes if mesh))
+
+
+def assign_scan_material(obj, material):
+    for mesh in scan_meshes(obj):
+        if mesh.materials:
+            mesh.materials[0] = material
+        else:
+            mesh.materials.append(material)
+
+
+def register():
+    bpy.types.Object.omni_viewport_mesh = bpy.props.PointerProperty(
+        name="Viewport Mesh",
+        description="Decimated scan displayed in the viewport",
+        type=bpy.types.Mesh
+    )
+
+
+def unregister():
+    del bpy.types.Object.omni_viewport_mesh
@@ -0,0 +1,144 @@
+import bpy
+import numpy as np
+
+POINTS_NODE_GROUP_NAME = "MeshToPoints_Omni"
+POINTS_MODIFIER_NAME = "Omni Points"
+
+
+def create_mesh(name, mesh_data):
+    """Build a smooth shaded mesh from MeshData with bulk foreach_set calls"""
+    mesh = bpy.data.meshes.new(name)
+
+    mesh.vertices.add(len(mesh_data.vertices))
+    mesh.vertices.foreach_set("co", mesh_data.vertices.ravel())
+
+    mesh.loops.add(len(mesh_data.loop_vertices))
+    mesh.loops.foreach_set("vertex_index", mesh_data.loop_vertices)
+
+    mesh.polygons.add(len(mesh_data.face_sizes))
+    mesh.polygons.foreach_set("loop_start", mesh_data.loop_starts())
+    # Blender 3.6+ derives the face sizes from the loop starts
+    if bpy.app.version < (3, 6, 0):
+        mesh.polygons.foreach_set("loop_total", mesh_data.face_sizes)
+
+    if mesh_data.uvs is not None:
+        uv_layer = mesh.uv_layers.new(name="UVMap")
+        uv_layer.data.foreach_set("uv", mesh_data.uvs.ravel())
+
+    if mesh_data.colors is not None and hasattr(mesh, "color_attributes"):
+        color_attribute = mesh.color_attributes.new("Color", 'FLOAT_COLOR', 'POINT')
+        color_attribute.data.foreach_set("color", mesh_data.colors.ravel())
+
+    if hasattr(mesh, "shade_smooth"):
+        mesh.shade_smooth()
+    else:
+        mesh.polygons.foreach_set("use_smooth", np.ones(len(mesh_data.face_sizes), dtype=bool))
+
+    mesh.update()
+    return mesh
+
+
+def create_mesh_object(name, mesh_data, collection):
+    mesh_obj = bpy.data.objects.new(name, create_mesh(name, mesh_data))
+    collection.objects.link(mesh_obj)
+    return mesh_obj
+
+
+def create_point_mesh(name, mesh_data):
+    """Build a vertex-only mesh keeping the per-point colors, faces are never created"""
+    mesh = bpy.data.meshes.new(name)
+
+    mesh.vertices.add(len(mesh_data.vertices))
+    mesh.vertices.foreach_set("co", mesh_data.vertices.ravel())
+
+    if mesh_data.colors is not None and hasattr(mesh, "color_attributes"):
+        color_attribute = mesh.color_attributes.new("Color", 'FLOAT_COLOR', 'POINT')
+        color_attribute.data.foreach_set("color", mesh_data.colors.ravel())
+
+    mesh.update()
+    return mesh
+
+
+def point_data_size(mesh_data):
+    """Bytes of the point positions and colors"""
+    colors_size = mesh_data.colors.nbytes if mesh_data.colors is not None else 0
+    return mesh_data.vertices.nbytes + colors_size
+
+
+def get_points_node_group():
+    """Geometry Nodes group rendering the vertices of a mesh as points, None if this Blender can't build it"""
+    if POINTS_NODE_GROUP_NAME in bpy.data.node_groups:
+        return bpy.data.node_groups[POINTS_NODE_GROUP_NAME]
+
+    node_group = bpy.data.node_groups.new(name=POINTS_NODE_GROUP_NAME, type='GeometryNodeTree')
+    try:
+        build_points_node_group(node_group)
+    except (RuntimeError, KeyError, TypeError) as e:
+        print(f"Could not build {POINTS_NODE_GROUP_NAME}: {e}")
+        bpy.data.node_groups.remove(node_group)
+        return None
+    return node_group
+
+
+def build_points_node_group(node_group):
+    if hasattr(node_group, "is_modifier"):
+        node_group.is_modifier = True
+
+    sockets = (
+        ("Geometry", 'INPUT', 'NodeSocketGeometry'),
+        ("Radius", 'INPUT', 'NodeSocketFloat'),
+        ("Material", 'INPUT', 'NodeSocketMaterial'),
+        ("Geometry", 'OUTPUT', 'NodeSocketGeometry'),
+    )
+    for name, in_out, socket_type in sockets:
+        if hasattr(node_group, "interface"):
+            node_group.interface.new_socket(name=name, in_out=in_out, socket_type=socket_type)
+        elif in_out == 'INPUT':
+            node_group.inputs.new(socket_type, name)
+        else:
+            node_group.outputs.new(socket_type, name)
+
+    nodes = node_group.nodes
+    group_input = nodes.new("NodeGroupInput")
+    group_input.location = (-400.0, 0.0)
+    mesh_to_points = nodes.new("GeometryNodeMeshToPoints")
+    mesh_to_points.mode = 'VERTICES'
+    mesh_to_points.location = (-150.0, 0.0)
+    set_material = nodes.new("GeometryNodeSetMaterial")
+    set_material.location = (100.0, 0.0)
+    group_output = nodes.new("NodeGroupOutput")
+    group_output.location = (350.0, 0.0)
+
+    links = node_group.links
+    links.new(group_input.outputs["Geometry"], mesh_to_points.inputs["Mesh"])
+    links.new(group_input.outputs["Radius"], mesh_to_points.inputs["Radius"])
+    links.new(mesh_to_points.outputs["Points"], set_material.inputs["Geometry"])
+    links.new(group_input.outputs["Material"], set_material.inputs["Material"])
+    links.new(set_material.outputs["Geometry"], group_output.inputs["Geometry"])
+
+
+def set_modifier_input(modifier, name, value):
+    node_group = modifier.node_group
+    if hasattr(node_group, "interface"):
+        identifier = node_group.interface.items_tree[name].identifier
+    else:
+        identifier = node_group.inputs[name].identifier
+    modifier[identifier] = value
+
+
+def create_point_cloud_object(name, mesh_data, collection, radius):
+    points_obj = bpy.data.objects.new(name, create_point_mesh(name, mesh_data))
+    collection.objects.link(points_obj)
+
+    modifier = points_obj.modifiers.new(POINTS_MODIFIER_NAME, 'NODES')
+    modifier.node_group = get_points_node_group()
+    set_modifier_input(modifier, "Radius", radius)
+    return points_obj
+
+
+def set_points_material(obj, material):
+    """Points don't keep the materials of the mesh, the modifier sets it"""
+    modifier = obj.modifiers.get(POINTS_MODIFIER_NAME)
+    if modifier and modifier.node_group:
+        set_modifier_input(modifier, "Material", material)
+        obj.update_tag()
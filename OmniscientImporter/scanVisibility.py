@@ -0,0 +1,95 @@
+import numpy as np
+from .bakeKeyframes import keyframed_world_matrices, sample_world_matrices
+from .bulkKeyframes import find_fcurve
+from .scanGrid import visible_boxes
+
+# Widen the frustum a little so chunks at the edge of the frame are never culled
+FRUSTUM_MARGIN = 1.05
+
+
+def lens_per_frame(camera_data, frames):
+    anim = camera_data.animation_data
+    fcurve = find_fcurve(anim.action, "lens") if anim and anim.action else None
+    if fcurve is None:
+        return np.full(len(frames), camera_data.lens)
+    return np.array([fcurve.evaluate(frame) for frame in frames])
+
+
+def frustum_tangents(camera_data, lens, resolution_x, resolution_y):
+    """Tangents of the horizontal and vertical half fields of view for every lens value"""
+    aspect = resolution_x / resolution_y
+    if camera_data.sensor_fit == 'VERTICAL' or (camera_data.sensor_fit == 'AUTO' and aspect < 1.0):
+        sensor = camera_data.sensor_height if camera_data.sensor_fit == 'VERTICAL' else camera_data.sensor_width
+        tan_half_y = sensor / 2.0 / lens
+        tan_half_x = tan_half_y * aspect
+    else:
+        tan_half_x = camera_data.sensor_width / 2.0 / lens
+        tan_half_y = tan_half_x / aspect
+
+    # Lens shift moves the frame by a fraction of its largest side
+    shift = 1.0 + 2.0 * max(abs(camera_data.shift_x), abs(camera_data.shift_y))
+    return tan_half_x * shift * FRUSTUM_MARGIN, tan_half_y * shift * FRUSTUM_MARGIN
+
+
+def shot_camera_matrices(scene, camera, frame_start, frame_end):
+    """(frames, world matrices) of camera on every frame of a shot.
+
+    A baked camera is read from its F-Curves, other cameras are evaluated
+    with only their parents. Every frame is kept so a chunk seen on any of
+    them is never culled.
+    """
+    frames = np.arange(frame_start, frame_end + 1, dtype=np.float64)
+    matrices = keyframed_world_matrices(camera, frames)
+    if matrices is None:
+        matrices = sample_world_matrices(scene, camera, frames)
+    return frames, matrices
+
+
+def world_bounds(obj):
+    matrix = np.array(obj.matrix_world)
+    corners = np.array(obj.bound_box) @ matrix[:3, :3].T + matrix[:3, 3]
+    return corners.min(axis=0), corners.max(axis=0)
+
+
+def compute_shot_visibility(scene, shot):
+    """Store the scan chunks the camera of shot sees on any of its frames.
+
+    Returns (visible chunk count, chunk count), None when the scan isn't chunked.
+    """
+    chunk_objects = [chunk.obj for chunk in shot.geometry_chunks if chunk.obj]
+    if len(chunk_objects) < 2 or not shot.camera:
+        return None
+
+    camera = shot.camera
+    frames, world_matrices = shot_camera_matrices(scene, camera, shot.frame_start, shot.frame_end)
+    tan_half_x, tan_half_y = frustum_tangents(camera.data,
+                                              lens_per_frame(camera.data, frames),
+                                              shot.resolution_x,
+                                              shot.resolution_y)
+
+    bounds = [world_bounds(obj) for obj in chunk_objects]
+    visible = visible_boxes(world_matrices,
+                            tan_half_x,
+                            tan_half_y,
+                            camera.data.clip_start,
+                            camera.data.clip_end,
+                            np.array([lower for lower, _ in bounds]),
+                            np.array([upper for _, upper in bounds]))
+
+    shot.visible_chunks.clear()
+    for obj, is_visible in zip(chunk_objects, visible):
+        if is_visible:
+            shot.visible_chunks.add().obj = obj
+    shot.use_chunk_culling = True
+    return int(visible.sum()), len(chunk_objects)
+
+
+def apply_shot_visibility(shot):
+    """Hide the scan chunks the camera of shot never sees, in the viewport and in renders"""
+    visible = {chunk.obj for chunk in shot.visible_chunks}
+    for chunk in shot.geometry_chunks:
+        if not chunk.obj:
+            continue
+        hidden = shot.use_chunk_culling and chunk.obj not in visible
+        chunk.obj.hide_render = hidden
+        chunk.obj.hide_viewport = hidden
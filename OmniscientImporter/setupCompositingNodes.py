@@ -1,5 +1,9 @@
 import bpy
 
+# Node kind -> idname that created it, resolved once per session instead of on every call
+_node_idnames = {}
+
+
 def _get_or_create_compositor_tree(scene):
     """Return a compositor node tree, handling old and new APIs"""
     if hasattr(scene, "compositing_node_group"):
@@ -62,24 +66,30 @@ def _ensure_image_output_socket(node_tree):
     )
 
 
-def _new_mix_node(nodes):
-    """Create a Mix node that works across Blender versions"""
-
-    def _try_new(idname):
+def _new_cached_node(nodes, kind, idnames):
+    """Create a node of kind, trying the cached idname first then idnames in order"""
+    cached_idname = _node_idnames.get(kind)
+    for idname in ((cached_idname,) if cached_idname else ()) + tuple(idnames):
         try:
-            return nodes.new(type=idname)
+            node = nodes.new(type=idname)
         except Exception:
-            return None
+            continue
+        _node_idnames[kind] = idname
+        return node
+    _node_idnames.pop(kind, None)
+    return None
 
+
+def _new_mix_node(nodes):
+    """Create a Mix node that works across Blender versions"""
     # Try common node IDs, newest first
-    for idname in (
+    node = _new_cached_node(nodes, "mix", (
         "NodeMix",            # potential generic Mix node type
         "CompositorNodeMix",  # if a new compositor mix exists
         "CompositorNodeMixRGB",
-    ):
-        node = _try_new(idname)
-        if node is not None:
-            return node
+    ))
+    if node is not None:
+        return node
 
     # Fallback: search all node types
     candidate_ids = []
@@ -105,10 +115,9 @@ def _new_mix_node(nodes):
             if identifier not in candidate_ids:
                 candidate_ids.append(identifier)
 
-    for idname in candidate_ids:
-        node = _try_new(idname)
-        if node is not None:
-            return node
+    node = _new_cached_node(nodes, "mix", candidate_ids)
+    if node is not None:
+        return node
 
     # Still nothing; let the caller handle the fallback
     return None
@@ -117,17 +126,10 @@ def _new_mix_node(nodes):
 def _new_value_node(nodes):
     """Create a numeric Value node that works across Blender versions"""
 
-    def _try_new(idname):
-        try:
-            return nodes.new(type=idname)
-        except Exception:
-            return None
-
     # Try the recommended replacement first (5.0+), then legacy compositor value
-    for idname in ("ShaderNodeValue", "CompositorNodeValue"):
-        node = _try_new(idname)
-        if node is not None:
-            return node
+    node = _new_cached_node(nodes, "value", ("ShaderNodeValue", "CompositorNodeValue"))
+    if node is not None:
+        return node
 
     # Fallback: search for any Node subclass that looks like a Value node
     candidate_ids = []
@@ -151,10 +153,9 @@ def _new_value_node(nodes):
             if identifier not in candidate_ids:
                 candidate_ids.append(identifier)
 
-    for idname in candidate_ids:
-        node = _try_new(idname)
-        if node is not None:
-            return node
+    node = _new_cached_node(nodes, "value", candidate_ids)
+    if node is not None:
+        return node
 
     # Nothing usable found
     return None
@@ -0,0 +1,186 @@
+import numpy as np
+from mathutils import Vector
+from mathutils.bvhtree import BVHTree
+from .scanLod import scan_meshes
+from .scanVisibility import frustum_tangents, lens_per_frame, shot_camera_matrices, world_bounds
+
+COVERAGE_ATTRIBUTE_PREFIX = "omni_shot_"
+
+# Rays start this far from the surface so they don't hit the face of their own vertex
+RAY_OFFSET = 1e-3
+
+# Cells along the longest side of the scan, occlusion is first ray cast once per cell and frame
+COVERAGE_GRID_RESOLUTION = 512
+
+
+def coverage_attribute_name(shot_id):
+    return f"{COVERAGE_ATTRIBUTE_PREFIX}{shot_id}"
+
+
+def coverage_frames(frame_start, frame_end, count):
+    """count frames spread evenly over the shot, the frames whose occlusion is ray cast"""
+    return np.unique(np.linspace(frame_start, frame_end, max(count, 1)).round())
+
+
+def mesh_world_data(mesh, matrix_world):
+    """World space vertex positions and normals of mesh as (vertices, 3) arrays"""
+    vertices = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", vertices)
+    normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("normal", normals)
+
+    matrix = np.array(matrix_world)
+    positions = vertices.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3]
+    normals = normals.reshape(-1, 3) @ np.linalg.inv(matrix[:3, :3])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    return positions, np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0.0)
+
+
+def build_occluder_tree(objects):
+    """BVH of the full resolution meshes of objects in world space, used to test occlusion"""
+    positions = []
+    triangles = []
+    vertex_count = 0
+    for obj in objects:
+        mesh = obj.data
+        if not mesh.polygons:
+            continue
+        mesh.calc_loop_triangles()
+        mesh_triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", mesh_triangles)
+        positions.append(mesh_world_data(mesh, obj.matrix_world)[0])
+        triangles.append(mesh_triangles.reshape(-1, 3) + vertex_count)
+        vertex_count += len(mesh.vertices)
+
+    if not triangles:
+        return None
+    # A single conversion of the flat arrays, the tree is built in C from plain lists
+    return BVHTree.FromPolygons(np.concatenate(positions).tolist(), np.concatenate(triangles).tolist())
+
+
+def coverage_cells(positions, lower, cell_size):
+    """Index of the coverage grid cell of every position, cells are numbered per call"""
+    cells = np.floor((positions - lower) / cell_size).astype(np.int64)
+    return np.unique(cells, axis=0, return_inverse=True)[1].ravel()
+
+
+def occluded_vertices(cells, candidates, positions, directions, distances, tree):
+    """Candidate vertices hidden from the camera.
+
+    One ray is cast per cell of cells, the other vertices of a cell are only
+    cast when the first one is hidden, so a vertex is never hidden by the
+    result of another one.
+    """
+    def is_hidden(index):
+        direction = Vector(directions[index])
+        origin = Vector(positions[index]) + direction * RAY_OFFSET
+        return tree.ray_cast(origin, direction, distances[index] - 2.0 * RAY_OFFSET)[0] is not None
+
+    # mathutils has no batched ray cast, visible cells cost a single ray
+    by_cell = candidates[np.argsort(cells[candidates], kind='stable')]
+    sorted_cells = cells[by_cell]
+    starts = np.flatnonzero(np.r_[True, sorted_cells[1:] != sorted_cells[:-1]])
+    ends = np.r_[starts[1:], len(by_cell)]
+    hidden = []
+    for start, end in zip(starts, ends):
+        if is_hidden(by_cell[start]):
+            hidden.append(by_cell[start])
+            hidden.extend(index for index in by_cell[start + 1:end] if is_hidden(index))
+    return np.array(hidden, dtype=np.int64)
+
+
+def vertex_coverage(positions, normals, cells, world_matrices, tan_half_x, tan_half_y, clip_start, clip_end, tree,
+                    ray_frames):
+    """How well the camera sees every vertex, averaged over the frames of world_matrices.
+
+    A vertex scores the cosine between its normal and the direction to the
+    camera on every frame where it is inside the frustum, vertices without
+    normal (points) score 1. Occlusion is only ray cast on the frames flagged
+    in ray_frames, the score is scaled by the share of those frames where the
+    vertex was hidden. Vertices never tested keep their whole score, so the
+    coverage errs toward showing the projection.
+    """
+    score = np.zeros(len(positions))
+    tested = np.zeros(len(positions), dtype=np.int32)
+    occluded = np.zeros(len(positions), dtype=np.int32)
+    for matrix, tx, ty, is_ray_frame in zip(world_matrices, tan_half_x, tan_half_y, ray_frames):
+        local = (positions - matrix[:3, 3]) @ matrix[:3, :3]
+        depth = -local[:, 2]
+        in_frustum = ((depth > clip_start) & (depth < clip_end)
+                      & (np.abs(local[:, 0]) <= depth * tx) & (np.abs(local[:, 1]) <= depth * ty))
+
+        to_camera = matrix[:3, 3] - positions
+        distances = np.linalg.norm(to_camera, axis=1)
+        directions = to_camera / np.maximum(distances, 1e-12)[:, None]
+        facing = np.einsum("ij,ij->i", normals, directions)
+        facing[~normals.any(axis=1)] = 1.0
+
+        candidates = np.flatnonzero(in_frustum & (facing > 0.0))
+        score[candidates] += facing[candidates]
+        if tree is not None and is_ray_frame and len(candidates):
+            tested[candidates] += 1
+            occluded[occluded_vertices(cells, candidates, positions, directions, distances, tree)] += 1
+
+    visible_share = 1.0 - occluded / np.maximum(tested, 1)
+    return (score * visible_share / max(len(world_matrices), 1)).astype(np.float32)
+
+
+def write_coverage_attribute(mesh, name, coverage):
+    attribute = mesh.attributes.get(name)
+    if attribute and (attribute.data_type != 'FLOAT' or attribute.domain != 'POINT'):
+        mesh.attributes.remove(attribute)
+        attribute = None
+    if attribute is None:
+        attribute = mesh.attributes.new(name, 'FLOAT', 'POINT')
+    attribute.data.foreach_set("value", coverage)
+    mesh.update()
+
+
+def compute_shot_coverage(scene, shot, frame_samples):
+    """Store on every scan mesh of shot how well its camera sees each vertex.
+
+    The coverage goes to a float point attribute named after the shot id.
+    Returns (covered vertex count, vertex count).
+    """
+    camera = shot.camera
+    chunk_objects = [chunk.obj for chunk in shot.geometry_chunks if chunk.obj and chunk.obj.type == 'MESH']
+    if not camera or not chunk_objects:
+        return 0, 0
+
+    frames, world_matrices = shot_camera_matrices(scene, camera, shot.frame_start, shot.frame_end)
+    ray_frames = np.isin(frames, coverage_frames(shot.frame_start, shot.frame_end, frame_samples))
+    tan_half_x, tan_half_y = frustum_tangents(camera.data,
+                                              lens_per_frame(camera.data, frames),
+                                              shot.resolution_x,
+                                              shot.resolution_y)
+    tree = build_occluder_tree(chunk_objects)
+
+    # One grid over the whole scan, so every chunk gets cells of the same size
+    bounds = np.array([world_bounds(obj) for obj in chunk_objects])
+    lower = bounds[:, 0].min(axis=0)
+    cell_size = max(float((bounds[:, 1].max(axis=0) - lower).max()) / COVERAGE_GRID_RESOLUTION, 1e-6)
+
+    name = coverage_attribute_name(shot.id)
+    covered_count = vertex_count = 0
+    for obj in chunk_objects:
+        for mesh in scan_meshes(obj):
+            positions, normals = mesh_world_data(mesh, obj.matrix_world)
+            coverage = vertex_coverage(positions, normals, coverage_cells(positions, lower, cell_size),
+                                       world_matrices, tan_half_x, tan_half_y,
+                                       camera.data.clip_start, camera.data.clip_end, tree, ray_frames)
+            write_coverage_attribute(mesh, name, coverage)
+            if mesh == obj.data:
+                covered_count += int(np.count_nonzero(coverage))
+                vertex_count += len(coverage)
+    return covered_count, vertex_count
+
+
+def remove_shot_coverage(shot):
+    name = coverage_attribute_name(shot.id)
+    for chunk in shot.geometry_chunks:
+        if not chunk.obj or chunk.obj.type != 'MESH':
+            continue
+        for mesh in scan_meshes(chunk.obj):
+            attribute = mesh.attributes.get(name)
+            if attribute:
+                mesh.attributes.remove(attribute)
@@ -1,8 +1,12 @@
 import bpy
 import os
-from bpy.props import StringProperty, BoolProperty
+from bpy.props import StringProperty, BoolProperty, CollectionProperty
+from bpy.types import OperatorFileListElement
 from bpy_extras.io_utils import ImportHelper
 from ..loadProcessedOmni import loadProcessedOmni
+from ..mediaIndex import parse_search_paths
+from ..omniHandler import get_current_version_str, import_preflights
+from ..omniPreflight import preflight_omni_files
 
 
 class SelectFileOperator(bpy.types.Operator, ImportHelper):
@@ -27,6 +31,15 @@ class SelectFileOperator(bpy.types.Operator, ImportHelper):
         elif self.file_type == "GEO":
             self.GeoPath = self.filepath
 
+        # The other missing files usually sit next to the selected one
+        selected_dir = os.path.dirname(self.filepath)
+        for path_property in ("CameraPath", "VideoPath", "GeoPath"):
+            path = getattr(self, path_property)
+            if not os.path.exists(path):
+                candidate = os.path.join(selected_dir, os.path.basename(path))
+                if os.path.exists(candidate):
+                    setattr(self, path_property, candidate)
+
         # Have to open again because of this issue :
         # https://blender.stackexchange.com/questions/262627/prevent-properties-dialog-from-closing-during-file-path-selection
         bpy.ops.wm.missing_file_resolver('INVOKE_DEFAULT',
@@ -102,3 +115,43 @@ class MissingFileResolver(bpy.types.Operator):
 
     def invoke(self, context, event):
         return context.window_manager.invoke_props_dialog(self)
+
+
+class MissingMediaBatchResolver(bpy.types.Operator):
+    """Search one folder for the missing media of every shot of a batch import"""
+    bl_label = "Missing Media"
+    bl_idname = "wm.missing_media_batch_resolver"
+    bl_options = {'UNDO'}
+
+    omni_files: CollectionProperty(type=OperatorFileListElement, options={'HIDDEN', 'SKIP_SAVE'})
+    directory: StringProperty(name="Search Folder",
+                              description="Folder searched for the missing media of every shot",
+                              subtype='DIR_PATH')
+
+    def draw(self, context):
+        lay = self.layout
+        lay.label(text=f"Media of {len(self.omni_files)} shots can't be located:")
+        for omni_file in self.omni_files:
+            lay.label(text=os.path.basename(omni_file.name), icon='ERROR')
+        lay.prop(self, "directory")
+
+    def execute(self, context):
+        if not self.directory:
+            self.report({'ERROR'}, "No folder to search")
+            return {'CANCELLED'}
+
+        base_package = '.'.join(__package__.split('.')[:-1])
+        prefs = context.preferences.addons[base_package].preferences
+        search_roots = parse_search_paths(prefs.media_search_paths) + [self.directory]
+        preflights = preflight_omni_files([omni_file.name for omni_file in self.omni_files],
+                                          get_current_version_str(),
+                                          prefs.use_frame_cache,
+                                          search_roots)
+        imported_count, missing_media = import_preflights(self, preflights)
+        for preflight in missing_media:
+            self.report({'WARNING'}, f"Media still missing for {preflight.omni_file}")
+        self.report({'INFO'}, f"Imported {imported_count} of {len(self.omni_files)} .omni files")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
@@ -2,13 +2,19 @@ import bpy
 from bpy.app.handlers import persistent
 from bpy.types import Panel, Operator, PropertyGroup, UIList
 from ..cameraProjection.cameraProjectionMaterial import delete_projection_nodes, reorder_projection_nodes
+from ..cameraProjection.projection_parameters import (migrate_projection_drivers, set_emission,
+                                                      set_projection_multiply, set_projection_resolution,
+                                                      set_scan_color, update_projection_lenses)
+from ..cameraProjection.projection_uv_backend import (PROJECTION_BACKENDS, remove_uv_project_modifiers,
+                                                      set_projection_backend)
 from ..setupCompositingNodes import setup_compositing_nodes
+from ..renderAction import apply_shot_render_action
+from ..scanVisibility import apply_shot_visibility
+from ..shotCoverage import remove_shot_coverage
 from ..icon_manager import icon_manager
 from .utils import (
     adjust_timeline_view,
     hide_omniscient_collections,
-    clear_motion_blur_keyframes,
-    update_related_drivers,
     selected_shot_index_update,
     get_selected_collection_and_shot,
     find_collection_and_shot_index_by_camera,
@@ -21,24 +27,53 @@ from .utils import (
 # -------------------------------------------------------------------
 
 
+# Only read to migrate files saved before the shutter was stored in OmniShot.render_action
 class ShutterSpeedKeyframe(PropertyGroup):
     frame: bpy.props.FloatProperty(name="Frame")
     value: bpy.props.FloatProperty(name="Value")
 
 
+class OmniObjectRef(PropertyGroup):
+    obj: bpy.props.PointerProperty(type=bpy.types.Object)
+    filepath: bpy.props.StringProperty(name="File", subtype='FILE_PATH')
+
+
+def projection_backend_update(self, context):
+    set_projection_backend(context.scene, self)
+
+
+def camera_projection_multiply_update(self, context):
+    set_projection_multiply(context.scene, self)
+
+
 class OmniShot(PropertyGroup):
     id: bpy.props.IntProperty()
     camera: bpy.props.PointerProperty(type=bpy.types.Object)
     mesh: bpy.props.PointerProperty(type=bpy.types.Object)
     video: bpy.props.PointerProperty(type=bpy.types.Image)
+    camera_filepath: bpy.props.StringProperty(name="Camera File", subtype='FILE_PATH')
+    geometry_filepath: bpy.props.StringProperty(name="Geometry File", subtype='FILE_PATH')
+    geometry_chunks: bpy.props.CollectionProperty(type=OmniObjectRef)
+    visible_chunks: bpy.props.CollectionProperty(type=OmniObjectRef)
+    use_chunk_culling: bpy.props.BoolProperty(name="Cull Scan Chunks", default=False)
     fps: bpy.props.FloatProperty(name="FPS", default=24.0)
     frame_start: bpy.props.IntProperty(name="Start Frame", default=1)
     frame_end: bpy.props.IntProperty(name="End Frame", default=250)
     resolution_x: bpy.props.IntProperty(name="Resolution X", default=1920)
     resolution_y: bpy.props.IntProperty(name="Resolution Y", default=1080)
     shutter_speed_keyframes: bpy.props.CollectionProperty(type=ShutterSpeedKeyframe)
+    render_action: bpy.props.PointerProperty(type=bpy.types.Action)
     collection: bpy.props.PointerProperty(type=bpy.types.Collection)
-    camera_projection_multiply: bpy.props.FloatProperty(name="Camera Projection Enabled", default=1.0)
+    camera_projection_multiply: bpy.props.FloatProperty(name="Camera Projection Enabled",
+                                                        default=1.0,
+                                                        update=camera_projection_multiply_update)
+    projection_backend: bpy.props.EnumProperty(
+        name="Projection",
+        description="How the plate of the shot is projected on the scan",
+        items=PROJECTION_BACKENDS,
+        default='SHADER',
+        update=projection_backend_update
+    )
     use_motion_blur: bpy.props.BoolProperty(name="Use Motion Blur", default=False)
 
     def assign_id(self):
@@ -54,6 +89,22 @@ class OmniShot(PropertyGroup):
         return max_id + 1
 
 
+def projection_fallback_update(self, context):
+    scene = context.scene
+    for shot in self.shots:
+        if shot.camera and shot.camera == scene.camera:
+            reorder_projection_nodes(shot, self.use_projection_fallback)
+            break
+
+
+def scan_color_update(self, context):
+    set_scan_color(context.scene, self)
+
+
+def emission_update(self, context):
+    set_emission(context.scene, self)
+
+
 class OmniCollection(PropertyGroup):
     shots: bpy.props.CollectionProperty(type=OmniShot)
     collection: bpy.props.PointerProperty(type=bpy.types.Collection)
@@ -62,16 +113,24 @@ class OmniCollection(PropertyGroup):
     emission_value: bpy.props.FloatProperty(name="Emission Value",
                                             default=0.0,
                                             min=0.0,
-                                            max=1000.0)
+                                            max=1000.0,
+                                            update=emission_update)
     color_scan: bpy.props.FloatVectorProperty(name="Color scan",
                                               subtype='COLOR',
                                               min=0.0,
                                               max=1.0,
-                                              default=(0.18, 0.18, 0.18))
+                                              default=(0.18, 0.18, 0.18),
+                                              update=scan_color_update)
     mix_rgb_emission_input: bpy.props.FloatProperty(name="Mix RGB Emission Input",
                                                     default=0.0,
                                                     min=0.0,
-                                                    max=1.0)
+                                                    max=1.0,
+                                                    update=emission_update)
+    use_projection_fallback: bpy.props.BoolProperty(name="Fallback Shot",
+                                                    description="Fill what the active shot doesn't see with "
+                                                                "the previous shot instead of the scan color",
+                                                    default=True,
+                                                    update=projection_fallback_update)
 
 # -------------------------------------------------------------------
 # Handlers
@@ -113,6 +172,10 @@ def update_active_camera(scene, depsgraph):
 @persistent
 def update_render_settings(self, context):
     scene = context.scene
+    # The projector group reads the render resolution without drivers
+    set_projection_resolution(scene.render.resolution_x, scene.render.resolution_y)
+    # Nor does it follow edits of the lens, sensor or lens animation of the shot cameras
+    update_projection_lenses(scene, context)
     if scene.is_processing_shot:
         return
 
@@ -130,6 +193,13 @@ def update_render_settings(self, context):
             shot.frame_end = scene.frame_end
             shot.fps = get_scene_fps(scene)
 
+@persistent
+def migrate_projection_drivers_on_load(dummy):
+    for scene in bpy.data.scenes:
+        migrated_count = migrate_projection_drivers(scene)
+        if migrated_count:
+            print(f"Replaced the projection drivers of {migrated_count} materials in {scene.name}")
+
 # -------------------------------------------------------------------
 # Panels
 # -------------------------------------------------------------------
@@ -145,6 +215,7 @@ class OMNI_PT_ImportPanel(Panel):
     def draw(self, context):
         layout = self.layout
         layout.operator("import_scene.omni", text="Import .omni")
+        layout.operator("wm.relocate_omni_media", icon='FILE_REFRESH')
 
 
 class OMNI_PT_PreferencesPanel(Panel):
@@ -170,6 +241,12 @@ class OMNI_PT_PreferencesPanel(Panel):
         if prefs.renderer == 'CYCLES':
             box.prop(prefs, "use_shadow_catcher")
         box.prop(prefs, "use_holdout")
+        box.prop(prefs, "scan_import_mode")
+        if prefs.scan_import_mode == 'POINTS':
+            box.prop(prefs, "point_radius")
+        box.prop(prefs, "scan_grid_divisions")
+        prefs.draw_shot_coverage(box)
+        prefs.draw_scan_lod(box)
 
         # Renderer Option
         box = layout.box()
@@ -184,6 +261,7 @@ class OMNI_PT_PreferencesPanel(Panel):
         box = layout.box()
         box.label(text="Camera Settings", icon='CAMERA_DATA')
         box.prop(prefs, "bake_camera_keyframes")
+        prefs.draw_keyframe_tolerances(box)
 
 
 class OMNI_PT_ShotsPanel(Panel):
@@ -206,6 +284,8 @@ class OMNI_PT_ShotsPanel(Panel):
         if collection_index < len(scene.Omni_Collections):
             collection = scene.Omni_Collections[collection_index]
             layout.template_list("OMNI_UL_ShotList", "", collection, "shots", scene, "Selected_Shot_Index")
+            if 0 <= scene.Selected_Shot_Index < len(collection.shots):
+                layout.prop(collection.shots[scene.Selected_Shot_Index], "projection_backend")
 
             box = layout.box()
             box.label(text="Scan")
@@ -213,6 +293,10 @@ class OMNI_PT_ShotsPanel(Panel):
             if collection.emission_value > 0:
                 box.prop(collection, "mix_rgb_emission_input", text="Luminance Mask")
             box.prop(collection, "color_scan", text="Default Color")
+            box.prop(collection, "use_projection_fallback")
+            row = box.row(align=True)
+            row.operator("object.bake_omni_projection", icon='RENDER_STILL')
+            row.operator("object.clear_omni_projection_bake", text="", icon='X')
         else:
             layout.label(text="No shots imported")
 
@@ -336,16 +420,11 @@ class OMNI_OT_SwitchShot(Operator):
             scene.render.resolution_x = shot.resolution_x
             scene.render.resolution_y = shot.resolution_y
 
-            reorder_projection_nodes(shot.camera.name, shot.mesh)
+            reorder_projection_nodes(shot, collection.use_projection_fallback)
 
             # Set scene's motion blur based on shot's settings
             if scene.camera and scene.camera.data:
-                clear_motion_blur_keyframes(scene)
-                for keyframe in shot.shutter_speed_keyframes:
-                    frame = keyframe.frame
-                    value = keyframe.value * shot.fps
-                    scene.render.motion_blur_shutter = value
-                    scene.render.keyframe_insert(data_path="motion_blur_shutter", frame=frame)
+                apply_shot_render_action(scene, shot)
 
             # Update render settings based on the shot's stored values
             scene.render.use_motion_blur = shot.use_motion_blur
@@ -355,6 +434,7 @@ class OMNI_OT_SwitchShot(Operator):
                 hide_omniscient_collections(scene)
                 shot.collection.hide_viewport = False
                 shot.collection.hide_render = False
+                apply_shot_visibility(shot)
 
                 if scene.Selected_Collection_Name != shot.collection.name:
                     scene.Selected_Collection_Name = shot.collection.name
@@ -387,7 +467,9 @@ class OMNI_OT_DeleteShot(Operator):
             if 0 <= shot_index < len(collection.shots):
                 shot = collection.shots[shot_index]
 
-                delete_projection_nodes(shot.camera.name)
+                remove_uv_project_modifiers(shot)
+                delete_projection_nodes(shot)
+                remove_shot_coverage(shot)
 
                 # Unlink camera from scene and collection
                 if shot.camera:
@@ -395,23 +477,27 @@ class OMNI_OT_DeleteShot(Operator):
                         coll.objects.unlink(shot.camera)
                     bpy.data.objects.remove(shot.camera)
 
-                # Remove mesh if not used by other shots
+                # Remove the scan chunks not used by other shots
+                used_objects = set()
+                for coll in scene.Omni_Collections:
+                    for other_shot in coll.shots:
+                        if other_shot != shot:
+                            used_objects.add(other_shot.mesh)
+                            used_objects.update(chunk.obj for chunk in other_shot.geometry_chunks)
+
+                scan_objects = {chunk.obj for chunk in shot.geometry_chunks if chunk.obj}
                 if shot.mesh:
-                    mesh_in_use = False
-                    for coll in scene.Omni_Collections:
-                        for other_shot in coll.shots:
-                            if other_shot != shot and other_shot.mesh == shot.mesh:
-                                mesh_in_use = True
-                                break
-                        if mesh_in_use:
-                            break
-                    if not mesh_in_use:
-                        for coll in shot.mesh.users_collection:
-                            coll.objects.unlink(shot.mesh)
-                        bpy.data.objects.remove(shot.mesh)
+                    scan_objects.add(shot.mesh)
+                for scan_object in scan_objects - used_objects:
+                    for coll in scan_object.users_collection:
+                        coll.objects.unlink(scan_object)
+                    bpy.data.objects.remove(scan_object)
                 
-                # Remove the shot
+                # Remove the shot, and its render action unless the scene still uses it
+                render_action = shot.render_action
                 collection.shots.remove(shot_index)
+                if render_action and render_action.users == 0:
+                    bpy.data.actions.remove(render_action)
 
                 # Adjust the selected index
                 if shot_index == scene.Selected_Shot_Index:
@@ -436,9 +522,6 @@ class OMNI_OT_ToggleCameraProjection(Operator):
             for shot in collection.shots:
                 if shot.id == self.shot_id:
                     shot.camera_projection_multiply = 1.0 if shot.camera_projection_multiply == 0.0 else 0.0
-
-                    # Force update dependencies
-                    update_related_drivers(shot)
                     break
 
         return {'FINISHED'}
@@ -533,6 +616,7 @@ def register():
 
     bpy.app.handlers.depsgraph_update_post.append(update_active_camera)
     bpy.app.handlers.depsgraph_update_post.append(update_render_settings)
+    bpy.app.handlers.load_post.append(migrate_projection_drivers_on_load)
 
 
 def unregister():
@@ -547,3 +631,4 @@ def unregister():
 
     bpy.app.handlers.depsgraph_update_post.remove(update_active_camera)
     bpy.app.handlers.depsgraph_update_post.remove(update_render_settings)
+    bpy.app.handlers.load_post.remove(migrate_projection_drivers_on_load)
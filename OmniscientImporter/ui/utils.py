@@ -56,31 +56,6 @@ def adjust_timeline_view(context, frame_start, frame_end):
             break
 
 
-def update_related_drivers(shot):
-    # Debug print to trace function call
-    print(f"Updating drivers for shot {shot.name}")
-
-    def update_driver(driver):
-        if driver:
-            driver.expression = driver.expression  # Or update to any new expression
-
-    # Update drivers related to the shot's mesh
-    if shot.mesh and shot.mesh.type == 'MESH':
-        for mat in shot.mesh.data.materials:
-            if mat and mat.node_tree and mat.node_tree.animation_data:
-                for fcurve in mat.node_tree.animation_data.drivers:
-                    # Check if the driver is for an input socket's default value
-                    data_path = fcurve.data_path
-                    if '.inputs[' in data_path and data_path.endswith('default_value'):
-                        update_driver(fcurve.driver)
-
-
-def update_driver(obj):
-    if obj.animation_data:
-        for fc in obj.animation_data.drivers:
-            fc.driver.expression = fc.driver.expression
-
-
 def get_selected_collection_and_shot(scene, collection_index=None, shot_index=None):
     collection_index = collection_index if collection_index is not None else scene.Selected_Collection_Index
     shot_index = shot_index if shot_index is not None else scene.Selected_Shot_Index
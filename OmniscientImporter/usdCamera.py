@@ -0,0 +1,188 @@
+import os
+import bpy
+import numpy as np
+from .bakeKeyframes import decompose_matrices
+from .bulkKeyframes import write_property_keyframes
+
+try:
+    # Bundled with Blender, but not available in every build
+    from pxr import Usd, UsdGeom
+except ImportError:
+    Usd = None
+    UsdGeom = None
+
+USD_EXTENSIONS = ('.usd', '.usdc', '.usda')
+
+# Lens of new Blender cameras, used when the stage doesn't author a focal length
+DEFAULT_LENS = 50.0
+
+# USD is Y-up by default, Blender is Z-up
+Y_UP_TO_Z_UP = np.array([
+    [1.0, 0.0, 0.0, 0.0],
+    [0.0, 0.0, -1.0, 0.0],
+    [0.0, 1.0, 0.0, 0.0],
+    [0.0, 0.0, 0.0, 1.0],
+])
+
+
+class UsdCameraError(Exception):
+    pass
+
+
+class UsdCameraSamples:
+    """Time samples of a USD camera prim, converted to Blender units and axes"""
+
+    __slots__ = (
+        "name",
+        "frames",
+        "matrices",
+        "lens",
+        "sensor_width",
+        "sensor_height",
+        "shift_x",
+        "shift_y",
+        "focus_distance",
+        "fstop",
+        "clip_start",
+        "clip_end",
+    )
+
+
+def is_usd_available():
+    return Usd is not None
+
+
+def find_camera_prim(stage):
+    for prim in stage.Traverse():
+        if prim.IsA(UsdGeom.Camera):
+            return prim
+    return None
+
+
+def time_codes_per_second(stage, fallback_fps=None):
+    """Rate of the time codes of stage, fallback_fps when the stage authors none"""
+    if fallback_fps and not (stage.HasAuthoredMetadata("timeCodesPerSecond")
+                             or stage.HasAuthoredMetadata("framesPerSecond")):
+        return fallback_fps
+    return stage.GetTimeCodesPerSecond()
+
+
+def read_usd_camera(filepath, scene_fps=None, fallback_fps=None):
+    """Read the first camera of a USD file without importing the rest of the stage.
+
+    Payloads (e.g. scan geometry) are never loaded, only the camera prim and
+    its ancestors are evaluated on every time code of the stage. Time codes
+    are converted to frames at scene_fps, stages without a time code rate
+    are taken to be at fallback_fps.
+    """
+    if not is_usd_available():
+        raise UsdCameraError("The pxr module is not available")
+
+    stage = Usd.Stage.Open(filepath, load=Usd.Stage.LoadNone)
+    if stage is None:
+        raise UsdCameraError(f"Could not open {os.path.basename(filepath)}")
+
+    prim = find_camera_prim(stage)
+    if prim is None:
+        raise UsdCameraError(f"No camera found in {os.path.basename(filepath)}")
+
+    if stage.HasAuthoredTimeCodeRange():
+        start, end = int(stage.GetStartTimeCode()), int(stage.GetEndTimeCode())
+        time_codes = [Usd.TimeCode(time) for time in range(start, end + 1)]
+    else:
+        time_codes = [Usd.TimeCode.Default()]
+
+    meters_per_unit = UsdGeom.GetStageMetersPerUnit(stage)
+    # Lens and aperture are in tenths of a scene unit
+    millimeters_per_tenth = 100.0 * meters_per_unit
+
+    camera = UsdGeom.Camera(prim)
+    focal_length = camera.GetFocalLengthAttr()
+    focus_distance = camera.GetFocusDistanceAttr()
+    horizontal_aperture = camera.GetHorizontalApertureAttr()
+    vertical_aperture = camera.GetVerticalApertureAttr()
+
+    count = len(time_codes)
+    samples = UsdCameraSamples()
+    samples.name = prim.GetName()
+    frame_scale = scene_fps / time_codes_per_second(stage, fallback_fps) if scene_fps else 1.0
+    samples.frames = np.array([1.0 if time.IsDefault() else time.GetValue() * frame_scale for time in time_codes],
+                              dtype=np.float32)
+    samples.matrices = np.empty((count, 4, 4))
+    samples.lens = np.empty(count, dtype=np.float32)
+    samples.focus_distance = np.empty(count, dtype=np.float32)
+
+    xform_cache = UsdGeom.XformCache()
+    for i, time in enumerate(time_codes):
+        xform_cache.SetTime(time)
+        # USD matrices are row-major with the translation in the last row
+        samples.matrices[i] = np.array(xform_cache.GetLocalToWorldTransform(prim)).T
+        samples.lens[i] = focal_length.Get(time) or 0.0
+        samples.focus_distance[i] = focus_distance.Get(time) or 0.0
+
+    samples.matrices[:, :3, 3] *= meters_per_unit
+    if UsdGeom.GetStageUpAxis(stage) == UsdGeom.Tokens.y:
+        samples.matrices = Y_UP_TO_Z_UP @ samples.matrices
+
+    samples.lens *= millimeters_per_tenth
+    samples.lens[samples.lens <= 0.0] = DEFAULT_LENS
+    samples.focus_distance *= meters_per_unit
+    # A focus distance of 0 means unset
+    samples.focus_distance[samples.focus_distance <= 0.0] = np.nan
+
+    width = horizontal_aperture.Get() or 0.0
+    height = vertical_aperture.Get() or 0.0
+    samples.sensor_width = width * millimeters_per_tenth
+    samples.sensor_height = height * millimeters_per_tenth
+    samples.shift_x = (camera.GetHorizontalApertureOffsetAttr().Get() or 0.0) / width if width else 0.0
+    samples.shift_y = (camera.GetVerticalApertureOffsetAttr().Get() or 0.0) / height if height else 0.0
+    samples.fstop = camera.GetFStopAttr().Get() or 0.0
+
+    clipping_range = camera.GetClippingRangeAttr().Get()
+    samples.clip_start = clipping_range[0] * meters_per_unit if clipping_range else None
+    samples.clip_end = clipping_range[1] * meters_per_unit if clipping_range else None
+
+    return samples
+
+
+def create_camera_object(samples, collection):
+    """Create a camera object animated by samples with bulk-written F-Curves"""
+    camera_data = bpy.data.cameras.new(samples.name)
+    camera = bpy.data.objects.new(samples.name, camera_data)
+    collection.objects.link(camera)
+
+    if samples.sensor_width:
+        camera_data.sensor_width = samples.sensor_width
+    if samples.sensor_height:
+        camera_data.sensor_height = samples.sensor_height
+    camera_data.shift_x = samples.shift_x
+    camera_data.shift_y = samples.shift_y
+    if samples.fstop > 0.0:
+        camera_data.dof.aperture_fstop = samples.fstop
+    if samples.clip_start is not None:
+        camera_data.clip_start = samples.clip_start
+        camera_data.clip_end = samples.clip_end
+
+    location, euler, scale = decompose_matrices(samples.matrices)
+    camera.rotation_mode = 'XYZ'
+
+    # A single sample is a static camera, set its values instead of keying them
+    if len(samples.frames) == 1:
+        camera.location = location[0]
+        camera.rotation_euler = euler[0]
+        camera.scale = scale[0]
+        camera_data.lens = samples.lens[0]
+        if not np.isnan(samples.focus_distance[0]):
+            camera_data.dof.focus_distance = samples.focus_distance[0]
+        return camera
+
+    for data_path, values in (("location", location), ("rotation_euler", euler), ("scale", scale)):
+        for index in range(3):
+            write_property_keyframes(camera, data_path, samples.frames, values[:, index], index)
+    write_property_keyframes(camera_data, "lens", samples.frames, samples.lens)
+    write_property_keyframes(camera_data, "dof.focus_distance", samples.frames, samples.focus_distance)
+    return camera
+
+
+def import_usd_camera(filepath, collection, scene_fps=None, fallback_fps=None):
+    return create_camera_object(read_usd_camera(filepath, scene_fps, fallback_fps), collection)
@@ -0,0 +1,126 @@
+"""Compare the render time of the shader and UV Project projection backends on a dense scan.
+
+Run with Blender from the root of the repository:
+
+    blender -b --factory-startup -P scripts/benchmark_projection.py -- --subdivisions 1000 --frames 10
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OmniscientImporter.cameraProjection.projection_shader_group import create_projection_shader_group  # noqa: E402
+from OmniscientImporter.cameraProjection.projection_uv_backend import ensure_uv_project_modifier  # noqa: E402
+from OmniscientImporter.scanLod import register as register_scan_lod  # noqa: E402
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--subdivisions", type=int, default=1000, help="Grid subdivisions of the scan")
+    parser.add_argument("--frames", type=int, default=10, help="Frames rendered per backend")
+    parser.add_argument("--samples", type=int, default=16, help="Cycles samples")
+    parser.add_argument("--resolution", type=int, default=50, help="Render resolution percentage")
+    return parser.parse_args(argv)
+
+
+def build_scene(subdivisions, frames):
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        bpy.data.objects.remove(obj)
+
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=subdivisions, y_subdivisions=subdivisions, size=10.0)
+    scan = bpy.context.object
+
+    camera = bpy.data.objects.new("BenchmarkCamera", bpy.data.cameras.new("BenchmarkCamera"))
+    scene.collection.objects.link(camera)
+    scene.camera = camera
+    camera.rotation_euler = (0.9, 0.0, 0.0)
+    for frame, x in ((1, -1.0), (frames, 1.0)):
+        camera.location = (x, -6.0, 4.0)
+        camera.keyframe_insert("location", frame=frame)
+
+    image = bpy.data.images.new("BenchmarkPlate", 1920, 1080)
+    image.generated_type = 'COLOR_GRID'
+
+    scene.frame_start = 1
+    scene.frame_end = frames
+    scene.render.resolution_x = 1920
+    scene.render.resolution_y = 1080
+    return scene, scan, camera, image
+
+
+def build_material(name, image):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    image_node = nodes.new("ShaderNodeTexImage")
+    image_node.image = image
+    image_node.extension = 'CLIP'
+    material.node_tree.links.new(image_node.outputs[0], nodes["Principled BSDF"].inputs[0])
+    return material, image_node
+
+
+def setup_shader_backend(scan, camera, image):
+    material, image_node = build_material("ShaderBackend", image)
+    nodes = material.node_tree.nodes
+    tex_coord_node = nodes.new("ShaderNodeTexCoord")
+    tex_coord_node.object = camera
+    group_node = nodes.new("ShaderNodeGroup")
+    group_node.node_tree = create_projection_shader_group()
+    group_node.inputs["Focal Length"].default_value = camera.data.lens
+    group_node.inputs["Sensor Size"].default_value = camera.data.sensor_width
+    material.node_tree.links.new(tex_coord_node.outputs["Camera"], group_node.inputs[0])
+    material.node_tree.links.new(group_node.outputs[0], image_node.inputs[0])
+    scan.data.materials.clear()
+    scan.data.materials.append(material)
+
+
+def setup_uv_project_backend(scan, camera, image):
+    scene = bpy.context.scene
+    material, image_node = build_material("UVProjectBackend", image)
+    uv_map_node = material.node_tree.nodes.new("ShaderNodeUVMap")
+    uv_map_node.uv_map = "Omni_Benchmark"
+    material.node_tree.links.new(uv_map_node.outputs[0], image_node.inputs[0])
+    ensure_uv_project_modifier(scan, camera, "Omni_Benchmark", scene.render.resolution_x, scene.render.resolution_y)
+    scan.data.materials.clear()
+    scan.data.materials.append(material)
+
+
+def render_frames(scene):
+    """Seconds spent rendering every frame of the scene"""
+    start = time.perf_counter()
+    for frame in range(scene.frame_start, scene.frame_end + 1):
+        scene.frame_set(frame)
+        bpy.ops.render.render()
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    # Scan objects carry the LOD pointers the backends look up
+    register_scan_lod()
+
+    scene, scan, camera, image = build_scene(args.subdivisions, args.frames)
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = args.samples
+    scene.render.resolution_percentage = args.resolution
+
+    print(f"Scan: {len(scan.data.vertices)} vertices, {args.frames} frames, {args.samples} samples")
+    setup_shader_backend(scan, camera, image)
+    shader_time = render_frames(scene)
+    print(f"Shader:     {shader_time:.2f}s ({shader_time / args.frames:.3f}s per frame)")
+
+    setup_uv_project_backend(scan, camera, image)
+    uv_project_time = render_frames(scene)
+    print(f"UV Project: {uv_project_time:.2f}s ({uv_project_time / args.frames:.3f}s per frame)")
+
+
+if __name__ == "__main__":
+    main()
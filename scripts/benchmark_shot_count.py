@@ -0,0 +1,95 @@
+"""Render time of one scan as projected shots are added, it should stay flat.
+
+Run with Blender from the root of the repository:
+
+    blender -b --factory-startup -P scripts/benchmark_shot_count.py -- --shots 1 5 10 25 50
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import addon_utils
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--shots", type=int, nargs="+", default=[1, 5, 10, 25, 50], help="Shot counts to render")
+    parser.add_argument("--subdivisions", type=int, default=200, help="Grid subdivisions of the scan")
+    parser.add_argument("--frames", type=int, default=3, help="Frames rendered per shot count")
+    parser.add_argument("--samples", type=int, default=16, help="Cycles samples")
+    parser.add_argument("--resolution", type=int, default=50, help="Render resolution percentage")
+    return parser.parse_args(argv)
+
+
+def add_shot(scene, omni_collection, scan, material_name, index):
+    """Camera, plate and projection nodes of a new shot looking at the scan"""
+    from OmniscientImporter.cameraProjection.cameraProjectionMaterial import create_projection_shader
+
+    camera = bpy.data.objects.new(f"Camera_{index:03d}", bpy.data.cameras.new(f"Camera_{index:03d}"))
+    scene.collection.objects.link(camera)
+    angle = index * 0.3
+    camera.location = (6.0 * math.sin(angle), -6.0 * math.cos(angle), 4.0)
+    camera.rotation_euler = (0.9, 0.0, angle)
+
+    image = bpy.data.images.new(f"Plate_{index:03d}", 1920, 1080)
+    image.generated_type = 'COLOR_GRID' if index % 2 else 'UV_GRID'
+
+    shot = omni_collection.shots.add()
+    shot.camera = camera
+    shot.mesh = scan
+    shot.name = f"Shot {index + 1:02d}"
+    shot.assign_id()
+
+    material = create_projection_shader(material_name, image.name, camera)
+    if not scan.data.materials:
+        scan.data.materials.append(material)
+    return shot
+
+
+def render_frames(scene, frames):
+    start = time.perf_counter()
+    for frame in range(1, frames + 1):
+        scene.frame_set(frame)
+        bpy.ops.render.render()
+    return time.perf_counter() - start
+
+
+def main():
+    args = parse_args()
+    addon_utils.enable("OmniscientImporter", default_set=True)
+
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        bpy.data.objects.remove(obj)
+    scene.render.engine = 'CYCLES'
+    scene.cycles.device = 'CPU'
+    scene.cycles.samples = args.samples
+    scene.render.resolution_x = 1920
+    scene.render.resolution_y = 1080
+    scene.render.resolution_percentage = args.resolution
+
+    bpy.ops.mesh.primitive_grid_add(x_subdivisions=args.subdivisions, y_subdivisions=args.subdivisions, size=10.0)
+    scan = bpy.context.object
+    omni_collection = scene.Omni_Collections.add()
+    omni_collection.collection = scene.collection
+
+    shots = []
+    for shot_count in sorted(args.shots):
+        while len(shots) < shot_count:
+            shots.append(add_shot(scene, omni_collection, scan, "Scan_Material_Omni_Benchmark", len(shots)))
+
+        scene.Selected_Shot_Index = len(shots) - 1
+        bpy.ops.object.switch_shot(index=len(shots) - 1, collection_index=0)
+        elapsed = render_frames(scene, args.frames)
+        print(f"{shot_count:4d} shots: {elapsed / args.frames:.3f}s per frame")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Check the node graphs built by the add-on against the current Blender version.
+
+Builds the projection material template, the projector node group, the
+material of one projected shot and the compositor tree, then checks their
+nodes and links. Run it on every supported Blender version from the root of
+the repository:
+
+    blender -b --factory-startup --python-exit-code 1 -P scripts/check_projection_graph.py
+"""
+
+import os
+import sys
+
+import addon_utils
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+errors = []
+
+
+def check(condition, message):
+    if not condition:
+        errors.append(message)
+
+
+def is_linked(node_tree, from_name, to_name, to_socket=None):
+    """Whether a link goes from the node from_name to the node to_name, on its input to_socket if given"""
+    for link in node_tree.links:
+        if link.from_node.name != from_name or link.to_node.name != to_name:
+            continue
+        if to_socket is None or link.to_socket.name == to_socket or link.to_socket.identifier == to_socket:
+            return True
+    return False
+
+
+def check_nodes(node_tree, names):
+    for name in names:
+        check(name in node_tree.nodes, f"{node_tree.name}: missing node {name}")
+
+
+def check_links(node_tree, links):
+    for from_name, to_name, to_socket in links:
+        check(is_linked(node_tree, from_name, to_name, to_socket),
+              f"{node_tree.name}: {from_name} is not linked to {to_name} [{to_socket or 'any'}]")
+
+
+def check_template():
+    from OmniscientImporter.cameraProjection.cameraProjectionMaterial import projection_material_template
+
+    node_tree = projection_material_template().node_tree
+    bsdf = next((node for node in node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+    output = next((node for node in node_tree.nodes if node.type == 'OUTPUT_MATERIAL'), None)
+    check(bsdf is not None and output is not None, "template: missing Principled BSDF or Material Output")
+    if bsdf and output:
+        check_links(node_tree, [(bsdf.name, output.name, None)])
+
+    check_nodes(node_tree, ["ColorRampEmissionNode", "ValueEmissionNode", "MultiplyEmissionNode", "MixRGBEmissionNode"])
+    check_links(node_tree, [
+        ("ColorRampEmissionNode", "MultiplyEmissionNode", None),
+        ("ValueEmissionNode", "MultiplyEmissionNode", None),
+        ("MultiplyEmissionNode", "MixRGBEmissionNode", None),
+        ("ValueEmissionNode", "MixRGBEmissionNode", None),
+    ])
+
+
+def check_projector_group():
+    from OmniscientImporter.cameraProjection.projection_parameters import PROJECTION_GROUP_NAME
+    from OmniscientImporter.cameraProjection.projection_shader_group import create_projection_shader_group
+
+    node_group = create_projection_shader_group()
+    check(node_group.name == PROJECTION_GROUP_NAME, f"projector group is named {node_group.name}")
+    check_nodes(node_group, ["X Resolution", "Y Resolution", "Vector Math Scale"])
+    check(any(link.to_node.type == 'GROUP_OUTPUT' for link in node_group.links), "projector group: output not linked")
+
+    if hasattr(node_group, "interface"):
+        inputs = {item.name for item in node_group.interface.items_tree if getattr(item, "in_out", None) == 'INPUT'}
+    else:
+        inputs = {socket.name for socket in node_group.inputs}
+    for name in ("Vector Input", "Focal Length", "Sensor Size"):
+        check(name in inputs, f"projector group: missing input {name}")
+
+
+def check_shot_material(scene):
+    from OmniscientImporter.cameraProjection.cameraProjectionMaterial import create_projection_shader
+
+    bpy.ops.mesh.primitive_plane_add(size=10.0)
+    scan = bpy.context.object
+    omni_collection = scene.Omni_Collections.add()
+    omni_collection.collection = scene.collection
+
+    camera = bpy.data.objects.new("CheckCamera", bpy.data.cameras.new("CheckCamera"))
+    scene.collection.objects.link(camera)
+    image = bpy.data.images.new("CheckPlate", 64, 64)
+    shot = omni_collection.shots.add()
+    shot.camera = camera
+    shot.mesh = scan
+    shot.assign_id()
+
+    material = create_projection_shader("CheckMaterial", image.name, camera)
+    entry = next((entry for entry in scene.camera_projection_nodes if entry.shot_id == shot.id), None)
+    check(entry is not None, "shot: no projection entry")
+    if entry is None:
+        return
+
+    node_tree = material.node_tree
+    bsdf = next((node for node in node_tree.nodes if node.type == 'BSDF_PRINCIPLED'), None)
+    check_nodes(node_tree, [entry.tex_coord_node, entry.camera_projector_group_node, entry.image_texture_node,
+                            entry.multiply_visibility_node, entry.mix_rgb_visibility_node])
+    check_links(node_tree, [
+        (entry.tex_coord_node, entry.camera_projector_group_node, None),
+        (entry.camera_projector_group_node, entry.image_texture_node, None),
+        (entry.image_texture_node, entry.multiply_visibility_node, None),
+        (entry.image_texture_node, entry.mix_rgb_visibility_node, None),
+        (entry.multiply_visibility_node, entry.mix_rgb_visibility_node, None),
+        (entry.mix_rgb_visibility_node, bsdf.name if bsdf else "", None),
+        (entry.mix_rgb_visibility_node, "ColorRampEmissionNode", None),
+        ("MixRGBEmissionNode", bsdf.name if bsdf else "", None),
+    ])
+
+
+def check_compositor(scene):
+    from OmniscientImporter.setupCompositingNodes import _get_or_create_compositor_tree, setup_compositing_nodes
+
+    image = bpy.data.images.new("CheckCompositorPlate", 64, 64)
+    setup_compositing_nodes(image, 'CYCLES')
+    node_tree = _get_or_create_compositor_tree(scene)
+    check_nodes(node_tree, ["Render Layers", "Image", "Scale", "Alpha Over", "Viewer", "OmniScaleX", "OmniScaleY"])
+    output = node_tree.nodes.get("Group Output") or node_tree.nodes.get("Composite")
+    check(output is not None, "compositor: missing Group Output or Composite")
+    check_links(node_tree, [
+        ("Image", "Scale", "Image"),
+        ("Alpha Over", "Viewer", "Image"),
+        ("Alpha Over", output.name if output else "", None),
+        ("OmniScaleX", "Scale", None),
+        ("OmniScaleY", "Scale", None),
+    ])
+    image_node = node_tree.nodes.get("Image")
+    check(image_node is not None and image_node.image == image, "compositor: Image node doesn't show the plate")
+
+
+def main():
+    addon_utils.enable("OmniscientImporter", default_set=True)
+    scene = bpy.context.scene
+    for obj in list(scene.objects):
+        bpy.data.objects.remove(obj)
+
+    check_template()
+    check_projector_group()
+    check_shot_material(scene)
+    check_compositor(scene)
+
+    version = bpy.app.version_string
+    if errors:
+        print(f"Node graph check failed on Blender {version}:")
+        for error in errors:
+            print(f"  {error}")
+        sys.exit(1)
+    print(f"Node graph check passed on Blender {version}")
+
+
+if __name__ == "__main__":
+    main()
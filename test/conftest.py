@@ -0,0 +1,19 @@
+"""Load the modules of the add-on that don't need Blender.
+
+The package __init__ registers the add-on with bpy, so the package is put
+in sys.modules without running it and its bpy-free modules are imported
+from there.
+"""
+
+import sys
+import types
+from pathlib import Path
+
+PACKAGE_NAME = "OmniscientImporter"
+PACKAGE_DIR = Path(__file__).resolve().parent.parent / PACKAGE_NAME
+TEST_DIR = Path(__file__).resolve().parent
+
+if PACKAGE_NAME not in sys.modules:
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = [str(PACKAGE_DIR)]
+    sys.modules[PACKAGE_NAME] = package
@@ -0,0 +1,38 @@
+from OmniscientImporter.mediaIndex import resolve_missing_files
+
+
+def write(path, content=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_folder_with_most_missing_files_wins(tmp_path):
+    write(tmp_path / "shot_a" / "video.mov")
+    video = write(tmp_path / "shot_b" / "video.mov")
+    camera = write(tmp_path / "shot_b" / "camera.abc")
+    write(tmp_path / "shot_c" / "camera.abc")
+
+    resolved = resolve_missing_files(["/gone/video.mov", "/gone/camera.abc"], [str(tmp_path)])
+    assert resolved == {"/gone/video.mov": video, "/gone/camera.abc": camera}
+
+
+def test_tied_candidates_are_left_unresolved(tmp_path):
+    write(tmp_path / "shot_a" / "video.mov")
+    write(tmp_path / "shot_b" / "video.mov")
+
+    assert resolve_missing_files(["/gone/video.mov"], [str(tmp_path)]) == {}
+
+
+def test_nested_roots_find_a_single_file(tmp_path):
+    video = write(tmp_path / "shot" / "video.mov")
+
+    resolved = resolve_missing_files(["/gone/video.mov"], [str(tmp_path), str(tmp_path / "shot")])
+    assert resolved == {"/gone/video.mov": video}
+
+
+def test_empty_files_only_used_without_alternative(tmp_path):
+    write(tmp_path / "empty" / "video.mov", b"")
+    video = write(tmp_path / "full" / "video.mov")
+
+    assert resolve_missing_files(["/gone/video.mov"], [str(tmp_path)]) == {"/gone/video.mov": video}
@@ -0,0 +1,86 @@
+import struct
+
+import numpy as np
+import pytest
+
+from OmniscientImporter.meshReader import MeshReadError, read_obj, read_ply
+
+VERTICES = [(0.0, 0.0, 0.0), (1.0, 0.0, 0.0), (1.0, 1.0, 0.0), (0.0, 1.0, 0.0), (2.0, 0.0, 0.0)]
+
+
+def ply_header(file_format, face_count):
+    return (f"ply\nformat {file_format} 1.0\nelement vertex {len(VERTICES)}\n"
+            "property float x\nproperty float y\nproperty float z\n"
+            f"element face {face_count}\nproperty list uchar int vertex_indices\nend_header\n").encode()
+
+
+def write_binary_ply(path, faces, byte_order="<"):
+    file_format = "binary_big_endian" if byte_order == ">" else "binary_little_endian"
+    body = b"".join(struct.pack(byte_order + "3f", *vertex) for vertex in VERTICES)
+    body += b"".join(struct.pack(f"{byte_order}B{len(face)}i", len(face), *face) for face in faces)
+    path.write_bytes(ply_header(file_format, len(faces)) + body)
+    return str(path)
+
+
+def write_ascii_ply(path, faces):
+    body = "".join(" ".join(map(str, vertex)) + "\n" for vertex in VERTICES)
+    body += "".join(f"{len(face)} " + " ".join(map(str, face)) + "\n" for face in faces)
+    path.write_bytes(ply_header("ascii", len(faces)) + body.encode())
+    return str(path)
+
+
+def assert_faces(mesh_data, faces):
+    assert mesh_data.face_sizes.tolist() == [len(face) for face in faces]
+    assert mesh_data.loop_vertices.tolist() == [index for face in faces for index in face]
+    np.testing.assert_array_equal(mesh_data.vertices, np.array(VERTICES, dtype=np.float32))
+
+
+@pytest.mark.parametrize("byte_order", ["<", ">"])
+@pytest.mark.parametrize("faces", [
+    [(0, 1, 2), (0, 2, 3)],
+    [(0, 1, 2, 3)],
+    [(0, 1, 2, 3), (1, 4, 2)],
+    [(1, 4, 2), (0, 1, 2, 3), (1, 4, 2), (1, 4, 2), (0, 1, 2, 3)],
+])
+def test_binary_ply_faces(tmp_path, faces, byte_order):
+    assert_faces(read_ply(write_binary_ply(tmp_path / "scan.ply", faces, byte_order)), faces)
+
+
+def test_binary_ply_long_mixed_runs(tmp_path):
+    faces = [(1, 4, 2)] * 3000 + [(0, 1, 2, 3)] * 5000 + [(1, 4, 2)] * 10
+    assert_faces(read_ply(write_binary_ply(tmp_path / "scan.ply", faces)), faces)
+
+
+def test_ascii_ply_mixed_faces(tmp_path):
+    faces = [(0, 1, 2, 3), (1, 4, 2)]
+    assert_faces(read_ply(write_ascii_ply(tmp_path / "scan.ply", faces)), faces)
+
+
+def test_invalid_binary_ply_raises_mesh_read_error(tmp_path):
+    # Errors are raised with the map still open, no view of it may outlive them
+    with pytest.raises(MeshReadError):
+        read_ply(write_binary_ply(tmp_path / "scan.ply", [(0, 1, 2), (0, 1)]))
+    with pytest.raises(MeshReadError):
+        read_ply(write_binary_ply(tmp_path / "scan.ply", [(0, 1, 2), (0, 1, 9)]))
+
+
+def test_truncated_binary_ply_raises_mesh_read_error(tmp_path):
+    path = write_binary_ply(tmp_path / "scan.ply", [(0, 1, 2), (0, 1, 2, 3)])
+    with open(path, "r+b") as f:
+        f.truncate(len(open(path, "rb").read()) - 4)
+    with pytest.raises(MeshReadError):
+        read_ply(path)
+
+
+def test_obj_mixed_faces_with_uvs(tmp_path):
+    path = tmp_path / "scan.obj"
+    path.write_text("v 0 0 0\nv 1 0 0\nv 1 1 0\nv 0 1 0\n"
+                    "vt 0 0\nvt 1 0\nvt 1 1\nvt 0 1\n"
+                    "f 1/1 2/2 3/3 4/4\nf 1/1 2/2 3/3\n")
+    mesh_data = read_obj(str(path))
+
+    assert mesh_data.face_sizes.tolist() == [4, 3]
+    assert mesh_data.loop_vertices.tolist() == [0, 1, 2, 3, 0, 1, 2]
+    np.testing.assert_array_equal(mesh_data.uvs[:4], [[0, 0], [1, 0], [1, 1], [0, 1]])
+    # Y-up to Z-up
+    np.testing.assert_array_equal(mesh_data.vertices[3], [0, 0, 1])
@@ -0,0 +1,59 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from conftest import TEST_DIR
+from OmniscientImporter.omniParser import OmniParseError, OmniStreamReader
+
+NUMBERS = [12.345, -0.5e3, 1e-5, 2.5E+10, 0, -7, 30]
+
+
+def omni_text(values):
+    frames = ",".join(json.dumps({"focal_length": value, "index": index}) for index, value in enumerate(values))
+    return ('{"version": "2.1.0", "blender": {"minimum_addon_version": "1.4.0"}, '
+            '"data": {"video": {"fps": 30.5, "frames": [' + frames + ']}}}')
+
+
+def read(text, chunk_size):
+    return OmniStreamReader(io.StringIO(text), chunk_size=chunk_size).read_document()
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 40))
+def test_numbers_split_at_every_offset(chunk_size):
+    document = read(omni_text(NUMBERS), chunk_size)
+
+    frames = document.frames["video"]
+    np.testing.assert_array_equal(frames.focal_length, np.array(NUMBERS, dtype=np.float32))
+    np.testing.assert_array_equal(frames.channel("index"), np.arange(len(NUMBERS), dtype=np.float32))
+    assert document.section("video")["fps"] == 30.5
+
+
+def test_float_cut_after_every_character():
+    text = omni_text([123.456789])
+    start = text.index("123.456789")
+    for offset in range(start, start + len("123.456789") + 1):
+        reader = OmniStreamReader(io.StringIO(text), chunk_size=offset)
+        assert reader.read_document().frames["video"].focal_length[0] == np.float32(123.456789)
+
+
+def test_header_stops_before_frames():
+    reader = OmniStreamReader(io.StringIO(omni_text(NUMBERS)), chunk_size=8)
+    header = reader.read_header()
+    assert header["version"] == "2.1.0"
+    assert "data" not in header
+
+
+def test_sample_file_matches_json():
+    path = TEST_DIR / "video.omni"
+    with open(path) as f:
+        document = OmniStreamReader(f, chunk_size=7).read_document()
+    # The sample has trailing commas, which the reader tolerates and json doesn't
+    assert document.version == "2.1.0"
+    assert len(document.frames["video"]) > 0
+
+
+def test_garbage_after_number_is_rejected():
+    with pytest.raises(OmniParseError):
+        read('{"version": 12x}', 4)